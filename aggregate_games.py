@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Aggregate metrics across every game in the Parquet store.
+
+Usage:
+    python aggregate_games.py --by map
+    python aggregate_games.py --by team player --players 76561198000000001 76561198000000002
+    python aggregate_games.py --by date --period 1w --start 2025-01-01 --metrics trade_efficiency
+"""
+
+import sys
+import argparse
+from datetime import datetime
+
+import polars as pl
+
+from src.cs2_analyzer.application.aggregation import CrossGameAggregator, GROUPINGS
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aggregate CS2 metrics across all stored games'
+    )
+    parser.add_argument(
+        '--by',
+        nargs='+',
+        default=['map'],
+        choices=list(GROUPINGS),
+        help='Group results by one or more of these keys (default: map)'
+    )
+    parser.add_argument(
+        '--metrics',
+        nargs='+',
+        help='Metrics to aggregate (default: all registered metrics)'
+    )
+    parser.add_argument(
+        '--players',
+        nargs='+',
+        type=int,
+        help='Only include games with at least one of these player steam ids'
+    )
+    parser.add_argument(
+        '--start',
+        type=datetime.fromisoformat,
+        help='Only include games stored at or after this date (ISO format)'
+    )
+    parser.add_argument(
+        '--end',
+        type=datetime.fromisoformat,
+        help='Only include games stored before this date (ISO format)'
+    )
+    parser.add_argument(
+        '--period',
+        default='1mo',
+        help='Bucket size when grouping by date, e.g. 1d, 1w, 1mo (default: 1mo)'
+    )
+    parser.add_argument(
+        '--data',
+        default='data/processed',
+        help='Parquet store directory (default: data/processed)'
+    )
+
+    args = parser.parse_args()
+
+    frames = ParquetGameRepository(base_path=args.data).scan_frames()
+    results = CrossGameAggregator().aggregate(
+        frames,
+        by=args.by,
+        metric_names=args.metrics,
+        start=args.start,
+        end=args.end,
+        period=args.period,
+        players=args.players
+    )
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(results)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
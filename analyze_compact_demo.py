@@ -8,6 +8,11 @@ from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 
+import polars as pl
+
+from src.cs2_analyzer.application.duels import MULTI_KILLS, duel_stats
+from src.cs2_analyzer.application.frames import EVENT_SCHEMAS, conform
+
 
 @dataclass
 class PlayerInfo:
@@ -196,38 +201,48 @@ def calculate_team_win_rates(rounds: List[RoundInfo]) -> Dict[str, float]:
     }
 
 
-def analyze_player_performance(metadata: GameMetadata, rounds: List[RoundInfo]) -> Dict[str, Dict]:
-    """Analyze individual player performance."""
-    player_stats = {idx: {'kills': 0, 'deaths': 0, 'first_kills': 0}
-                    for idx in metadata.players.keys()}
+def compact_deaths(rounds: List[RoundInfo]) -> pl.LazyFrame:
+    """
+    Collect the death events of all rounds as a player_death table.
+
+    Player indices (P3 -> 3) take the place of steam ids; the compact format has no sides.
+    """
+    deaths = [
+        (round_info.round_number, int(match.group(1)), int(match.group(2)), int(match.group(3)),
+         match.group(4) is not None)
+        for round_info in rounds
+        for match in (re.search(r'^(\d+):D,P(\d+)>P(\d+)(?:,[^,]*)?(,HS)?', e) for e in round_info.events)
+        if match
+    ]
+    table = pl.LazyFrame(
+        deaths,
+        schema={'round_num': pl.Int64, 'tick': pl.Int64, 'attacker_steamid': pl.Int64,
+                'user_steamid': pl.Int64, 'headshot': pl.Boolean},
+        orient='row'
+    )
+    return conform(table, EVENT_SCHEMAS['player_death'])
 
-    for round_info in rounds:
-        death_events = [e for e in round_info.events if ':D,' in e]
 
-        for i, event in enumerate(death_events):
-            # Parse killer and victim
-            match = re.search(r'P(\d+)>P(\d+)', event)
-            if match:
-                killer_idx = f"P{match.group(1)}"
-                victim_idx = f"P{match.group(2)}"
-
-                if killer_idx in player_stats:
-                    player_stats[killer_idx]['kills'] += 1
-                    if i == 0:  # First kill of round
-                        player_stats[killer_idx]['first_kills'] += 1
-
-                if victim_idx in player_stats:
-                    player_stats[victim_idx]['deaths'] += 1
+def analyze_player_performance(metadata: GameMetadata, rounds: List[RoundInfo]) -> Dict[str, Dict]:
+    """Analyze individual player performance."""
+    stats = {
+        f"P{row['player_steamid']}": row
+        for row in duel_stats(compact_deaths(rounds), by=()).collect().iter_rows(named=True)
+    }
 
     # Convert to named stats
     named_stats = {}
-    for idx, stats in player_stats.items():
-        name = metadata.players.get(idx, idx)
-        kd_ratio = stats['kills'] / stats['deaths'] if stats['deaths'] > 0 else stats['kills']
-        named_stats[name] = {
-            'kills': stats['kills'],
-            'deaths': stats['deaths'],
-            'first_kills': stats['first_kills'],
+    for idx in metadata.players:
+        player = stats.get(idx, {})
+        kills, deaths = player.get('kills', 0), player.get('deaths', 0)
+        kd_ratio = kills / deaths if deaths > 0 else kills
+        named_stats[metadata.players.get(idx, idx)] = {
+            'kills': kills,
+            'deaths': deaths,
+            'first_kills': player.get('opening_wins', 0),
+            'first_deaths': player.get('opening_losses', 0),
+            'headshot_rate': round(player.get('headshot_rate') or 0.0, 2),
+            'multi_kill_rounds': sum(player.get(f'rounds_{count}k', 0) for count in MULTI_KILLS),
             'kd_ratio': round(kd_ratio, 2)
         }
 
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the geometry kernels.
+
+Usage:
+    python benchmarks/bench_geometry.py
+    python benchmarks/bench_geometry.py --rows 5000000 --repeat 10
+"""
+
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.cs2_analyzer.application import geometry
+
+
+def kernels(rows: int):
+    """Benchmark cases as (name, rows processed, callable)."""
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-3000, 3000, size=(rows, 3))
+    ticks = np.arange(rows)
+    yaw = rng.uniform(-180, 180, rows)
+    pitch = rng.uniform(-89, 89, rows)
+    directions = geometry.view_vectors(yaw, pitch)
+    polygon = [(-1000, -1000), (1000, -1000), (1500, 0), (1000, 1000), (-1000, 1000), (-1500, 0)]
+    team = points[:5]
+
+    return [
+        ("distances_to_point", rows, lambda: geometry.distances_to_point(points, (100.0, 200.0, 0.0))),
+        ("pairwise_distances 2000x2000", 2000 * 2000, lambda: geometry.pairwise_distances(points[:2000])),
+        ("mean_pairwise_distance 5 players", 1, lambda: geometry.mean_pairwise_distance(team)),
+        ("in_sphere", rows, lambda: geometry.in_sphere(points, (0.0, 0.0, 0.0), 500.0)),
+        ("in_polygon 6 edges", rows, lambda: geometry.in_polygon(points, polygon)),
+        ("path_length", rows, lambda: geometry.path_length(points)),
+        ("velocity", rows, lambda: geometry.velocity(points, ticks)),
+        ("view_vectors", rows, lambda: geometry.view_vectors(yaw, pitch)),
+        ("angle_to_targets", rows, lambda: geometry.angle_to_targets(points, directions, points[::-1])),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each geometry kernel')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Points per call (default: 1000000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed calls per kernel (default: 5)')
+    args = parser.parse_args()
+
+    print(f"{'kernel':<34} {'best ms':>10} {'ns/row':>10}")
+    for name, rows, kernel in kernels(args.rows):
+        best = min(timeit.repeat(kernel, number=1, repeat=args.repeat))
+        print(f"{name:<34} {best * 1000:>10.2f} {best / rows * 1e9:>10.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
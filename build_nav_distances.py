@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build per-map nav-mesh path distance tables offline.
+
+Reads awpy's nav mesh JSON (download with `awpy get navs`) and writes
+<output>/<map_name>.npz for the path distance lookups used by the metrics.
+
+Usage:
+    python build_nav_distances.py de_mirage de_inferno
+    python build_nav_distances.py de_mirage --navs path/to/navs --output data/nav
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+from awpy.data import NAVS_DIR
+from awpy.nav import Nav
+
+from src.cs2_analyzer.application.navigation import build_nav_distances, DEFAULT_NAV_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build area-to-area shortest path tables from awpy nav meshes'
+    )
+    parser.add_argument('maps', nargs='+', help='Map names, e.g. de_mirage')
+    parser.add_argument(
+        '--navs',
+        default=str(NAVS_DIR),
+        help=f'Directory with awpy nav mesh JSON files (default: {NAVS_DIR})'
+    )
+    parser.add_argument(
+        '--output',
+        default=DEFAULT_NAV_DIR,
+        help=f'Output directory (default: {DEFAULT_NAV_DIR})'
+    )
+
+    args = parser.parse_args()
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for map_name in args.maps:
+        nav_path = Path(args.navs) / f"{map_name}.json"
+        if not nav_path.exists():
+            print(f"Error: no nav mesh for {map_name} at {nav_path}")
+            return 1
+
+        start = time.perf_counter()
+        tables = build_nav_distances(Nav.from_json(nav_path))
+        output_path = output_dir / f"{map_name}.npz"
+        tables.save(output_path)
+        print(f"{map_name}: {len(tables.area_ids)} areas in {time.perf_counter() - start:.1f}s -> {output_path}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Build the retake model training matrix from every stored game.
+
+Writes one row per post-plant tick with player_advantage, time_remaining,
+total_ct_utility_value and the ct_win label to a Parquet file.
+
+Usage:
+    python build_retake_features.py
+    python build_retake_features.py --output data/features/retakes.parquet --batch-size 100
+"""
+
+import sys
+import time
+import argparse
+
+from src.cs2_analyzer.application.retakes import write_retake_features
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build post-plant retake features of all stored games as a Parquet training matrix'
+    )
+    parser.add_argument(
+        '--data',
+        default='data/processed',
+        help='Parquet store directory (default: data/processed)'
+    )
+    parser.add_argument(
+        '--output',
+        default='data/features/retake_features.parquet',
+        help='Output Parquet file (default: data/features/retake_features.parquet)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=50,
+        help='Games processed per batch (default: 50)'
+    )
+
+    args = parser.parse_args()
+
+    frames = ParquetGameRepository(base_path=args.data).scan_frames()
+    game_ids = frames.games.select('game_id').collect()['game_id'].to_list()
+    if not game_ids:
+        print(f"Error: no games stored in {args.data}")
+        return 1
+
+    start = time.perf_counter()
+    rows = write_retake_features(frames, args.output, game_ids, batch_size=args.batch_size)
+    print(f"Wrote {rows} snapshots of {len(game_ids)} games to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
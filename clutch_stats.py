@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Clutch (1vX) statistics of every player across all stored games.
+
+Usage:
+    python clutch_stats.py
+    python clutch_stats.py --per-game --output data/features/clutches.parquet
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import polars as pl
+
+from src.cs2_analyzer.application.clutches import build_clutches, clutch_stats, player_clutch_stats
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Detect clutches in all stored games and total them per player'
+    )
+    parser.add_argument(
+        '--data',
+        default='data/processed',
+        help='Parquet store directory (default: data/processed)'
+    )
+    parser.add_argument(
+        '--per-game',
+        action='store_true',
+        help='One row per player and game instead of totals over all games'
+    )
+    parser.add_argument(
+        '--output',
+        help='Also write the clutch table (one row per clutch) to this Parquet file'
+    )
+
+    args = parser.parse_args()
+
+    frames = ParquetGameRepository(base_path=args.data).scan_frames()
+    clutches = build_clutches(frames).collect()
+    if clutches.is_empty():
+        print(f"No clutches found in {args.data}")
+        return 0
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        clutches.write_parquet(args.output)
+        print(f"Wrote {clutches.height} clutches to {args.output}")
+
+    if args.per_game:
+        stats = player_clutch_stats(frames, clutches.lazy()).filter(pl.col('clutches') > 0).collect()
+    else:
+        names = frames.players.select(['player_steamid', 'name']).unique('player_steamid').collect()
+        stats = clutch_stats(clutches.lazy(), by=['player_steamid']).collect().join(
+            names, on='player_steamid', how='left'
+        ).sort(['clutches_won', 'clutches'], descending=True)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(stats)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
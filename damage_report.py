@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Damage statistics (ADR, utility damage, damage per weapon and the damage matrix)
+of every player across all stored games.
+
+Usage:
+    python damage_report.py
+    python damage_report.py --per-game --output data/features/damage
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import polars as pl
+
+from src.cs2_analyzer.application.damage import capped_damage, damage_by_weapon, damage_matrix, damage_stats
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compute ADR and damage statistics of all stored games from player_hurt events'
+    )
+    parser.add_argument(
+        '--data',
+        default='data/processed',
+        help='Parquet store directory (default: data/processed)'
+    )
+    parser.add_argument(
+        '--per-game',
+        action='store_true',
+        help='One row per player and game instead of totals over all games'
+    )
+    parser.add_argument(
+        '--output',
+        help='Also write stats.parquet, weapons.parquet and matrix.parquet to this directory'
+    )
+
+    args = parser.parse_args()
+
+    frames = ParquetGameRepository(base_path=args.data).scan_frames()
+    by = ['game_id'] if args.per_game else []
+
+    start = time.perf_counter()
+    damage = capped_damage(frames.event('player_hurt'))
+    stats, weapons, matrix = pl.collect_all([
+        damage_stats(damage, frames.round_players, by=by),
+        damage_by_weapon(damage, by=by),
+        damage_matrix(damage, by=by),
+    ])
+    if stats.is_empty():
+        print(f"No player_hurt events stored in {args.data}")
+        return 0
+
+    names = frames.players.select(['player_steamid', 'name']).unique('player_steamid').collect()
+    stats = stats.join(names, on='player_steamid', how='left').sort('adr', descending=True, nulls_last=True)
+    print(f"Computed damage of {stats['player_steamid'].n_unique()} players in {time.perf_counter() - start:.1f}s")
+
+    if args.output:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        for name, table in (('stats', stats), ('weapons', weapons), ('matrix', matrix)):
+            table.write_parquet(output / f"{name}.parquet")
+        print(f"Wrote damage tables to {output}")
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(stats)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
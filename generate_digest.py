@@ -8,6 +8,27 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+import polars as pl
+
+from src.cs2_analyzer.application.duels import duel_stats
+from src.cs2_analyzer.application.frames import MatchFrames
+
+
+def player_names(demo) -> dict:
+    """Map the steam ids in the death events to player names."""
+    deaths = demo.events.get('player_death') if getattr(demo, 'events', None) else None
+    if deaths is None:
+        return {}
+
+    names = {}
+    for role in ('attacker', 'user'):
+        id_col, name_col = f'{role}_steamid', f'{role}_name'
+        if id_col in deaths.columns and name_col in deaths.columns:
+            for steamid, name in deaths.select([id_col, name_col]).unique().iter_rows():
+                if steamid is not None and name is not None:
+                    names[steamid] = name
+    return names
+
 
 def generate_digest_from_demo(demo, output_path: str) -> str:
     """
@@ -40,9 +61,6 @@ def generate_digest_from_demo(demo, output_path: str) -> str:
         lines.append(f"CT-Side ({len(ct_players)}): {', '.join(ct_players)}")
     lines.append("")
 
-    # Calculate player stats
-    player_stats = defaultdict(lambda: {'kills': 0, 'deaths': 0, 'assists': 0, 'first_kills': 0})
-
     # Process each round
     rounds_data = []
 
@@ -81,11 +99,6 @@ def generate_digest_from_demo(demo, output_path: str) -> str:
                 victim = death_row.get('user_name', 'unknown')
                 weapon = death_row.get('weapon', 'unknown')
 
-                # Track stats
-                if attacker != victim:  # Not suicide
-                    player_stats[attacker]['kills'] += 1
-                player_stats[victim]['deaths'] += 1
-
                 # First kill
                 if first_kill is None:
                     first_kill = {
@@ -95,7 +108,6 @@ def generate_digest_from_demo(demo, output_path: str) -> str:
                         'victim': victim,
                         'weapon': weapon
                     }
-                    player_stats[attacker]['first_kills'] += 1
 
                 # Add to events
                 time_in_round = (tick - round_info['freeze_end']) / demo.tickrate
@@ -203,20 +215,21 @@ def generate_digest_from_demo(demo, output_path: str) -> str:
     # Player Statistics
     lines.append("PLAYER STATISTICS")
     lines.append("-" * 80)
-    lines.append(f"{'Player':<20} {'K':<5} {'D':<5} {'K/D':<6} {'FK':<5}")
+    lines.append(f"{'Player':<20} {'K':<5} {'D':<5} {'K/D':<6} {'FK':<5} {'FD':<5} {'HS%':<5} {'Multi':<5}")
     lines.append("-" * 80)
 
-    sorted_players = sorted(
-        player_stats.items(),
-        key=lambda x: x[1]['kills'] / max(x[1]['deaths'], 1),
-        reverse=True
-    )
+    names = player_names(demo)
+    stats = duel_stats(MatchFrames.from_demo(demo).event('player_death'), by=()).collect().with_columns(
+        (pl.col('kills') / pl.max_horizontal(pl.col('deaths'), 1)).alias('kd'),
+        pl.sum_horizontal(pl.col('^rounds_\\dk$')).alias('multi_kill_rounds')
+    ).sort('kd', descending=True)
 
-    for player, stats in sorted_players:
-        kd = stats['kills'] / max(stats['deaths'], 1)
+    for row in stats.iter_rows(named=True):
+        player = names.get(row['player_steamid'], str(row['player_steamid']))
+        hs = (row['headshot_rate'] or 0.0) * 100
         lines.append(
-            f"{player:<20} {stats['kills']:<5} {stats['deaths']:<5} "
-            f"{kd:<6.2f} {stats['first_kills']:<5}"
+            f"{player:<20} {row['kills']:<5} {row['deaths']:<5} {row['kd']:<6.2f} "
+            f"{row['opening_wins']:<5} {row['opening_losses']:<5} {hs:<5.0f} {row['multi_kill_rounds']:<5}"
         )
 
     lines.append("")
@@ -301,7 +314,8 @@ def generate_digest_from_demo(demo, output_path: str) -> str:
 
     lines.append("")
     lines.append("=" * 80)
-    lines.append(f"End of Digest | Total Size: {len('\\n'.join(lines))} characters")
+    total_size = len('\n'.join(lines))
+    lines.append(f"End of Digest | Total Size: {total_size} characters")
     lines.append("=" * 80)
 
     # Write to file
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Render a positional heatmap of one map over every stored game.
+
+Per-game grids are cached in the store, so only games not seen before are binned.
+
+Usage:
+    python generate_heatmap.py de_mirage
+    python generate_heatmap.py de_mirage --side t --window 30 --output reports/mirage_t.png
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from src.cs2_analyzer.application.heatmaps import (
+    HeatmapService, HeatmapSpec, render_heatmap, DEFAULT_HEATMAP_BINS, DEFAULT_HEATMAP_WINDOW
+)
+from src.cs2_analyzer.interface_adapters.parquet_heatmap_store import ParquetHeatmapStore
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render a positional heatmap summed over all stored games on a map'
+    )
+    parser.add_argument('map_name', help='Map to render, e.g. de_mirage')
+    parser.add_argument(
+        '--side',
+        default='ct',
+        choices=['ct', 't'],
+        help='Side whose positions are counted (default: ct)'
+    )
+    parser.add_argument(
+        '--window',
+        type=int,
+        default=DEFAULT_HEATMAP_WINDOW,
+        help=f'Seconds after freeze end to include (default: {DEFAULT_HEATMAP_WINDOW})'
+    )
+    parser.add_argument(
+        '--bins',
+        type=int,
+        default=DEFAULT_HEATMAP_BINS,
+        help=f'Grid cells per side (default: {DEFAULT_HEATMAP_BINS})'
+    )
+    parser.add_argument(
+        '--data',
+        default='data/processed',
+        help='Parquet store directory (default: data/processed)'
+    )
+    parser.add_argument(
+        '--output',
+        help='Output image path (default: reports/<map>_<side>_heatmap.png)'
+    )
+
+    args = parser.parse_args()
+
+    spec = HeatmapSpec(side=args.side, window_seconds=args.window, bins=args.bins)
+    frames = ParquetGameRepository(base_path=args.data).scan_frames()
+    counts = HeatmapService(ParquetHeatmapStore(base_path=args.data)).heatmap(frames, args.map_name, spec)
+
+    if counts.sum() == 0:
+        print(f"Error: no {args.side.upper()} positions stored for {args.map_name}")
+        return 1
+
+    output = Path(args.output or f"reports/{args.map_name}_{args.side}_heatmap.png")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    render_heatmap(
+        counts, args.map_name, str(output),
+        title=f"{args.map_name} {args.side.upper()} positions, first {args.window}s"
+    )
+    print(f"Heatmap saved to: {output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,8 @@ Generate a comprehensive tactical report from compact game state analysis.
 """
 import sys
 from datetime import datetime
+from src.cs2_analyzer.application.metric_cache import cached, content_hash, metric_key
+from src.cs2_analyzer.interface_adapters.parquet_metric_store import ParquetMetricStore
 from analyze_compact_demo import parse_compact_file, calculate_ttfk, calculate_bomb_plant_timing
 from analyze_compact_demo import calculate_round_duration, calculate_deaths_per_round
 from analyze_compact_demo import calculate_entry_success_rate, calculate_post_plant_win_rate
@@ -53,23 +55,47 @@ def analyze_round_details(rounds):
     return detailed_rounds
 
 
-def generate_markdown_report(compact_filepath: str, output_dir: str = "reports"):
-    """Generate comprehensive markdown tactical report."""
+# Code version of each report metric; bump one when its calculation changes
+# so cached results from the old implementation are not reused.
+REPORT_METRIC_VERSIONS = {
+    'ttfk': 1,
+    'plant_time': 1,
+    'round_duration': 1,
+    'deaths_per_round': 1,
+    'entry_success': 1,
+    'post_plant_win': 1,
+    'win_rates': 1,
+    'player_stats': 2,
+    'critical_rounds': 1,
+}
+
+
+def generate_markdown_report(compact_filepath: str, output_dir: str = "reports", cache=None):
+    """
+    Generate comprehensive markdown tactical report.
+
+    Metrics are read from the result cache when the same compact file was
+    reported on before, so changing the report template does not recompute them.
+    """
     from pathlib import Path
 
     # Parse data
     metadata, rounds = parse_compact_file(compact_filepath)
+    game_hash = content_hash(compact_filepath)
+
+    def metric(name, compute):
+        return cached(cache, metric_key(game_hash, f"report.{name}", REPORT_METRIC_VERSIONS[name]), compute)
 
     # Calculate metrics
-    ttfk = calculate_ttfk(metadata, rounds)
-    plant_time = calculate_bomb_plant_timing(metadata, rounds)
-    round_duration = calculate_round_duration(metadata, rounds)
-    deaths_per_round = calculate_deaths_per_round(rounds)
-    entry_success = calculate_entry_success_rate(rounds)
-    post_plant_win = calculate_post_plant_win_rate(rounds)
-    win_rates = calculate_team_win_rates(rounds)
-    player_stats = analyze_player_performance(metadata, rounds)
-    critical_rounds = extract_critical_rounds(rounds)
+    ttfk = metric('ttfk', lambda: calculate_ttfk(metadata, rounds))
+    plant_time = metric('plant_time', lambda: calculate_bomb_plant_timing(metadata, rounds))
+    round_duration = metric('round_duration', lambda: calculate_round_duration(metadata, rounds))
+    deaths_per_round = metric('deaths_per_round', lambda: calculate_deaths_per_round(rounds))
+    entry_success = metric('entry_success', lambda: calculate_entry_success_rate(rounds))
+    post_plant_win = metric('post_plant_win', lambda: calculate_post_plant_win_rate(rounds))
+    win_rates = metric('win_rates', lambda: calculate_team_win_rates(rounds))
+    player_stats = metric('player_stats', lambda: analyze_player_performance(metadata, rounds))
+    critical_rounds = metric('critical_rounds', lambda: extract_critical_rounds(rounds))
     detailed_rounds = analyze_round_details(rounds)
 
     # Determine teams (assuming P0-P4 are one team, P5-P9 another)
@@ -239,10 +265,11 @@ def generate_markdown_report(compact_filepath: str, output_dir: str = "reports")
 
         # Player stats table
         f.write("### Player Statistics\n\n")
-        f.write("| Player | Kills | Deaths | K/D | Entry Kills |\n")
-        f.write("|--------|-------|--------|-----|-------------|\n")
+        f.write("| Player | Kills | Deaths | K/D | Entry Kills | Entry Deaths | HS% | Multi-Kill Rounds |\n")
+        f.write("|--------|-------|--------|-----|-------------|--------------|-----|-------------------|\n")
         for name, stats in sorted_players:
-            f.write(f"| {name} | {stats['kills']} | {stats['deaths']} | {stats['kd_ratio']} | {stats['first_kills']} |\n")
+            f.write(f"| {name} | {stats['kills']} | {stats['deaths']} | {stats['kd_ratio']} | {stats['first_kills']} | "
+                    f"{stats['first_deaths']} | {stats['headshot_rate']*100:.0f}% | {stats['multi_kill_rounds']} |\n")
 
     print(f"Report generated: {output_path}")
     return output_path
@@ -303,4 +330,5 @@ if __name__ == '__main__':
 
     # Generate the report
     print("\nGenerating tactical analysis report...")
-    generate_markdown_report(compact_file)
+    with ParquetMetricStore() as cache:
+        generate_markdown_report(compact_file, cache=cache)
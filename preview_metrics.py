@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Compute the positional metrics of a demo, exactly or as a fast approximate preview.
+
+Preview mode runs the per-tick metrics on a stratified sample of each round's ticks
+and reports each estimate with a bootstrap confidence interval. Exact mode covers every
+positional metric, including rotations and entries, which cannot be sampled.
+
+Usage:
+    python preview_metrics.py match.dem
+    python preview_metrics.py match.dem --fraction 0.05 --confidence 0.9
+    python preview_metrics.py match.dem --mode exact
+"""
+
+import sys
+import time
+import argparse
+
+import polars as pl
+
+from src.cs2_analyzer.application.ingestion import AwpyDemoParser
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.preview import (
+    PreviewEvaluator, positional_metrics, preview_metrics, DEFAULT_CONFIDENCE, DEFAULT_SAMPLE_FRACTION
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compute positional metrics of a demo, optionally as an approximate preview'
+    )
+    parser.add_argument('demo', help='Path to the .dem file')
+    parser.add_argument(
+        '--mode',
+        default='preview',
+        choices=['preview', 'exact'],
+        help='preview: sampled ticks with confidence intervals; exact: every tick (default: preview)'
+    )
+    parser.add_argument(
+        '--fraction',
+        type=float,
+        default=DEFAULT_SAMPLE_FRACTION,
+        help=f'Share of each round\'s ticks sampled in preview mode (default: {DEFAULT_SAMPLE_FRACTION})'
+    )
+    parser.add_argument(
+        '--confidence',
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help=f'Confidence level of the preview intervals (default: {DEFAULT_CONFIDENCE})'
+    )
+    parser.add_argument(
+        '--metrics',
+        nargs='+',
+        help='Metrics to compute (default: the per-tick positional metrics in preview mode, '
+             'all positional metrics in exact mode)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed of the tick sample and bootstrap (default: 0)'
+    )
+
+    args = parser.parse_args()
+
+    demo = AwpyDemoParser().parse(args.demo)
+    evaluator = BatchMetricEvaluator()
+    default_metrics = positional_metrics if args.mode == 'exact' else preview_metrics
+    metric_names = args.metrics or default_metrics(evaluator.registry)
+
+    start = time.perf_counter()
+    if args.mode == 'exact':
+        results = evaluator.evaluate(demo, metric_names)
+    else:
+        try:
+            results = PreviewEvaluator(
+                evaluator, fraction=args.fraction, confidence=args.confidence, seed=args.seed
+            ).evaluate(demo, metric_names)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    elapsed = time.perf_counter() - start
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(results)
+    print(f"{args.mode.capitalize()} metrics computed in {elapsed:.2f}s")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Cross-game metric aggregation.
+
+Evaluates registered metrics over every game of a MatchFrames scan (usually
+ParquetGameRepository.scan_frames) in one pass and rolls the per-round and
+per-player breakdowns up by map, team, player or date period with a vectorized
+group_by. Values are pooled: each group's value is the weighted mean of all its
+rounds, exactly as a single game's scalar is derived from its breakdown.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import polars as pl
+
+from .frames import MatchFrames
+from .metric_registry import BatchMetricEvaluator
+from .metrics import summarize
+
+
+# Grouping name -> column it groups by after the breakdown is joined with game and roster metadata
+GROUPINGS = {
+    "game": "game_id",
+    "map": "map_name",
+    "team": "team",
+    "player": "player_steamid",
+    "date": "period",
+}
+
+
+class CrossGameAggregator:
+    """Aggregates metrics across many stored games."""
+
+    def __init__(self, evaluator: Optional[BatchMetricEvaluator] = None):
+        self.evaluator = evaluator or BatchMetricEvaluator()
+
+    def aggregate(self, frames: MatchFrames, by: Union[str, Sequence[str]] = "map",
+                  metric_names: Optional[Iterable[str]] = None,
+                  params: Optional[Dict[str, Dict[str, Any]]] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  period: str = "1mo", players: Optional[Iterable[int]] = None) -> pl.DataFrame:
+        """
+        Aggregate metrics across games.
+
+        Args:
+            frames: Lazy tables of the games to aggregate over
+            by: One or more of "game", "map", "team", "player" and "date"
+            metric_names: Metrics to aggregate (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+            start: Only include games played at or after this time
+            end: Only include games played before this time
+            period: Bucket size for "date" grouping, as a polars duration (e.g. "1w", "1mo")
+            players: Only include games in which at least one of these players played,
+                e.g. an opponent's roster when scouting
+
+        Returns:
+            DataFrame with the group columns, metric, value, weight (samples behind the
+            value) and games (number of games contributing). Grouping by team or player
+            only covers metrics with a per-player breakdown.
+        """
+        groupings = [by] if isinstance(by, str) else list(by)
+        unknown = [name for name in groupings if name not in GROUPINGS]
+        if unknown:
+            raise ValueError(f"Unknown groupings {unknown}, expected any of {list(GROUPINGS)}")
+        group_cols = [GROUPINGS[name] for name in groupings]
+
+        frames = self._select_games(frames, start, end, players)
+
+        per_player = "team" in groupings or "player" in groupings
+        breakdown = self.evaluator.breakdown_frames(
+            frames, metric_names, params,
+            by=["game_id", "player_steamid"] if per_player else ["game_id"]
+        )
+        if per_player:
+            breakdown = breakdown.filter(pl.col("player_steamid").is_not_null())
+
+        games = frames.games.select(["game_id", "map_name", "timestamp"]).collect().with_columns(
+            pl.col("timestamp").dt.truncate(period).alias("period")
+        )
+        enriched = breakdown.join(games, on="game_id", how="left")
+        if "team" in groupings:
+            roster = frames.players.select(["game_id", "player_steamid", "team"]).unique(
+                ["game_id", "player_steamid"]
+            ).collect()
+            enriched = enriched.join(roster, on=["game_id", "player_steamid"], how="left")
+
+        keys = group_cols + ["metric"]
+        pooled = summarize(enriched.lazy(), keys).collect()
+        game_counts = enriched.group_by(keys).agg(pl.col("game_id").n_unique().alias("games"))
+
+        return pooled.join(game_counts, on=keys, how="left", nulls_equal=True).select(
+            keys + ["value", pl.col("weight").cast(pl.Int64), pl.col("games").cast(pl.Int64)]
+        ).sort(keys, nulls_last=True)
+
+    def _select_games(self, frames: MatchFrames, start: Optional[datetime], end: Optional[datetime],
+                      players: Optional[Iterable[int]]) -> MatchFrames:
+        """Restrict the frames to the games in the date range that the given players played in."""
+        if start is None and end is None and players is None:
+            return frames
+
+        games = frames.games.select(["game_id", "timestamp"])
+        if start is not None:
+            games = games.filter(pl.col("timestamp") >= start)
+        if end is not None:
+            games = games.filter(pl.col("timestamp") < end)
+        if players is not None:
+            player_games = frames.players.filter(pl.col("player_steamid").is_in(list(players))).select("game_id")
+            games = games.join(player_games.unique(), on="game_id", how="semi")
+
+        game_ids: List[str] = games.collect()["game_id"].to_list()
+        return frames.where(game_ids=game_ids)
@@ -0,0 +1,152 @@
+"""
+Clutch (1vX) detection.
+
+A clutch starts when a side is down to one living player while the other side still
+has players alive; the last player standing is the clutcher and the opponents alive
+at that moment give the X of 1vX. The clutch is converted when the clutcher's side
+wins the round.
+
+The alive counts come from the game-state timeline, which is a cumulative sum over
+the death events, so detection is a filter and a group_by over that timeline: no
+per-round Python. The plans run lazily over every game of a Parquet store scan and
+the per-player totals are joined into the roster as a player stats table.
+"""
+
+from typing import Optional, Sequence
+
+import polars as pl
+
+from .frames import MatchFrames
+from .game_state import build_game_state, round_players
+from .metrics import GAME_ROUND, GAME_ROUND_PLAYER
+
+MAX_OPPONENTS = 5
+
+CLUTCH_SCHEMA = {
+    "game_id": pl.String,
+    "round_num": pl.Int64,
+    "player_steamid": pl.Int64,
+    "side": pl.String,
+    "start_tick": pl.Int64,
+    "opponents": pl.Int64,
+    "kills": pl.Int64,
+    "won": pl.Boolean,
+}
+
+
+def build_clutches(frames: MatchFrames, game_state: Optional[pl.LazyFrame] = None) -> pl.LazyFrame:
+    """
+    Finds every clutch of every round.
+
+    Only the side left alone first is in a clutch: when the opponents are later
+    reduced to one player too, that is not a second clutch. If both sides are left
+    alone at the same tick, both players are.
+
+    Args:
+        frames: Lazy tables of the games
+        game_state: Output of build_game_state() (default: built from frames)
+
+    Returns:
+        LazyFrame with the columns of CLUTCH_SCHEMA. kills counts the clutcher's kills
+        from the start of the clutch; won is null when the round winner is unknown.
+    """
+    if game_state is None:
+        game_state = build_game_state(frames)
+
+    starts = pl.concat([
+        game_state.filter(
+            (pl.col(f"{side}_alive") == 1) & (pl.col(f"{opponent}_alive") >= 1)
+        ).group_by(GAME_ROUND).agg(
+            pl.col("tick").min().alias("start_tick"),
+            pl.col(f"{opponent}_alive").sort_by("tick").first().alias("opponents"),
+        ).with_columns(pl.lit(side).alias("side"))
+        for side, opponent in (("t", "ct"), ("ct", "t"))
+    ]).filter(
+        pl.col("start_tick") == pl.col("start_tick").min().over(GAME_ROUND)
+    )
+
+    clutchers = starts.join(round_players(frames), on=GAME_ROUND + ["side"]).filter(
+        pl.col("death_tick").is_null() | (pl.col("death_tick") > pl.col("start_tick"))
+    )
+
+    kills = frames.event("player_death").filter(
+        pl.col("attacker_side").is_null() | (pl.col("attacker_side") != pl.col("user_side"))
+    ).select(GAME_ROUND + [pl.col("attacker_steamid").alias("player_steamid"), "tick"])
+    clutch_kills = clutchers.select(GAME_ROUND_PLAYER + ["start_tick"]).join(
+        kills, on=GAME_ROUND_PLAYER
+    ).filter(pl.col("tick") >= pl.col("start_tick")).group_by(GAME_ROUND_PLAYER).agg(
+        pl.len().cast(pl.Int64).alias("kills")
+    )
+
+    winners = frames.rounds.select(GAME_ROUND + [pl.col("winner_side").str.to_lowercase()])
+
+    return clutchers.join(clutch_kills, on=GAME_ROUND_PLAYER, how="left").join(
+        winners, on=GAME_ROUND, how="left"
+    ).with_columns(
+        pl.col("kills").fill_null(0),
+        (pl.col("winner_side") == pl.col("side")).alias("won"),
+    ).select(list(CLUTCH_SCHEMA)).cast(CLUTCH_SCHEMA).sort(GAME_ROUND_PLAYER)
+
+
+def clutch_stats(clutches: pl.LazyFrame, by: Sequence[str] = ("game_id", "player_steamid")) -> pl.LazyFrame:
+    """
+    Totals the clutches of every player.
+
+    Returns:
+        LazyFrame with the by columns, clutches, clutches_won, clutch_kills,
+        clutch_win_rate and clutches_won_1v1 to clutches_won_1v5.
+    """
+    won = pl.col("won").fill_null(False)
+    return clutches.group_by(list(by)).agg(
+        pl.len().cast(pl.Int64).alias("clutches"),
+        won.sum().cast(pl.Int64).alias("clutches_won"),
+        pl.col("kills").sum().cast(pl.Int64).alias("clutch_kills"),
+        *[
+            (won & (pl.col("opponents") == opponents)).sum().cast(pl.Int64).alias(f"clutches_won_1v{opponents}")
+            for opponents in range(1, MAX_OPPONENTS + 1)
+        ],
+    ).with_columns(
+        (pl.col("clutches_won") / pl.col("clutches")).alias("clutch_win_rate")
+    )
+
+
+def player_clutch_stats(frames: MatchFrames, clutches: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Joins the clutch totals into the stats table of every player of every game.
+
+    Players come from the tick rows, with name and team from the roster when stored.
+    Players without a clutch get zero counts and a null win rate.
+
+    Returns:
+        LazyFrame with game_id, player_steamid, name, team and the clutch_stats() columns
+    """
+    players = round_players(frames).select(["game_id", "player_steamid"]).unique().join(
+        frames.players.select(["game_id", "player_steamid", "name", "team"]).unique(["game_id", "player_steamid"]),
+        on=["game_id", "player_steamid"], how="left"
+    )
+    stats = clutch_stats(clutches)
+    counts = [name for name in stats.collect_schema().names() if name.startswith("clutch") and name != "clutch_win_rate"]
+
+    return players.join(stats, on=["game_id", "player_steamid"], how="left").with_columns(
+        pl.col(counts).fill_null(0)
+    ).sort(["game_id", "player_steamid"])
+
+
+def clutch_win_breakdown(clutches: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Marks every clutch with whether it was converted.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value (1.0 for a win) and weight.
+    """
+    return clutches.select(
+        GAME_ROUND_PLAYER + [
+            pl.col("won").fill_null(False).cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def calculate_clutches(demo) -> pl.DataFrame:
+    """Finds the clutches of a demo."""
+    return build_clutches(MatchFrames.from_demo(demo)).collect().drop("game_id")
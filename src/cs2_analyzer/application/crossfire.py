@@ -0,0 +1,144 @@
+"""
+Crossfire engine.
+
+For every tick of the opening seconds of a round, CT players whose view cone
+contains a chokepoint cover it. Two covering players form a crossfire edge when
+their lines of sight reach the chokepoint from sufficiently different directions,
+so an enemy peeking it cannot hold both angles at once. The per-tick graph is
+summarized by its node and edge counts and its density (edges over all CT pairs),
+and rolled up per round.
+
+Everything runs as one lazy polars plan of batched vector math over the tick rows;
+there is no per-tick Python.
+"""
+
+import math
+
+import polars as pl
+
+from .frames import MatchFrames
+from .geometry import view_vector_exprs
+from .metrics import GAME_ROUND, build_bombsite_centroids, build_round_ticks, living, select_window_ticks
+
+TICK_KEY = GAME_ROUND + ["tick"]
+
+DEFAULT_CROSSFIRE_WINDOW = 60
+# Largest angle between a player's view direction and a chokepoint that counts as covering it
+DEFAULT_VIEW_ANGLE = 30.0
+# Smallest angle between two sight lines at the chokepoint that counts as a crossfire
+DEFAULT_MIN_SEPARATION = 30.0
+DEFAULT_MAX_RANGE = 3000.0
+
+
+def sites_as_chokepoints(sites: pl.LazyFrame) -> pl.LazyFrame:
+    """Use bombsite centroids as the chokepoints (columns game_id, chokepoint, x, y, z)."""
+    return sites.select(["game_id", pl.col("site").alias("chokepoint"), "x", "y", "z"])
+
+
+def crossfire_by_tick(ct_ticks: pl.LazyFrame, chokepoints: pl.LazyFrame,
+                      view_angle: float = DEFAULT_VIEW_ANGLE,
+                      min_separation: float = DEFAULT_MIN_SEPARATION,
+                      max_range: float = DEFAULT_MAX_RANGE) -> pl.LazyFrame:
+    """
+    Builds the crossfire graph of every tick and chokepoint.
+
+    Args:
+        ct_ticks: CT tick rows with game_id, round_num, tick, player_steamid, X/Y/Z, yaw and pitch;
+            rows without view angles are ignored
+        chokepoints: Rows with game_id, chokepoint and x/y/z
+        view_angle: Largest view-to-chokepoint angle in degrees that counts as covering
+        min_separation: Smallest angle in degrees between two sight lines that counts as a crossfire
+        max_range: Farthest distance at which a player covers a chokepoint
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick, chokepoint, players (CTs with
+        view data), covering (graph nodes), edges and density.
+    """
+    graph_key = TICK_KEY + ["chokepoint"]
+
+    viewers = ct_ticks.filter(pl.col("yaw").is_not_null() & pl.col("pitch").is_not_null()).select(
+        TICK_KEY + ["player_steamid", "X", "Y", "Z", "yaw", "pitch"]
+    ).with_columns(view_vector_exprs())
+
+    offset = [(pl.col(target) - pl.col(source)) for target, source in (("x", "X"), ("y", "Y"), ("z", "Z"))]
+    sight = viewers.join(chokepoints.select(["game_id", "chokepoint", "x", "y", "z"]), on="game_id").with_columns(
+        *[axis.alias(f"d{name}") for axis, name in zip(offset, "xyz")]
+    ).with_columns(
+        (pl.col("dx")**2 + pl.col("dy")**2 + pl.col("dz")**2).sqrt().alias("range")
+    ).with_columns(
+        *[(pl.col(f"d{name}") / pl.col("range")).alias(f"d{name}") for name in "xyz"]
+    ).with_columns(
+        (
+            (pl.col("range") > 0) & (pl.col("range") <= max_range) &
+            (pl.col("view_x") * pl.col("dx") + pl.col("view_y") * pl.col("dy") + pl.col("view_z") * pl.col("dz")
+             >= math.cos(math.radians(view_angle)))
+        ).alias("is_covering")
+    )
+
+    covering = sight.filter("is_covering").select(graph_key + ["dx", "dy", "dz"]).with_columns(
+        pl.int_range(pl.len()).over(graph_key).alias("slot")
+    )
+    separation = (
+        pl.col("dx") * pl.col("dx_other") + pl.col("dy") * pl.col("dy_other") + pl.col("dz") * pl.col("dz_other")
+    )
+    edges = covering.join(covering, on=graph_key, suffix="_other").filter(
+        (pl.col("slot") < pl.col("slot_other")) & (separation <= math.cos(math.radians(min_separation)))
+    ).group_by(graph_key).agg(pl.len().alias("edges"))
+
+    nodes = sight.group_by(graph_key).agg(
+        pl.len().alias("players"),
+        pl.col("is_covering").sum().alias("covering")
+    )
+    pairs = pl.col("players") * (pl.col("players") - 1) / 2
+
+    return nodes.join(edges, on=graph_key, how="left").with_columns(
+        pl.col("edges").fill_null(0)
+    ).with_columns(
+        pl.when(pairs > 0).then(pl.col("edges") / pairs).otherwise(0.0).alias("density")
+    ).select(graph_key + ["players", "covering", "edges", "density"])
+
+
+def crossfire_by_round(by_tick: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Summarizes the per-tick crossfire graphs of each round and chokepoint.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, chokepoint, ticks, crossfire_ticks,
+        crossfire_share, mean_covering, max_covering, mean_edges, max_edges and mean_density.
+    """
+    return by_tick.group_by(GAME_ROUND + ["chokepoint"]).agg(
+        pl.len().alias("ticks"),
+        (pl.col("edges") > 0).sum().alias("crossfire_ticks"),
+        (pl.col("edges") > 0).mean().alias("crossfire_share"),
+        pl.col("covering").mean().alias("mean_covering"),
+        pl.col("covering").max().alias("max_covering"),
+        pl.col("edges").mean().alias("mean_edges"),
+        pl.col("edges").max().alias("max_edges"),
+        pl.col("density").mean().alias("mean_density"),
+    ).sort(GAME_ROUND + ["chokepoint"])
+
+
+def crossfire_density_breakdown(by_tick: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the crossfire graph density over each round's ticks and chokepoints.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, value and weight (tick and chokepoint rows).
+    """
+    return by_tick.group_by(GAME_ROUND).agg(
+        pl.col("density").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def calculate_crossfire_by_round(demo, window_seconds: int = DEFAULT_CROSSFIRE_WINDOW) -> pl.DataFrame:
+    """
+    Computes per-round crossfire graph statistics over the bombsites of a demo.
+
+    Returns:
+        DataFrame with one row per round and bombsite, as crossfire_by_round without game_id
+    """
+    frames = MatchFrames.from_demo(demo)
+    ct_ticks = select_window_ticks(build_round_ticks(frames), window_seconds).filter(living("ct"))
+    chokepoints = sites_as_chokepoints(build_bombsite_centroids(frames))
+    return crossfire_by_round(crossfire_by_tick(ct_ticks, chokepoints)).collect().drop("game_id")
@@ -0,0 +1,178 @@
+"""
+Damage statistics from player_hurt events.
+
+player_hurt reports the damage a hit would do, not the health it took: a 140 damage
+AWP shot on a 40 HP player is worth 40. capped_damage() caps every hit at the
+victim's remaining health with one cumulative sum per victim and round: the health
+taken by hit i is min(S_i, 100) - min(S_{i-1}, 100), where S_i is the running sum
+of raw damage. Players are not healed during a competitive round, so the running
+sum is exact.
+
+ADR, damage per weapon, utility damage and the attacker x victim damage matrix are
+group_bys over the capped hits, so a whole season of hurt events from the Parquet
+store is one lazy plan.
+"""
+
+from typing import Sequence
+
+import polars as pl
+
+from .frames import MatchFrames
+from .metrics import GAME_ROUND, GAME_ROUND_PLAYER
+
+MAX_HEALTH = 100
+
+# Weapons whose damage counts as utility damage
+UTILITY_WEAPONS = ["hegrenade", "inferno", "molotov", "incgrenade"]
+
+DAMAGE_STATS_SCHEMA = {
+    "player_steamid": pl.Int64,
+    "rounds": pl.Int64,
+    "damage": pl.Int64,
+    "utility_damage": pl.Int64,
+    "team_damage": pl.Int64,
+    "adr": pl.Float64,
+    "utility_adr": pl.Float64,
+}
+
+
+def _enemy_damage() -> pl.Expr:
+    """Builds an expression that is true for hits by a player on an enemy."""
+    team_hit = (pl.col("attacker_side") == pl.col("user_side")).fill_null(False)
+    return pl.col("attacker_steamid").is_not_null() & (pl.col("attacker_steamid") != pl.col("user_steamid")) & ~team_hit
+
+
+def _utility() -> pl.Expr:
+    """Builds an expression that is true for hits by grenades or fire."""
+    return pl.col("weapon").str.strip_prefix("weapon_").is_in(UTILITY_WEAPONS)
+
+
+def capped_damage(player_hurt: pl.LazyFrame, max_health: int = MAX_HEALTH) -> pl.LazyFrame:
+    """
+    Caps every hit at the victim's remaining health.
+
+    Returns:
+        The player_hurt rows with an added damage column (Int64), the health the hit took
+    """
+    raw = pl.col("dmg_health").fill_null(0).clip(lower_bound=0)
+    dealt = pl.col("dealt")
+    return player_hurt.with_columns(
+        raw.cum_sum().over(GAME_ROUND + ["user_steamid"], order_by="tick").alias("dealt")
+    ).with_columns(
+        # The running sum before the hit is the running sum after it minus the hit
+        (dealt.clip(upper_bound=max_health) - (dealt - raw).clip(upper_bound=max_health)).cast(pl.Int64).alias("damage")
+    ).drop("dealt")
+
+
+def damage_matrix(damage: pl.LazyFrame, by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Totals the damage of every attacker on every enemy.
+
+    Args:
+        damage: Output of capped_damage()
+        by: Keys to total by besides the pair, e.g. () for totals over all games
+
+    Returns:
+        LazyFrame with the by columns, attacker_steamid, victim_steamid, damage and hits
+    """
+    keys = list(by) + ["attacker_steamid", "victim_steamid"]
+    return damage.filter(_enemy_damage()).rename({"user_steamid": "victim_steamid"}).group_by(keys).agg(
+        pl.col("damage").sum().cast(pl.Int64),
+        pl.len().cast(pl.Int64).alias("hits"),
+    ).sort(keys)
+
+
+def damage_by_weapon(damage: pl.LazyFrame, by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Totals every player's enemy damage per weapon.
+
+    Returns:
+        LazyFrame with the by columns, player_steamid, weapon, damage and hits
+    """
+    keys = list(by) + ["player_steamid", "weapon"]
+    return damage.filter(_enemy_damage()).with_columns(
+        pl.col("attacker_steamid").alias("player_steamid"),
+        pl.col("weapon").str.strip_prefix("weapon_"),
+    ).group_by(keys).agg(
+        pl.col("damage").sum().cast(pl.Int64),
+        pl.len().cast(pl.Int64).alias("hits"),
+    ).sort(keys)
+
+
+def damage_stats(damage: pl.LazyFrame, round_players: pl.LazyFrame,
+                 by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Computes every player's damage per round.
+
+    A player's rounds are the rounds they played, as in adr_breakdown(), so the ADR
+    here equals the registered adr metric.
+
+    Args:
+        damage: Output of capped_damage()
+        round_players: MatchFrames.round_players, the players of every round
+        by: Keys to total by besides the player: ("game_id",) or () for totals over all games
+
+    Returns:
+        LazyFrame with the by columns and the columns of DAMAGE_STATS_SCHEMA
+    """
+    by = list(by)
+    keys = by + ["player_steamid"]
+
+    enemy = _enemy_damage()
+    team = pl.col("attacker_steamid").is_not_null() & (pl.col("attacker_steamid") != pl.col("user_steamid")) & ~enemy
+    hit = pl.col("damage")
+    totals = damage.filter(pl.col("attacker_steamid").is_not_null()).select(
+        "game_id",
+        pl.col("attacker_steamid").alias("player_steamid"),
+        pl.when(enemy).then(hit).otherwise(0).alias("damage"),
+        pl.when(enemy & _utility()).then(hit).otherwise(0).alias("utility_damage"),
+        pl.when(team).then(hit).otherwise(0).alias("team_damage"),
+    ).group_by(["game_id", "player_steamid"]).sum()
+
+    played = round_players.group_by(["game_id", "player_steamid"]).agg(pl.len().cast(pl.Int64).alias("rounds"))
+    per_game = played.join(totals, on=["game_id", "player_steamid"], how="full", coalesce=True)
+    counts = ["rounds", "damage", "utility_damage", "team_damage"]
+
+    return per_game.group_by(keys).agg(
+        pl.col(counts).fill_null(0).sum().cast(pl.Int64)
+    ).with_columns(
+        pl.when(pl.col("rounds") > 0).then(pl.col("damage") / pl.col("rounds")).alias("adr"),
+        pl.when(pl.col("rounds") > 0).then(pl.col("utility_damage") / pl.col("rounds")).alias("utility_adr"),
+    ).select(by + list(DAMAGE_STATS_SCHEMA)).sort(keys)
+
+
+def adr_breakdown(alive_intervals: pl.LazyFrame, damage: pl.LazyFrame, utility_only: bool = False) -> pl.LazyFrame:
+    """
+    Totals every player's enemy damage in each round they played.
+
+    Args:
+        alive_intervals: Output of metrics.build_alive_intervals(), the players of every round
+        damage: Output of capped_damage()
+        utility_only: Only count grenade and fire damage
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value (damage) and weight.
+        Players without damage in a round they played get 0.
+    """
+    hits = damage.filter(_enemy_damage() & _utility() if utility_only else _enemy_damage())
+    per_round = hits.group_by(GAME_ROUND + [pl.col("attacker_steamid").alias("player_steamid")]).agg(
+        pl.col("damage").sum().alias("damage")
+    )
+
+    return alive_intervals.select(GAME_ROUND_PLAYER).join(per_round, on=GAME_ROUND_PLAYER, how="left").select(
+        GAME_ROUND_PLAYER + [
+            pl.col("damage").fill_null(0).cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def calculate_damage_stats(demo) -> pl.DataFrame:
+    """Computes the damage per round of every player of a demo."""
+    frames = MatchFrames.from_demo(demo)
+    return damage_stats(capped_damage(frames.event("player_hurt")), frames.round_players, by=()).collect()
+
+
+def calculate_damage_matrix(demo) -> pl.DataFrame:
+    """Computes the attacker x victim damage totals of a demo."""
+    return damage_matrix(capped_damage(MatchFrames.from_demo(demo).event("player_hurt")), by=()).collect()
@@ -6,9 +6,12 @@ maximally compressed text format with legend/index system.
 """
 
 from typing import Dict, List, Tuple
+import numpy as np
 import polars as pl
 from dataclasses import dataclass
 
+from .geometry import displacements
+
 
 @dataclass
 class CompactGameState:
@@ -220,7 +223,6 @@ class DeltaEncoder:
 
         # Group by player
         player_lines = []
-        last_state = {}  # steamid -> last position
 
         for steamid in sampled['steamid'].unique():
             player_data = sampled.filter(pl.col('steamid') == steamid)
@@ -229,27 +231,21 @@ class DeltaEncoder:
                 continue
 
             player_idx = self.player_index[steamid]['idx']
-            positions = []
-
-            for row in player_data.iter_rows(named=True):
-                tick = row['tick']
-                x, y, z = int(row['X']), int(row['Y']), int(row['Z'])
-
-                if steamid not in last_state:
-                    # First position - absolute (no yaw/pitch in CS2 awpy data)
-                    positions.append(f"{tick}:{x},{y},{z}")
-                    last_state[steamid] = (x, y, z)
-                else:
-                    # Delta encoding
-                    last_x, last_y, last_z = last_state[steamid]
-                    dx = x - last_x
-                    dy = y - last_y
-                    dz = z - last_z
-
-                    # Only include if there's movement
-                    if dx != 0 or dy != 0 or dz != 0:
-                        positions.append(f"{tick}:{dx:+d},{dy:+d},{dz:+d}")
-                        last_state[steamid] = (x, y, z)
+            ticks = player_data['tick'].to_numpy()
+            coords = player_data.select(
+                pl.col('X').cast(pl.Int64), pl.col('Y').cast(pl.Int64), pl.col('Z').cast(pl.Int64)
+            ).to_numpy()
+
+            # First position absolute (no yaw/pitch in CS2 awpy data), then deltas.
+            # Stationary samples are skipped; since a skipped sample equals the last
+            # emitted one, the delta to the previous sample is the delta to the last emitted.
+            x, y, z = coords[0]
+            positions = [f"{ticks[0]}:{x},{y},{z}"]
+            deltas = displacements(coords)
+            moved = np.flatnonzero(deltas.any(axis=1))
+            for i in moved:
+                dx, dy, dz = deltas[i]
+                positions.append(f"{ticks[i + 1]}:{dx:+d},{dy:+d},{dz:+d}")
 
             if positions:
                 player_lines.append(f"P{player_idx} {' '.join(positions)}")
@@ -0,0 +1,198 @@
+"""
+Duel statistics from player_death events.
+
+Who killed whom, who won the opening duel of each round, how many rounds a player
+killed two or more enemies in and how many kills were headshots are all group_bys
+over the player_death table. This module computes them as lazy plans keyed by
+steamid, so the same code serves a single demo (the digest), the compact-file
+tactical report and cross-game aggregates over a Parquet store scan.
+
+Suicides and team kills count as deaths but not as kills.
+"""
+
+from typing import Sequence
+
+import polars as pl
+
+from .frames import MatchFrames
+from .metrics import GAME_ROUND, GAME_ROUND_PLAYER
+
+# Rounds with exactly this many kills count as multi-kill rounds; the last also counts more kills
+MULTI_KILLS = (2, 3, 4, 5)
+
+DUEL_STATS_SCHEMA = {
+    "player_steamid": pl.Int64,
+    "kills": pl.Int64,
+    "deaths": pl.Int64,
+    "headshot_kills": pl.Int64,
+    "headshot_rate": pl.Float64,
+    "opening_wins": pl.Int64,
+    "opening_losses": pl.Int64,
+    "opening_win_rate": pl.Float64,
+    **{f"rounds_{count}k": pl.Int64 for count in MULTI_KILLS},
+}
+
+
+def _is_kill() -> pl.Expr:
+    """Builds an expression that is true for deaths by an attacker other than the victim, not a teammate."""
+    team_kill = (pl.col("attacker_side") == pl.col("user_side")).fill_null(False)
+    return pl.col("attacker_steamid").is_not_null() & (pl.col("attacker_steamid") != pl.col("user_steamid")) & ~team_kill
+
+
+def kill_events(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Selects the deaths that count as kills.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick, attacker_steamid, victim_steamid and headshot.
+    """
+    return player_deaths.filter(_is_kill()).select(
+        GAME_ROUND + ["tick", "attacker_steamid", pl.col("user_steamid").alias("victim_steamid"),
+                      pl.col("headshot").fill_null(False)]
+    )
+
+
+def kill_matrix(player_deaths: pl.LazyFrame, by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Counts the kills of every attacker on every victim.
+
+    Args:
+        player_deaths: player_death events
+        by: Keys to count by besides the pair, e.g. () for totals over all games
+
+    Returns:
+        LazyFrame with the by columns, attacker_steamid, victim_steamid, kills and headshots
+    """
+    keys = list(by) + ["attacker_steamid", "victim_steamid"]
+    return kill_events(player_deaths).group_by(keys).agg(
+        pl.len().cast(pl.Int64).alias("kills"),
+        pl.col("headshot").sum().cast(pl.Int64).alias("headshots"),
+    ).sort(keys)
+
+
+def opening_duels(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Lists the first death of every round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick, winner_steamid, loser_steamid and
+        loser_side. winner_steamid is null when the first death is not a kill.
+    """
+    return player_deaths.group_by(GAME_ROUND).agg(
+        pl.col(["tick", "attacker_steamid", "user_steamid", "attacker_side", "user_side"]).sort_by("tick").first()
+    ).select(
+        GAME_ROUND + ["tick", pl.when(_is_kill()).then(pl.col("attacker_steamid")).alias("winner_steamid"),
+                      pl.col("user_steamid").alias("loser_steamid"), pl.col("user_side").alias("loser_side")]
+    )
+
+
+def round_kills(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Counts every player's kills in every round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, kills and headshot_kills.
+    """
+    return kill_events(player_deaths).group_by(
+        GAME_ROUND + [pl.col("attacker_steamid").alias("player_steamid")]
+    ).agg(
+        pl.len().cast(pl.Int64).alias("kills"),
+        pl.col("headshot").sum().cast(pl.Int64).alias("headshot_kills"),
+    )
+
+
+def duel_stats(player_deaths: pl.LazyFrame, by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Computes the duel statistics of every player.
+
+    Args:
+        player_deaths: player_death events
+        by: Keys to total by besides the player, e.g. () for totals over all games
+
+    Returns:
+        LazyFrame with the by columns and the columns of DUEL_STATS_SCHEMA, one row per
+        player who killed or died. Rates are null without kills or opening duels.
+    """
+    by = list(by)
+    keys = by + ["player_steamid"]
+
+    per_round = round_kills(player_deaths)
+    kills = per_round.group_by(keys).agg(
+        pl.col("kills").sum(),
+        pl.col("headshot_kills").sum(),
+        *[
+            (pl.col("kills") >= count if count == MULTI_KILLS[-1] else pl.col("kills") == count)
+            .sum().cast(pl.Int64).alias(f"rounds_{count}k")
+            for count in MULTI_KILLS
+        ],
+    )
+    deaths = player_deaths.filter(pl.col("user_steamid").is_not_null()).group_by(
+        by + [pl.col("user_steamid").alias("player_steamid")]
+    ).agg(pl.len().cast(pl.Int64).alias("deaths"))
+
+    openings = opening_duels(player_deaths)
+    opening_wins = openings.filter(pl.col("winner_steamid").is_not_null()).group_by(
+        by + [pl.col("winner_steamid").alias("player_steamid")]
+    ).agg(pl.len().cast(pl.Int64).alias("opening_wins"))
+    opening_losses = openings.filter(pl.col("winner_steamid").is_not_null()).group_by(
+        by + [pl.col("loser_steamid").alias("player_steamid")]
+    ).agg(pl.len().cast(pl.Int64).alias("opening_losses"))
+
+    players = pl.concat([kills.select(keys), deaths.select(keys)]).unique()
+    counts = [name for name, dtype in DUEL_STATS_SCHEMA.items() if dtype == pl.Int64 and name != "player_steamid"]
+
+    stats = players
+    for table in (kills, deaths, opening_wins, opening_losses):
+        stats = stats.join(table, on=keys, how="left", nulls_equal=True)
+
+    return stats.with_columns(pl.col(counts).fill_null(0)).with_columns(
+        pl.when(pl.col("kills") > 0).then(pl.col("headshot_kills") / pl.col("kills")).alias("headshot_rate"),
+        pl.when(pl.col("opening_wins") + pl.col("opening_losses") > 0).then(
+            pl.col("opening_wins") / (pl.col("opening_wins") + pl.col("opening_losses"))
+        ).alias("opening_win_rate"),
+    ).select(by + list(DUEL_STATS_SCHEMA)).sort(keys)
+
+
+def opening_duel_breakdown(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Marks the T player of every opening duel with whether the T side won it.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value (1.0 for a T win) and weight.
+    """
+    duels = opening_duels(player_deaths).filter(
+        pl.col("winner_steamid").is_not_null() & pl.col("loser_side").is_in(["t", "ct"])
+    )
+    t_lost = pl.col("loser_side") == "t"
+    return duels.select(
+        GAME_ROUND + [
+            pl.when(t_lost).then(pl.col("loser_steamid")).otherwise(pl.col("winner_steamid")).alias("player_steamid"),
+            (~t_lost).cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def headshot_rate_breakdown(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Computes every player's headshot share of their kills in each round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value and weight (kills).
+    """
+    return round_kills(player_deaths).select(
+        GAME_ROUND_PLAYER + [
+            (pl.col("headshot_kills") / pl.col("kills")).alias("value"),
+            pl.col("kills").cast(pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def calculate_duel_stats(demo) -> pl.DataFrame:
+    """Computes the duel statistics of every player of a demo."""
+    return duel_stats(MatchFrames.from_demo(demo).event("player_death"), by=()).collect()
+
+
+def calculate_kill_matrix(demo) -> pl.DataFrame:
+    """Computes the attacker x victim kill counts of a demo."""
+    return kill_matrix(MatchFrames.from_demo(demo).event("player_death"), by=()).collect()
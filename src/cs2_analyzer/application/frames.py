@@ -0,0 +1,318 @@
+"""
+Lazy table bundle that metric query plans run on.
+
+MatchFrames holds one polars LazyFrame per table, keyed by game_id, so the same
+metric plan runs over a single in-memory demo or over many games scanned from the
+Parquet store. Filters applied with `where` are pushed down into the Parquet reader.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, Optional
+
+import polars as pl
+
+
+GAME_SCHEMA = {"game_id": pl.String, "map_name": pl.String, "tickrate": pl.Int64, "timestamp": pl.Datetime("us")}
+
+ROUND_SCHEMA = {"game_id": pl.String, "round_num": pl.Int64, "freeze_end": pl.Int64, "winner_side": pl.String}
+
+TICK_SCHEMA = {
+    "game_id": pl.String,
+    "round_num": pl.Int64,
+    "tick": pl.Int64,
+    "player_steamid": pl.Int64,
+    "side": pl.String,
+    "X": pl.Float64,
+    "Y": pl.Float64,
+    "Z": pl.Float64,
+    "yaw": pl.Float64,
+    "pitch": pl.Float64,
+    "place": pl.String,
+}
+
+EVENT_SCHEMA = {"game_id": pl.String, "round_num": pl.Int64, "tick": pl.Int64}
+
+GRENADE_SCHEMA = {
+    **EVENT_SCHEMA,
+    "user_steamid": pl.Int64,
+    "user_side": pl.String,
+    "x": pl.Float64,
+    "y": pl.Float64,
+    "z": pl.Float64,
+}
+
+# Columns the metric plans read from specific events. A dtype of None keeps the source dtype.
+EVENT_SCHEMAS = {
+    "player_death": {
+        **EVENT_SCHEMA,
+        "user_steamid": pl.Int64,
+        "attacker_steamid": pl.Int64,
+        "user_side": pl.String,
+        "attacker_side": pl.String,
+        "headshot": pl.Boolean,
+    },
+    "bomb_planted": {
+        **EVENT_SCHEMA,
+        "user_steamid": pl.Int64,
+        "site": None,
+        "user_X": pl.Float64,
+        "user_Y": pl.Float64,
+        "user_Z": pl.Float64,
+    },
+    "player_blind": {
+        **EVENT_SCHEMA,
+        "user_steamid": pl.Int64,
+        "attacker_steamid": pl.Int64,
+        "user_side": pl.String,
+        "attacker_side": pl.String,
+        "blind_duration": pl.Float64,
+    },
+    "flashbang_detonate": {**GRENADE_SCHEMA},
+    "smokegrenade_detonate": {**GRENADE_SCHEMA},
+    "hegrenade_detonate": {**GRENADE_SCHEMA},
+    "inferno_startburn": {
+        **EVENT_SCHEMA,
+        "entityid": pl.Int64,
+        "user_steamid": pl.Int64,
+        "user_side": pl.String,
+        "x": pl.Float64,
+        "y": pl.Float64,
+        "z": pl.Float64,
+    },
+    "inferno_expire": {**EVENT_SCHEMA, "entityid": pl.Int64},
+    "player_hurt": {
+        **EVENT_SCHEMA,
+        "user_steamid": pl.Int64,
+        "attacker_steamid": pl.Int64,
+        "user_side": pl.String,
+        "attacker_side": pl.String,
+        "weapon": pl.String,
+        "dmg_health": pl.Int64,
+    },
+    "item_pickup": {**EVENT_SCHEMA, "user_steamid": pl.Int64, "item": pl.String},
+    "weapon_fire": {**EVENT_SCHEMA, "user_steamid": pl.Int64, "weapon": pl.String},
+}
+
+SITE_SCHEMA = {
+    "game_id": pl.String,
+    "site": pl.String,
+    "x": pl.Float64,
+    "y": pl.Float64,
+    "z": pl.Float64,
+    "radius": pl.Float64,
+}
+
+PLAYER_SCHEMA = {"game_id": pl.String, "player_steamid": pl.Int64, "name": pl.String, "team": pl.String}
+
+ROUND_PLAYER_SCHEMA = {"game_id": pl.String, "round_num": pl.Int64, "player_steamid": pl.Int64, "side": pl.String}
+
+SPAWN_SCHEMA = {"game_id": pl.String, "side": pl.String, "x": pl.Float64, "y": pl.Float64, "z": pl.Float64}
+
+DEFAULT_SITE_RADIUS = 200.0
+
+
+def conform(frame: pl.LazyFrame, schema: Dict[str, Optional[pl.DataType]]) -> pl.LazyFrame:
+    """
+    Make a LazyFrame provide the columns of a schema.
+
+    Missing columns are added as typed nulls and present columns are cast when their
+    dtype differs. Extra columns are kept.
+    """
+    existing = frame.collect_schema()
+    columns = []
+    for name, dtype in schema.items():
+        if name not in existing:
+            columns.append(pl.lit(None, dtype=dtype or pl.Null).alias(name))
+        elif dtype is not None and existing[name] != dtype:
+            columns.append(pl.col(name).cast(dtype, strict=False))
+
+    return frame.with_columns(columns) if columns else frame
+
+
+def empty_frame(schema: Dict[str, Optional[pl.DataType]]) -> pl.LazyFrame:
+    """An empty LazyFrame with the columns of a schema."""
+    return pl.LazyFrame(schema={name: dtype or pl.Null for name, dtype in schema.items()})
+
+
+def assign_round_num(events: pl.LazyFrame, rounds: pl.LazyFrame, start_col: str = "freeze_end") -> pl.LazyFrame:
+    """Assigns each event to the last round of its game that started at or before its tick."""
+    round_starts = rounds.select(["game_id", "round_num", pl.col(start_col).alias("round_start")]).sort("round_start")
+
+    return events.drop("round_num", strict=False).sort("tick").join_asof(
+        round_starts, left_on="tick", right_on="round_start", by="game_id", strategy="backward",
+        check_sortedness=False
+    ).drop("round_start")
+
+
+def build_round_players(ticks: pl.LazyFrame) -> pl.LazyFrame:
+    """Lists the players of every round, with their side, from the players seen in its ticks."""
+    return ticks.filter(pl.col("player_steamid").is_not_null()).select(list(ROUND_PLAYER_SCHEMA)).unique(
+        ["game_id", "round_num", "player_steamid"], keep="first", maintain_order=True
+    )
+
+
+def estimate_spawns(ticks: pl.LazyFrame, rounds: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Estimates each side's spawn point from player positions at the start of rounds.
+
+    Uses the first tick at or after freeze end of every round and averages the
+    positions of each side over all rounds of a game.
+    """
+    round_starts = ticks.join(
+        rounds.select(["game_id", "round_num", "freeze_end"]), on=["game_id", "round_num"]
+    ).filter(pl.col("tick") >= pl.col("freeze_end"))
+
+    first_ticks = round_starts.filter(
+        pl.col("tick") == pl.col("tick").min().over(["game_id", "round_num"])
+    )
+
+    return first_ticks.filter(pl.col("side").is_in(["t", "ct"])).group_by(["game_id", "side"]).agg(
+        pl.mean("X").alias("x"),
+        pl.mean("Y").alias("y"),
+        pl.mean("Z").alias("z"),
+    ).select(list(SPAWN_SCHEMA))
+
+
+@dataclass(frozen=True)
+class MatchFrames:
+    """
+    Lazy tables of one or more games.
+
+    Attributes:
+        games: One row per game with game_id, map_name, tickrate and timestamp
+        rounds: One row per round with game_id, round_num, freeze_end and winner_side
+        ticks: Player positions with game_id, round_num, tick, player_steamid, side, X/Y/Z and yaw/pitch
+        events: Event tables keyed by event name, each with game_id, round_num and tick
+        sites: Bombsite zones with game_id, site, x/y/z and radius
+        spawns: Spawn points with game_id, side and x/y/z
+        players: Roster with game_id, player_steamid, name and team
+        round_players: Players of every round with game_id, round_num, player_steamid and side
+    """
+    games: pl.LazyFrame
+    rounds: pl.LazyFrame
+    ticks: pl.LazyFrame
+    events: Dict[str, pl.LazyFrame] = field(default_factory=dict)
+    sites: pl.LazyFrame = field(default_factory=lambda: empty_frame(SITE_SCHEMA))
+    spawns: pl.LazyFrame = field(default_factory=lambda: empty_frame(SPAWN_SCHEMA))
+    players: pl.LazyFrame = field(default_factory=lambda: empty_frame(PLAYER_SCHEMA))
+    round_players: pl.LazyFrame = field(default_factory=lambda: empty_frame(ROUND_PLAYER_SCHEMA))
+
+    def event(self, name: str) -> pl.LazyFrame:
+        """Return an event table, or an empty one with its schema if the event is missing."""
+        schema = EVENT_SCHEMAS.get(name, EVENT_SCHEMA)
+        if name not in self.events:
+            return empty_frame(schema)
+        return conform(self.events[name], schema)
+
+    def where(self, game_ids: Optional[Iterable[str]] = None, rounds: Optional[Iterable[int]] = None,
+              sides: Optional[Iterable[str]] = None) -> "MatchFrames":
+        """
+        Restrict every table to some games, rounds and tick sides.
+
+        The filters are lazy, so over a Parquet scan they become reader predicates.
+        """
+        frames = self
+        if game_ids is not None:
+            game_filter = pl.col("game_id").is_in(list(game_ids))
+            frames = replace(
+                frames,
+                games=frames.games.filter(game_filter),
+                rounds=frames.rounds.filter(game_filter),
+                ticks=frames.ticks.filter(game_filter),
+                events={name: event.filter(game_filter) for name, event in frames.events.items()},
+                sites=frames.sites.filter(game_filter),
+                spawns=frames.spawns.filter(game_filter),
+                players=frames.players.filter(game_filter),
+                round_players=frames.round_players.filter(game_filter)
+            )
+        if rounds is not None:
+            round_filter = pl.col("round_num").is_in(list(rounds))
+            frames = replace(
+                frames,
+                rounds=frames.rounds.filter(round_filter),
+                ticks=frames.ticks.filter(round_filter),
+                events={name: event.filter(round_filter) for name, event in frames.events.items()},
+                round_players=frames.round_players.filter(round_filter)
+            )
+        if sides is not None:
+            side_filter = pl.col("side").is_in(list(sides))
+            frames = replace(frames, ticks=frames.ticks.filter(side_filter),
+                             round_players=frames.round_players.filter(side_filter))
+        return frames
+
+    @classmethod
+    def from_demo(cls, demo, game_id: str = "demo") -> "MatchFrames":
+        """
+        Wrap a parsed demo.
+
+        Args:
+            demo: Parsed demo (awpy Demo or any object with the same attributes)
+            game_id: Identifier used for the game_id column of every table
+
+        Returns:
+            MatchFrames over the demo's in-memory tables
+        """
+        header = getattr(demo, "header", None) or {}
+        games = pl.LazyFrame(
+            {
+                "game_id": [game_id],
+                "map_name": [header.get("map_name", "unknown")],
+                "tickrate": [getattr(demo, "tickrate", None) or 64],
+                "timestamp": [None],
+            },
+            schema=GAME_SCHEMA
+        )
+
+        with_game_id = pl.lit(game_id).alias("game_id")
+
+        rounds_df = getattr(demo, "rounds", None)
+        rounds_df = rounds_df if rounds_df is not None else pl.DataFrame(schema={"round_num": pl.Int64})
+        rounds = conform(rounds_df.lazy().with_columns(with_game_id), ROUND_SCHEMA)
+        start_col = "start" if "start" in rounds_df.columns else "freeze_end"
+
+        ticks_df = getattr(demo, "ticks", None)
+        ticks_df = ticks_df if ticks_df is not None else pl.DataFrame(schema={"round_num": pl.Int64})
+        if "player_steamid" not in ticks_df.columns and "steamid" in ticks_df.columns:
+            ticks_df = ticks_df.rename({"steamid": "player_steamid"})
+        ticks = conform(ticks_df.lazy().with_columns(with_game_id), TICK_SCHEMA)
+
+        events = {}
+        for name, event_df in (getattr(demo, "events", None) or {}).items():
+            if event_df is None:
+                continue
+            event = event_df.lazy().with_columns(with_game_id)
+            if "round_num" not in event_df.columns and "tick" in event_df.columns:
+                event = assign_round_num(event, rounds, start_col)
+            events[name] = conform(event, EVENT_SCHEMAS.get(name, EVENT_SCHEMA))
+
+        bombsite_locations = getattr(demo, "bombsite_locations", None) or {}
+        sites = pl.LazyFrame(
+            {
+                "game_id": [game_id] * len(bombsite_locations),
+                "site": list(bombsite_locations),
+                "x": [loc["x"] for loc in bombsite_locations.values()],
+                "y": [loc["y"] for loc in bombsite_locations.values()],
+                "z": [loc["z"] for loc in bombsite_locations.values()],
+                "radius": [loc.get("radius", DEFAULT_SITE_RADIUS) for loc in bombsite_locations.values()],
+            },
+            schema=SITE_SCHEMA
+        )
+
+        spawn_points = {
+            side: point for side, point in
+            (("t", getattr(demo, "t_spawn", None)), ("ct", getattr(demo, "ct_spawn", None)))
+            if point
+        }
+        spawns = pl.LazyFrame(
+            {
+                "game_id": [game_id] * len(spawn_points),
+                "side": list(spawn_points),
+                "x": [point["x"] for point in spawn_points.values()],
+                "y": [point["y"] for point in spawn_points.values()],
+                "z": [point["z"] for point in spawn_points.values()],
+            },
+            schema=SPAWN_SCHEMA
+        )
+
+        return cls(games=games, rounds=rounds, ticks=ticks, events=events, sites=sites, spawns=spawns,
+                   round_players=build_round_players(ticks))
@@ -0,0 +1,253 @@
+"""
+Game-state timeline of every round.
+
+Clutch, retake and trade analyses all ask the same question: how many players of
+each side are alive, is the bomb planted and how much time is left at some tick.
+Instead of re-filtering the event tables for every question, build_game_state()
+event-sources one compact timeline per round: a row at freeze end with the rosters,
+then a row at every tick a player dies or the bomb is planted, defused or explodes.
+The state columns are cumulative sums of those changes, so a round of a few thousand
+ticks has at most a dozen rows.
+
+The state at any tick is the last timeline row at or before it. state_at() looks it
+up for a whole table of ticks with an as-of join; GameStateIndex holds the timeline
+as sorted arrays and answers lookups with a binary search (numpy searchsorted), which
+is O(log n) per query for callers outside polars plans.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import polars as pl
+
+from .frames import MatchFrames
+from .metrics import GAME_ROUND
+
+STATE_KEY = GAME_ROUND + ["tick"]
+
+# Seconds of the round clock after freeze end and of the bomb timer after the plant
+ROUND_TIME = 115.0
+BOMB_TIMER = 40.0
+
+BOMB_EVENTS = {"bomb_planted": "bomb_planted", "bomb_defused": "bomb_defused", "bomb_exploded": "bomb_exploded"}
+
+STATE_SCHEMA = {
+    "game_id": pl.String,
+    "round_num": pl.Int64,
+    "tick": pl.Int64,
+    "ct_alive": pl.Int64,
+    "t_alive": pl.Int64,
+    "man_advantage": pl.Int64,
+    "bomb_planted": pl.Boolean,
+    "bomb_defused": pl.Boolean,
+    "bomb_exploded": pl.Boolean,
+    "clock_tick": pl.Int64,
+    "clock_seconds": pl.Float64,
+    "tickrate": pl.Int64,
+}
+
+STATE_COLUMNS = ["ct_alive", "t_alive", "man_advantage", "bomb_planted", "bomb_defused", "bomb_exploded"]
+
+# Round index and tick are packed into one sortable int64 key
+TICK_SPAN = 1 << 32
+
+
+def round_players(frames: MatchFrames) -> pl.LazyFrame:
+    """
+    Lists the players of each side in every round with the tick they died, if they did.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, side and death_tick.
+    """
+    deaths = frames.event("player_death").group_by(
+        GAME_ROUND + [pl.col("user_steamid").alias("player_steamid")]
+    ).agg(pl.col("tick").min().alias("death_tick"))
+
+    return frames.ticks.filter(pl.col("side").is_in(["t", "ct"])).select(
+        GAME_ROUND + ["player_steamid", "side"]
+    ).unique(GAME_ROUND + ["player_steamid"]).join(
+        deaths, on=GAME_ROUND + ["player_steamid"], how="left"
+    )
+
+
+def build_game_state(frames: MatchFrames, round_time: float = ROUND_TIME,
+                     bomb_timer: float = BOMB_TIMER) -> pl.LazyFrame:
+    """
+    Builds the state timeline of every round.
+
+    Each row holds the state from its tick until the next row of the round. The
+    clock counts down clock_seconds from clock_tick: the round time from freeze end
+    until the plant, then the bomb timer.
+
+    Args:
+        frames: Lazy tables of the games
+        round_time: Seconds of the round clock
+        bomb_timer: Seconds from plant to detonation
+
+    Returns:
+        LazyFrame with the columns of STATE_SCHEMA, sorted by game_id, round_num and tick
+    """
+    players = round_players(frames)
+    changes = [
+        frames.rounds.select(GAME_ROUND + [pl.col("freeze_end").alias("tick")]).join(
+            players.group_by(GAME_ROUND).agg(
+                (pl.col("side") == "ct").sum().cast(pl.Int64).alias("ct_alive"),
+                (pl.col("side") == "t").sum().cast(pl.Int64).alias("t_alive"),
+            ), on=GAME_ROUND, how="left"
+        ),
+        players.filter(pl.col("death_tick").is_not_null()).select(
+            GAME_ROUND + [
+                pl.col("death_tick").alias("tick"),
+                -(pl.col("side") == "ct").cast(pl.Int64).alias("ct_alive"),
+                -(pl.col("side") == "t").cast(pl.Int64).alias("t_alive"),
+            ]
+        ),
+    ]
+
+    # Only the first of each bomb event counts
+    bomb_ticks = frames.rounds.select(GAME_ROUND)
+    for event, column in BOMB_EVENTS.items():
+        first = frames.event(event).group_by(GAME_ROUND).agg(pl.col("tick").min().alias(f"{column}_tick"))
+        changes.append(first.select(GAME_ROUND + [pl.col(f"{column}_tick").alias("tick"),
+                                                  pl.lit(1, dtype=pl.Int64).alias(column)]))
+        bomb_ticks = bomb_ticks.join(first, on=GAME_ROUND, how="left")
+
+    clocks = frames.rounds.select(GAME_ROUND + ["freeze_end"]).join(
+        bomb_ticks.select(GAME_ROUND + ["bomb_planted_tick"]), on=GAME_ROUND, how="left"
+    ).join(frames.games.select(["game_id", "tickrate"]), on="game_id", how="left")
+
+    planted = pl.col("bomb_planted")
+    return pl.concat(changes, how="diagonal").group_by(STATE_KEY).agg(
+        pl.col(column).fill_null(0).sum() for column in ["ct_alive", "t_alive", *BOMB_EVENTS.values()]
+    ).sort(STATE_KEY).with_columns(
+        pl.col(["ct_alive", "t_alive", *BOMB_EVENTS.values()]).cum_sum().over(GAME_ROUND)
+    ).with_columns(
+        (pl.col("ct_alive") - pl.col("t_alive")).alias("man_advantage"),
+        *[(pl.col(column) > 0).alias(column) for column in BOMB_EVENTS.values()],
+    ).join(clocks, on=GAME_ROUND, how="left").with_columns(
+        pl.when(planted).then(pl.col("bomb_planted_tick")).otherwise(pl.col("freeze_end")).alias("clock_tick"),
+        pl.when(planted).then(pl.lit(bomb_timer)).otherwise(pl.lit(round_time)).alias("clock_seconds"),
+    ).select(list(STATE_SCHEMA)).cast(STATE_SCHEMA)
+
+
+def time_left(tick: str = "tick") -> pl.Expr:
+    """Builds an expression for the seconds left on the clock of a state at a tick, floored at zero."""
+    elapsed = (pl.col(tick) - pl.col("clock_tick")) / pl.col("tickrate")
+    return (pl.col("clock_seconds") - elapsed).clip(lower_bound=0.0).alias("time_left")
+
+
+def state_at(game_state: pl.LazyFrame, queries: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Looks up the game state at the tick of every query row.
+
+    Args:
+        game_state: Output of build_game_state()
+        queries: Rows with game_id, round_num and tick; other columns are kept
+
+    Returns:
+        The query rows with the STATE_COLUMNS and time_left added, null for ticks before freeze end
+    """
+    states = game_state.rename({"tick": "state_tick"}).sort("state_tick")
+
+    return queries.sort("tick").join_asof(
+        states, left_on="tick", right_on="state_tick", by=GAME_ROUND, strategy="backward",
+        check_sortedness=False
+    ).with_columns(time_left()).drop(["state_tick", "clock_tick", "clock_seconds", "tickrate"])
+
+
+@dataclass(frozen=True)
+class GameStateIndex:
+    """
+    A collected state timeline with binary-search lookups.
+
+    Attributes:
+        states: Timeline rows sorted by round and tick
+        keys: Sorted int64 key of every row, round index * TICK_SPAN + tick
+        rounds: game_id, round_num and round_index of every round of the timeline
+    """
+    states: pl.DataFrame
+    keys: np.ndarray
+    rounds: pl.DataFrame
+
+    @classmethod
+    def from_timeline(cls, game_state) -> "GameStateIndex":
+        """Index the output of build_game_state(), lazy or collected."""
+        if isinstance(game_state, pl.LazyFrame):
+            game_state = game_state.collect()
+        states = game_state.sort(STATE_KEY)
+
+        rounds = states.select(GAME_ROUND).unique(maintain_order=True).with_row_index("round_index").with_columns(
+            pl.col("round_index").cast(pl.Int64)
+        )
+        keys = states.join(rounds, on=GAME_ROUND, how="left", maintain_order="left").select(
+            pl.col("round_index") * TICK_SPAN + pl.col("tick")
+        ).to_series().to_numpy()
+        return cls(states=states, keys=keys, rounds=rounds)
+
+    def lookup(self, queries: pl.DataFrame) -> pl.DataFrame:
+        """
+        Look up the state at the tick of every query row.
+
+        Args:
+            queries: Rows with game_id, round_num and tick; other columns are kept
+
+        Returns:
+            The query rows, in order, with the STATE_COLUMNS and time_left added, null for
+            ticks before freeze end and for rounds not in the timeline
+        """
+        round_index = queries.select(GAME_ROUND).join(
+            self.rounds, on=GAME_ROUND, how="left", maintain_order="left"
+        )["round_index"].fill_null(-1).to_numpy()
+        query_keys = round_index * TICK_SPAN + queries["tick"].to_numpy().astype(np.int64)
+
+        positions = np.searchsorted(self.keys, query_keys, side="right") - 1
+        found = (round_index >= 0) & (positions >= 0)
+        if len(self.keys):
+            found &= self.keys[np.maximum(positions, 0)] // TICK_SPAN == round_index
+
+        # Null indices gather null rows for ticks without a state
+        rows = pl.Series(positions).set(pl.Series(~found), None)
+        states = self.states.select(
+            pl.col(STATE_COLUMNS + ["clock_tick", "clock_seconds", "tickrate"]).gather(rows)
+        )
+
+        return pl.concat([queries, states], how="horizontal").with_columns(time_left()).drop(
+            ["clock_tick", "clock_seconds", "tickrate"]
+        )
+
+    def at(self, game_id: str, round_num: int, tick: int) -> Optional[Dict]:
+        """
+        Look up the state of one round at one tick.
+
+        Returns:
+            Dict of the STATE_COLUMNS and time_left, or None when lookup() would give nulls
+        """
+        queries = pl.DataFrame({"game_id": [game_id], "round_num": [round_num], "tick": [tick]},
+                               schema={key: STATE_SCHEMA[key] for key in STATE_KEY})
+        state = self.lookup(queries).drop(STATE_KEY).row(0, named=True)
+        return None if state["ct_alive"] is None else state
+
+
+def post_plant_win_breakdown(frames: MatchFrames, game_state: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Marks every round with a plant with whether the T side won it.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, value (1.0 for a T win) and weight.
+    """
+    planted_rounds = game_state.filter(pl.col("bomb_planted")).select(GAME_ROUND).unique()
+
+    return planted_rounds.join(
+        frames.rounds.select(GAME_ROUND + ["winner_side"]), on=GAME_ROUND, how="left"
+    ).select(
+        GAME_ROUND + [
+            (pl.col("winner_side") == "t").fill_null(False).cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def calculate_game_state(demo, round_time: float = ROUND_TIME, bomb_timer: float = BOMB_TIMER) -> pl.DataFrame:
+    """Builds the state timeline of a demo."""
+    return build_game_state(MatchFrames.from_demo(demo), round_time, bomb_timer).collect().drop("game_id")
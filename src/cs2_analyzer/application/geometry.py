@@ -0,0 +1,208 @@
+"""
+Batched geometry kernels.
+
+NumPy kernels work on (N, 3) float arrays of X/Y/Z positions (or (N, 2) for X/Y)
+and avoid per-row Python and large temporaries: distances are computed from
+squared norms in place and pairwise distances use the |a|^2 + |b|^2 - 2ab expansion.
+The polars expression builders at the end give the same math to the lazy metric plans.
+
+Angles follow CS2 conventions: yaw is degrees around the Z axis from +X, pitch is
+degrees with positive values looking down.
+"""
+
+from typing import Union
+
+import numpy as np
+import polars as pl
+
+
+def as_points(points, dims: int = 3) -> np.ndarray:
+    """View positions as a float64 (N, dims) array without copying when possible."""
+    array = np.asarray(points, dtype=np.float64)
+    return array.reshape(-1, dims)
+
+
+def distances_to_point(points, point) -> np.ndarray:
+    """Distance of every point to one point."""
+    points = as_points(points)
+    diff = points - np.asarray(point, dtype=np.float64)
+    squared = np.einsum("ij,ij->i", diff, diff)
+    return np.sqrt(squared, out=squared)
+
+
+def pairwise_distances(points, others=None) -> np.ndarray:
+    """
+    Distances between every pair of points.
+
+    Args:
+        points: (N, 3) positions
+        others: (M, 3) positions (default: points itself)
+
+    Returns:
+        (N, M) distance matrix
+    """
+    points = as_points(points)
+    others = points if others is None else as_points(others)
+
+    squared = np.einsum("ij,ij->i", points, points)[:, None] + np.einsum("ij,ij->i", others, others)[None, :]
+    squared -= 2.0 * points @ others.T
+    np.maximum(squared, 0.0, out=squared)
+    if others is points:
+        np.fill_diagonal(squared, 0.0)
+    return np.sqrt(squared, out=squared)
+
+
+def mean_pairwise_distance(points) -> float:
+    """Mean distance over all unordered pairs of points, 0.0 for fewer than two points."""
+    points = as_points(points)
+    if len(points) < 2:
+        return 0.0
+    rows, cols = np.triu_indices(len(points), k=1)
+    return float(pairwise_distances(points)[rows, cols].mean())
+
+
+def in_sphere(points, center, radius: float) -> np.ndarray:
+    """Whether every point lies within radius of center (boundary included)."""
+    points = as_points(points)
+    diff = points - np.asarray(center, dtype=np.float64)
+    return np.einsum("ij,ij->i", diff, diff) <= radius * radius
+
+
+def in_polygon(points, polygon) -> np.ndarray:
+    """
+    Whether every X/Y point lies inside a polygon, by even-odd ray casting.
+
+    The loop runs over polygon edges; each step is vectorized over all points.
+
+    Args:
+        points: (N, 2) or (N, 3) positions; only X and Y are used
+        polygon: (K, 2) polygon vertices in order, not closed
+
+    Returns:
+        (N,) boolean mask
+    """
+    points = np.asarray(points, dtype=np.float64)
+    x, y = points[..., 0].ravel(), points[..., 1].ravel()
+    vertices = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+
+    inside = np.zeros(len(x), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_at_y = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_at_y)
+    return inside
+
+
+def displacements(points) -> np.ndarray:
+    """Per-step displacement vectors between consecutive points, shape (N - 1, dims)."""
+    points = np.asarray(points)
+    return np.diff(points, axis=0)
+
+
+def path_length(points) -> float:
+    """Total length of the path through the points in order."""
+    steps = displacements(as_points(points))
+    if len(steps) == 0:
+        return 0.0
+    return float(np.sqrt(np.einsum("ij,ij->i", steps, steps)).sum())
+
+
+def velocity(points, ticks, tickrate: int = 64) -> np.ndarray:
+    """
+    Velocity in units per second between consecutive samples.
+
+    Args:
+        points: (N, 3) positions in sample order
+        ticks: (N,) tick of each sample
+        tickrate: Ticks per second
+
+    Returns:
+        (N - 1, 3) velocity vectors; steps with no tick difference are zero
+    """
+    steps = displacements(as_points(points))
+    seconds = np.diff(np.asarray(ticks, dtype=np.float64)) / tickrate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = steps / seconds[:, None]
+    result[seconds == 0] = 0.0
+    return result
+
+
+def speed(points, ticks, tickrate: int = 64) -> np.ndarray:
+    """Speed in units per second between consecutive samples, shape (N - 1,)."""
+    velocities = velocity(points, ticks, tickrate)
+    return np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+
+
+def view_vectors(yaw, pitch) -> np.ndarray:
+    """
+    Unit view-direction vectors from yaw and pitch in degrees.
+
+    Returns:
+        (N, 3) array of unit vectors
+    """
+    yaw = np.radians(np.asarray(yaw, dtype=np.float64)).ravel()
+    pitch = np.radians(np.asarray(pitch, dtype=np.float64)).ravel()
+    cos_pitch = np.cos(pitch)
+    return np.column_stack((cos_pitch * np.cos(yaw), cos_pitch * np.sin(yaw), -np.sin(pitch)))
+
+
+def angle_to_targets(origins, directions, targets) -> np.ndarray:
+    """
+    Angle in degrees between each view direction and the direction to its target.
+
+    Args:
+        origins: (N, 3) viewer positions
+        directions: (N, 3) unit view vectors
+        targets: (N, 3) target positions
+
+    Returns:
+        (N,) angles; 0.0 when a target coincides with its viewer
+    """
+    to_target = as_points(targets) - as_points(origins)
+    norms = np.sqrt(np.einsum("ij,ij->i", to_target, to_target))
+    cosines = np.einsum("ij,ij->i", as_points(directions), to_target)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosines = np.where(norms > 0, cosines / norms, 1.0)
+    return np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+
+
+Coordinate = Union[float, pl.Expr]
+
+
+def squared_distance_expr(x: Coordinate, y: Coordinate, z: Coordinate,
+                          prefix: str = "", suffix: str = "") -> pl.Expr:
+    """
+    Polars expression for the squared distance of X/Y/Z columns to a point.
+
+    Args:
+        x, y, z: Point coordinates as numbers or expressions (e.g. joined columns)
+        prefix, suffix: Affixes of the position columns, e.g. suffix="_other" for X_other
+    """
+    return (
+        (pl.col(f"{prefix}X{suffix}") - x)**2 +
+        (pl.col(f"{prefix}Y{suffix}") - y)**2 +
+        (pl.col(f"{prefix}Z{suffix}") - z)**2
+    )
+
+
+def distance_expr(x: Coordinate, y: Coordinate, z: Coordinate, prefix: str = "", suffix: str = "") -> pl.Expr:
+    """Polars expression for the distance of X/Y/Z columns to a point."""
+    return squared_distance_expr(x, y, z, prefix, suffix).sqrt()
+
+
+def in_sphere_expr(x: Coordinate, y: Coordinate, z: Coordinate, radius: Coordinate) -> pl.Expr:
+    """Polars expression that is true for X/Y/Z rows within radius of a point."""
+    return squared_distance_expr(x, y, z) <= radius**2
+
+
+def view_vector_exprs(yaw: str = "yaw", pitch: str = "pitch") -> list:
+    """Polars expressions for the view_x, view_y and view_z unit vector columns."""
+    yaw_rad = pl.col(yaw).radians()
+    pitch_rad = pl.col(pitch).radians()
+    return [
+        (pitch_rad.cos() * yaw_rad.cos()).alias("view_x"),
+        (pitch_rad.cos() * yaw_rad.sin()).alias("view_y"),
+        (-pitch_rad.sin()).alias("view_z"),
+    ]
@@ -0,0 +1,212 @@
+"""
+Positional heatmaps.
+
+Positions are binned with np.bincount into a fixed grid per map (the radar image
+extent when awpy's map data is available), so grids of different games on the same
+map line up cell for cell. Each game's grid is stored sparsely (non-empty cells and
+their counts) in a HeatmapStore; a heatmap over many games is the sum of their
+stored grids, and only games without a stored grid are binned from the tick data.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+import polars as pl
+
+from .frames import MatchFrames
+from .interfaces import HeatmapStore
+from .metrics import build_round_ticks, living, select_window_ticks
+
+DEFAULT_HEATMAP_BINS = 128
+DEFAULT_HEATMAP_WINDOW = 60
+
+# Grid extent for maps without radar data: the playable area of every competitive map fits
+DEFAULT_MAP_EXTENT = (-4096.0, -4096.0, 8192.0)
+
+GRID_SCHEMA = {"game_id": pl.String, "map_name": pl.String, "cells": pl.List(pl.UInt32), "counts": pl.List(pl.UInt32)}
+
+
+@dataclass(frozen=True)
+class HeatmapSpec:
+    """What a heatmap counts: one side's living players' positions in the first seconds of rounds, on a bins x bins grid."""
+    side: str = "ct"
+    window_seconds: int = DEFAULT_HEATMAP_WINDOW
+    bins: int = DEFAULT_HEATMAP_BINS
+    # Version 2 leaves out the positions of dead players
+    version: int = 2
+
+
+@dataclass(frozen=True)
+class MapGrid:
+    """A square grid over a map: lower-left corner, side length and bins per side."""
+    x_min: float
+    y_min: float
+    size: float
+    bins: int
+
+    @property
+    def cell_count(self) -> int:
+        return self.bins * self.bins
+
+    @property
+    def extent(self):
+        """(left, right, bottom, top) for matplotlib's imshow."""
+        return (self.x_min, self.x_min + self.size, self.y_min, self.y_min + self.size)
+
+    def cells(self, x, y) -> np.ndarray:
+        """Flat cell index (column * bins + row) of every position, -1 off the grid."""
+        cell_size = self.size / self.bins
+        column = np.floor((np.asarray(x, dtype=np.float64) - self.x_min) / cell_size)
+        row = np.floor((np.asarray(y, dtype=np.float64) - self.y_min) / cell_size)
+        on_grid = (column >= 0) & (column < self.bins) & (row >= 0) & (row < self.bins)
+        return np.where(on_grid, column * self.bins + row, -1).astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def map_grid(map_name: str, bins: int = DEFAULT_HEATMAP_BINS) -> MapGrid:
+    """The fixed heatmap grid of a map: its 1024 pixel radar image extent, or a default square."""
+    # Imported here: loading awpy's map data logs a warning when it has not been downloaded
+    from awpy.data.map_data import MAP_DATA
+
+    if map_name in MAP_DATA:
+        radar = MAP_DATA[map_name]
+        size = 1024 * radar["scale"]
+        # pos_x/pos_y is the radar's upper-left corner
+        return MapGrid(x_min=radar["pos_x"], y_min=radar["pos_y"] - size, size=size, bins=bins)
+    x_min, y_min, size = DEFAULT_MAP_EXTENT
+    return MapGrid(x_min=x_min, y_min=y_min, size=size, bins=bins)
+
+
+def bin_games(positions: pl.DataFrame, spec: HeatmapSpec) -> pl.DataFrame:
+    """
+    Bin positions into one sparse grid per game.
+
+    Args:
+        positions: Rows with game_id, map_name, X and Y
+        spec: Grid resolution
+
+    Returns:
+        DataFrame with columns game_id, map_name, cells and counts (non-empty cells only)
+    """
+    grids = []
+    for (map_name,), rows in positions.group_by(["map_name"], maintain_order=True):
+        grid = map_grid(map_name, spec.bins)
+        game_ids = rows["game_id"].unique(maintain_order=True)
+        game_code = rows["game_id"].cast(pl.Enum(game_ids.to_list())).to_physical().to_numpy().astype(np.int64)
+
+        cells = grid.cells(rows["X"].to_numpy(), rows["Y"].to_numpy())
+        on_grid = cells >= 0
+        counts = np.bincount(
+            game_code[on_grid] * grid.cell_count + cells[on_grid], minlength=len(game_ids) * grid.cell_count
+        ).reshape(len(game_ids), grid.cell_count)
+
+        for game_id, game_counts in zip(game_ids, counts):
+            nonzero = np.flatnonzero(game_counts)
+            grids.append({"game_id": game_id, "map_name": map_name,
+                          "cells": nonzero.tolist(), "counts": game_counts[nonzero].tolist()})
+
+    return pl.DataFrame(grids, schema=GRID_SCHEMA)
+
+
+class HeatmapService:
+    """Builds heatmaps over many games from cached per-game grids."""
+
+    def __init__(self, store: Optional[HeatmapStore] = None):
+        self.store = store
+
+    def game_grids(self, frames: MatchFrames, spec: HeatmapSpec = HeatmapSpec(),
+                   game_ids: Optional[Iterable[str]] = None) -> pl.DataFrame:
+        """
+        Sparse grids of every game, from the store where possible.
+
+        Args:
+            frames: Lazy tables of the games
+            spec: Side, window and resolution of the heatmap
+            game_ids: Restrict to these games (default: every game of frames)
+
+        Returns:
+            DataFrame with columns game_id, map_name, cells and counts
+        """
+        games = frames.games.select(["game_id", "map_name"])
+        if game_ids is not None:
+            games = games.filter(pl.col("game_id").is_in(list(game_ids)))
+        games = games.collect()
+
+        cached = self.store.get(spec, games["game_id"].to_list()) if self.store is not None else pl.DataFrame(
+            schema=GRID_SCHEMA
+        )
+        missing = games.join(cached.select("game_id"), on="game_id", how="anti")
+        if missing.is_empty():
+            return cached
+
+        computed = self._bin_frames(frames.where(game_ids=missing["game_id"].to_list()), spec)
+        # Games without a single position in the window still get an (empty) grid so they are not rescanned
+        computed = missing.join(computed.drop("map_name"), on="game_id", how="left").with_columns(
+            pl.col("cells").fill_null([]), pl.col("counts").fill_null([])
+        ).select(list(GRID_SCHEMA)).cast(GRID_SCHEMA)
+
+        if self.store is not None:
+            self.store.put(spec, computed)
+        return pl.concat([cached, computed])
+
+    def heatmap(self, frames: MatchFrames, map_name: str, spec: HeatmapSpec = HeatmapSpec(),
+                game_ids: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Position counts on a map summed over games.
+
+        Args:
+            frames: Lazy tables of the games
+            map_name: Map to build the heatmap for; games on other maps are ignored
+            spec: Side, window and resolution of the heatmap
+            game_ids: Restrict to these games (default: every game on the map)
+
+        Returns:
+            (bins, bins) array of counts indexed [column (X), row (Y)] on map_grid(map_name)
+        """
+        on_map = frames.games.filter(pl.col("map_name") == map_name)
+        if game_ids is not None:
+            on_map = on_map.filter(pl.col("game_id").is_in(list(game_ids)))
+
+        grids = self.game_grids(frames, spec, on_map.select("game_id").collect()["game_id"].to_list())
+        grid = map_grid(map_name, spec.bins)
+        cells = grids["cells"].explode().drop_nulls().to_numpy().astype(np.int64)
+        counts = grids["counts"].explode().drop_nulls().to_numpy().astype(np.int64)
+        return np.bincount(cells, weights=counts, minlength=grid.cell_count).astype(np.int64).reshape(
+            spec.bins, spec.bins
+        )
+
+    def _bin_frames(self, frames: MatchFrames, spec: HeatmapSpec) -> pl.DataFrame:
+        """Bin the windowed positions of one side of every game in frames."""
+        positions = select_window_ticks(build_round_ticks(frames), spec.window_seconds).filter(
+            living(spec.side)
+        ).select(["game_id", "X", "Y"]).join(
+            frames.games.select(["game_id", "map_name"]), on="game_id", how="left"
+        ).collect()
+        return bin_games(positions, spec)
+
+
+def render_heatmap(counts: np.ndarray, map_name: str, output_path: str, title: Optional[str] = None) -> None:
+    """
+    Render a heatmap from heatmap() to an image file.
+
+    Counts are drawn on a log scale over the map's grid coordinates.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    grid = map_grid(map_name, counts.shape[0])
+    masked = np.ma.masked_equal(counts.T, 0)
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    image = ax.imshow(masked, origin="lower", extent=grid.extent, cmap="inferno",
+                      norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 1)))
+    fig.colorbar(image, ax=ax, label="Position samples")
+    ax.set_title(title or f"{map_name} heatmap")
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    fig.savefig(output_path, dpi=120, bbox_inches="tight")
+    plt.close(fig)
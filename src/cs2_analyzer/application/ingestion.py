@@ -1,6 +1,9 @@
 from typing import Protocol, Any
 from pathlib import Path
-from awpy.demo import Demo
+from awpy.demo import Demo, DEFAULT_EVENT_LIST
+
+# Events parsed on top of awpy's defaults; player_blind feeds the flash metrics
+EXTRA_EVENTS = ["player_blind"]
 
 
 class DemoParser(Protocol):
@@ -31,7 +34,7 @@ class AwpyDemoParser:
 
         Returns:
             awpy Demo object with parsed game data including:
-                - ticks: DataFrame with tick-level player positions
+                - ticks: DataFrame with tick-level player positions and view angles
                 - events: Dict of event DataFrames (bomb_planted, player_death, etc.)
                 - rounds: DataFrame with round metadata
                 - header: Dict with map name and other metadata
@@ -40,5 +43,6 @@ class AwpyDemoParser:
                 - bombsite_locations: Dict with site coordinates
         """
         demo = Demo(Path(file_path))
-        demo.parse()
+        # View angles are not parsed by default; the crossfire metrics need them
+        demo.parse(events=DEFAULT_EVENT_LIST + EXTRA_EVENTS, player_props=["yaw", "pitch"])
         return demo
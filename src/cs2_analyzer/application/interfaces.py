@@ -1,9 +1,30 @@
-from typing import Protocol
+from typing import Any, Dict, Iterable, Protocol, TYPE_CHECKING
 from ..domain.entities import Game
 
+if TYPE_CHECKING:
+    import polars as pl
+    from .heatmaps import HeatmapSpec
+    from .metric_cache import MetricKey
+
 class GameRepository(Protocol):
     def save(self, game: Game) -> None:
         ...
 
     def get(self, game_id: str) -> Game:
         ...
+
+
+class MetricResultStore(Protocol):
+    def get_many(self, keys: Iterable["MetricKey"]) -> Dict["MetricKey", Any]:
+        ...
+
+    def put_many(self, values: Dict["MetricKey", Any]) -> None:
+        ...
+
+
+class HeatmapStore(Protocol):
+    def get(self, spec: "HeatmapSpec", game_ids: Iterable[str]) -> "pl.DataFrame":
+        ...
+
+    def put(self, spec: "HeatmapSpec", grids: "pl.DataFrame") -> None:
+        ...
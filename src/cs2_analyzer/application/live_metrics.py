@@ -0,0 +1,293 @@
+"""
+Incremental metrics for a match in progress.
+
+A live source delivers the demo as a sequence of DemoChunk objects covering
+consecutive tick ranges. LiveMetrics folds every chunk into small per-round running
+totals, so each update costs O(chunk) no matter how far into the match the stream
+is. Once the whole match has been fed, the values equal the batch metrics.
+
+replay_in_chunks turns an already parsed demo into such a stream. It stands in for a
+reader following a demo or broadcast file as it grows.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+import polars as pl
+
+from .frames import EVENT_SCHEMAS, TICK_SCHEMA, assign_round_num, conform
+from .geometry import squared_distance_expr
+from .metrics import GAME_ROUND, index_first_deaths, spacing_by_tick, with_alive_mask
+
+
+LIVE_GAME_ID = "live"
+
+
+@dataclass
+class DemoChunk:
+    """
+    New data of a live demo covering one tick range.
+
+    Attributes:
+        ticks: Tick rows in the range; all rows of a tick must be in the same chunk
+        events: Event tables keyed by event name, with the events in the range
+        rounds: Rounds whose freeze time ended in the range, with round_num and freeze_end
+    """
+    ticks: pl.DataFrame
+    events: Dict[str, pl.DataFrame] = field(default_factory=dict)
+    rounds: pl.DataFrame = field(default_factory=lambda: pl.DataFrame(schema={"round_num": pl.Int64,
+                                                                            "freeze_end": pl.Int64}))
+
+
+def replay_in_chunks(demo, chunk_seconds: float = 5.0) -> Iterator[DemoChunk]:
+    """
+    Replay a parsed demo as a live stream of chunks.
+
+    Args:
+        demo: Parsed demo
+        chunk_seconds: Length of the tick range of each chunk
+
+    Yields:
+        DemoChunk for each consecutive tick range, in order
+    """
+    ticks = demo.ticks
+    if "player_steamid" not in ticks.columns and "steamid" in ticks.columns:
+        ticks = ticks.rename({"steamid": "player_steamid"})
+    events = {name: event for name, event in (getattr(demo, "events", None) or {}).items() if event is not None}
+
+    starts = [ticks["tick"].min(), demo.rounds["freeze_end"].min()] + [
+        event["tick"].min() for event in events.values() if not event.is_empty()
+    ]
+    ends = [ticks["tick"].max(), demo.rounds["freeze_end"].max()] + [
+        event["tick"].max() for event in events.values() if not event.is_empty()
+    ]
+    first_tick = min(tick for tick in starts if tick is not None)
+    last_tick = max(tick for tick in ends if tick is not None)
+    chunk_ticks = max(1, int(chunk_seconds * (getattr(demo, "tickrate", None) or 64)))
+
+    for start in range(first_tick, last_tick + 1, chunk_ticks):
+        in_range = (pl.col("tick") >= start) & (pl.col("tick") < start + chunk_ticks)
+        yield DemoChunk(
+            ticks=ticks.filter(in_range),
+            events={name: event.filter(in_range) for name, event in events.items()},
+            rounds=demo.rounds.filter(
+                (pl.col("freeze_end") >= start) & (pl.col("freeze_end") < start + chunk_ticks)
+            ).select(["round_num", "freeze_end"])
+        )
+
+
+class LiveMetrics:
+    """
+    Running pacing, spacing, forward-presence and trade metrics.
+
+    The state is a handful of totals per round, the first death tick of every player
+    and the T deaths whose trade window is still open, so memory and update cost do not
+    grow with the number of ticks seen. Like the batch metrics, spacing and forward
+    presence drop the tick rows of players from their death onwards.
+    """
+
+    def __init__(self, tickrate: int = 64, t_spawn: Optional[Dict] = None, ct_spawn: Optional[Dict] = None,
+                 window_seconds: int = 30, trade_time_window: int = 5):
+        self.tickrate = tickrate
+        self.t_spawn = t_spawn
+        self.ct_spawn = ct_spawn
+        self.window_seconds = window_seconds
+        self.trade_time_window = trade_time_window
+
+        self.last_tick: Optional[int] = None
+        self._freeze_ends: Dict[int, int] = {}
+        self._rounds = defaultdict(lambda: defaultdict(float))
+        self._pending_t_deaths = pl.DataFrame(schema={"tick": pl.Int64})
+        self._death_ticks = pl.DataFrame(schema={"game_id": pl.String, "round_num": pl.Int64,
+                                                 "user_steamid": pl.Int64, "death_tick": pl.Int64})
+        self._t_deaths = 0
+        self._traded = 0
+
+    def update(self, chunk: DemoChunk) -> None:
+        """Fold a new chunk into the running totals."""
+        for round_num, freeze_end in chunk.rounds.select(["round_num", "freeze_end"]).iter_rows():
+            self._freeze_ends[round_num] = freeze_end
+
+        rounds = pl.LazyFrame(
+            {"game_id": LIVE_GAME_ID, "round_num": list(self._freeze_ends), "freeze_end": list(self._freeze_ends.values())},
+            schema={"game_id": pl.String, "round_num": pl.Int64, "freeze_end": pl.Int64}
+        )
+
+        deaths = self._round_events(chunk.events.get("player_death"), "player_death", rounds)
+        plants = self._round_events(chunk.events.get("bomb_planted"), "bomb_planted", rounds)
+        # A death and the tick rows at its tick arrive in the same chunk, so record deaths first
+        self._update_death_ticks(deaths)
+
+        window_ticks = self._window_ticks(chunk.ticks, rounds)
+        self._update_spacing(window_ticks)
+        self._update_forward_presence(window_ticks)
+
+        self._update_pacing(deaths, plants)
+        self._update_trades(deaths)
+
+        seen_ticks = [table["tick"].max() for table in [chunk.ticks, *chunk.events.values()]
+                      if table is not None and not table.is_empty()]
+        if self.last_tick is not None:
+            seen_ticks.append(self.last_tick)
+        self.last_tick = max(seen_ticks) if seen_ticks else None
+        self._expire_trade_windows()
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Current value of every live metric.
+
+        Pacing values are in seconds after freeze end. First kill and plant times are
+        averaged over the rounds that have the event, death times over all deaths like
+        the batch average_death_time. Trade efficiency counts T deaths whose trade window is still
+        open as untraded until a trade arrives.
+        """
+        def mean_over_rounds(key: str, count_key: Optional[str] = None) -> float:
+            values = [
+                totals[key] / totals[count_key] if count_key else totals[key]
+                for totals in self._rounds.values()
+                if (totals[count_key] if count_key else totals.get(f"has_{key}"))
+            ]
+            return sum(values) / len(values) if values else 0.0
+
+        def pooled(sum_key: str, count_key: str) -> float:
+            total = sum(totals[count_key] for totals in self._rounds.values())
+            return sum(totals[sum_key] for totals in self._rounds.values()) / total if total else 0.0
+
+        all_t_deaths = self._t_deaths + len(self._pending_t_deaths)
+
+        return {
+            "ttfk": mean_over_rounds("first_kill"),
+            "time_to_plant": mean_over_rounds("plant"),
+            "average_death_timestamp": pooled("death_time_sum", "deaths"),
+            "t_side_player_spacing": pooled("t_spacing_sum", "t_spacing_ticks"),
+            "ct_side_player_spacing": pooled("ct_spacing_sum", "ct_spacing_ticks"),
+            "ct_side_forward_presence_count": mean_over_rounds("forward_sum", "forward_ticks"),
+            "trade_efficiency": self._traded / all_t_deaths if all_t_deaths else 0.0,
+        }
+
+    def _window_ticks(self, ticks: pl.DataFrame, rounds: pl.LazyFrame) -> pl.DataFrame:
+        """Chunk tick rows of living players within the opening window of rounds whose freeze end is known."""
+        if ticks.is_empty():
+            return pl.DataFrame(schema=TICK_SCHEMA)
+
+        if "player_steamid" not in ticks.columns and "steamid" in ticks.columns:
+            ticks = ticks.rename({"steamid": "player_steamid"})
+        frame = conform(ticks.lazy().with_columns(pl.lit(LIVE_GAME_ID).alias("game_id")), TICK_SCHEMA)
+        alive_intervals = self._death_ticks.lazy().rename({"user_steamid": "player_steamid"}).with_columns(
+            pl.lit(None, dtype=pl.Int64).alias("spawn_tick")
+        )
+
+        window = frame.join(rounds, on=["game_id", "round_num"]).filter(
+            (pl.col("tick") >= pl.col("freeze_end")) &
+            (pl.col("tick") <= pl.col("freeze_end") + self.window_seconds * self.tickrate)
+        )
+        return with_alive_mask(window, alive_intervals).filter(pl.col("is_alive")).drop("is_alive").collect()
+
+    def _round_events(self, events: Optional[pl.DataFrame], name: str, rounds: pl.LazyFrame) -> pl.DataFrame:
+        """Chunk events with their round and freeze end."""
+        schema = EVENT_SCHEMAS[name]
+        if events is None or events.is_empty():
+            return pl.DataFrame(schema={**{key: dtype for key, dtype in schema.items() if dtype is not None},
+                                        "freeze_end": pl.Int64})
+
+        frame = events.lazy().with_columns(pl.lit(LIVE_GAME_ID).alias("game_id"))
+        if "round_num" not in events.columns:
+            frame = assign_round_num(frame, rounds)
+        return conform(frame, schema).join(rounds, on=["game_id", "round_num"], how="left").collect()
+
+    def _update_death_ticks(self, deaths: pl.DataFrame) -> None:
+        """Keep the first death tick of every player in every round."""
+        if deaths.is_empty():
+            return
+
+        self._death_ticks = pl.concat([
+            self._death_ticks,
+            index_first_deaths(deaths.lazy()).collect(),
+        ], how="vertical_relaxed").group_by(GAME_ROUND + ["user_steamid"]).agg(pl.col("death_tick").min())
+
+    def _update_spacing(self, window_ticks: pl.DataFrame) -> None:
+        """Add the chunk's per-tick spacing to each round's totals."""
+        for side in ("t", "ct"):
+            by_tick = spacing_by_tick(window_ticks.lazy().filter(pl.col("side") == side))
+            per_round = by_tick.group_by("round_num").agg(pl.col("spacing").sum(), pl.len().alias("ticks")).collect()
+            for round_num, spacing_sum, tick_count in per_round.iter_rows():
+                self._rounds[round_num][f"{side}_spacing_sum"] += spacing_sum
+                self._rounds[round_num][f"{side}_spacing_ticks"] += tick_count
+
+    def _update_forward_presence(self, window_ticks: pl.DataFrame) -> None:
+        """Add the chunk's per-tick forward CT counts to each round's totals."""
+        if not self.t_spawn or not self.ct_spawn:
+            return
+
+        def squared_distance(point: Dict) -> pl.Expr:
+            return squared_distance_expr(point["x"], point["y"], point["z"])
+
+        forward = squared_distance(self.t_spawn) < squared_distance(self.ct_spawn)
+        per_tick = window_ticks.lazy().filter(pl.col("side") == "ct").group_by(["round_num", "tick"]).agg(
+            forward.sum().alias("forward_players")
+        )
+        per_round = per_tick.group_by("round_num").agg(
+            pl.col("forward_players").sum(), pl.len().alias("ticks")
+        ).collect()
+
+        for round_num, forward_players, tick_count in per_round.iter_rows():
+            self._rounds[round_num]["forward_sum"] += forward_players
+            self._rounds[round_num]["forward_ticks"] += tick_count
+
+    def _update_pacing(self, deaths: pl.DataFrame, plants: pl.DataFrame) -> None:
+        """Record first kills, plants and death times of the chunk per round."""
+        seconds = ((pl.col("tick") - pl.col("freeze_end")) / self.tickrate).alias("seconds")
+
+        per_round_deaths = deaths.filter(pl.col("freeze_end").is_not_null()).group_by("round_num").agg(
+            seconds.min().alias("first"), seconds.sum().alias("total"), pl.len().alias("count")
+        )
+        for round_num, first, total, count in per_round_deaths.iter_rows():
+            totals = self._rounds[round_num]
+            if not totals["has_first_kill"]:
+                totals["first_kill"] = first
+                totals["has_first_kill"] = 1
+            totals["death_time_sum"] += total
+            totals["deaths"] += count
+
+        first_plants = plants.filter(pl.col("freeze_end").is_not_null()).group_by("round_num").agg(
+            seconds.min().alias("first")
+        )
+        for round_num, first in first_plants.iter_rows():
+            totals = self._rounds[round_num]
+            if not totals["has_plant"]:
+                totals["plant"] = first
+                totals["has_plant"] = 1
+
+    def _update_trades(self, deaths: pl.DataFrame) -> None:
+        """Resolve open trade windows against the chunk's trade kills and open new ones."""
+        trade_ticks = deaths.filter(
+            (pl.col("user_side") == "ct") & (pl.col("attacker_side") == "t")
+        ).select(pl.col("tick").alias("trade_tick")).sort("trade_tick")
+
+        pending = pl.concat([
+            self._pending_t_deaths,
+            deaths.filter(pl.col("user_side") == "t").select(pl.col("tick").cast(pl.Int64))
+        ]).sort("tick")
+
+        if pending.is_empty() or trade_ticks.is_empty():
+            self._pending_t_deaths = pending
+            return
+
+        next_trades = pending.join_asof(
+            trade_ticks, left_on="tick", right_on="trade_tick", strategy="forward", allow_exact_matches=False
+        )
+        traded = (pl.col("trade_tick") <= pl.col("tick") + self.trade_time_window * self.tickrate).fill_null(False)
+
+        self._traded += next_trades.filter(traded).height
+        self._t_deaths += next_trades.filter(traded).height
+        self._pending_t_deaths = next_trades.filter(~traded).select("tick")
+
+    def _expire_trade_windows(self) -> None:
+        """Count T deaths whose trade window has fully passed as untraded."""
+        if self.last_tick is None or self._pending_t_deaths.is_empty():
+            return
+
+        expired = pl.col("tick") + self.trade_time_window * self.tickrate < self.last_tick
+        self._t_deaths += self._pending_t_deaths.filter(expired).height
+        self._pending_t_deaths = self._pending_t_deaths.filter(~expired)
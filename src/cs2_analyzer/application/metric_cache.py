@@ -0,0 +1,74 @@
+"""
+Keys and helpers for persistent metric result caching.
+
+A cached result is identified by the content hash of the analysed game, the metric
+name, the metric's code version and its parameters. Regenerating a report with a
+different template therefore reuses every metric whose inputs and implementation
+are unchanged, while bumping a metric's version or changing a parameter misses.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .interfaces import MetricResultStore
+
+
+@dataclass(frozen=True)
+class MetricKey:
+    """Identity of one cached metric result."""
+    game_hash: str
+    metric: str
+    version: int
+    params: str
+
+
+def metric_key(game_hash: str, metric: str, version: int = 1,
+               params: Optional[Dict[str, Any]] = None) -> MetricKey:
+    """
+    Build the cache key of a metric result.
+
+    Args:
+        game_hash: Content hash of the analysed game (see content_hash)
+        metric: Metric name
+        version: Code version of the metric, bumped whenever its implementation changes
+        params: Metric parameters; their order does not matter
+
+    Returns:
+        MetricKey with the parameters in canonical JSON form
+    """
+    return MetricKey(
+        game_hash=game_hash,
+        metric=metric,
+        version=version,
+        params=json.dumps(params or {}, sort_keys=True, default=str)
+    )
+
+
+def content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks so large demos are never fully loaded."""
+    digest = hashlib.sha256()
+    with open(Path(path), 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached(store: Optional[MetricResultStore], key: MetricKey, compute: Callable[[], Any]) -> Any:
+    """
+    Return a metric result from the store, computing and storing it on a miss.
+
+    Without a store the result is always computed.
+    """
+    if store is None:
+        return compute()
+
+    hits = store.get_many([key])
+    if key in hits:
+        return hits[key]
+
+    value = compute()
+    store.put_many({key: value})
+    return value
@@ -0,0 +1,730 @@
+"""
+Metric registry and dependency-aware batch evaluation.
+
+Every metric declares the shared intermediates it reads (round ticks, death index,
+rotations table, ...). The batch evaluator builds each intermediate once per demo,
+in dependency order, and then computes the requested metrics on a thread pool.
+Adding a metric therefore never adds another pass over the tick data. An
+intermediate that depends on metric parameters (e.g. the flash assist window) is
+built once per distinct parameter value, so metrics agreeing on it share it.
+
+Metric compute functions return lazy breakdown plans (one row per round, or per
+round and player, with a value and a weight), so the same registry evaluates a
+single demo or every game of a Parquet store scan, and per-round and per-player
+values come out of the same pass as the scalar, which is their weighted mean.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import polars as pl
+
+from . import clutches, crossfire, damage, duels, game_state, metrics, utility
+from .frames import MatchFrames, TICK_SCHEMA
+from .interfaces import MetricResultStore
+from .metric_cache import MetricKey, metric_key
+
+
+@dataclass(frozen=True)
+class MetricInput:
+    """A shared intermediate built once per demo, and the metric parameters it reads with their defaults."""
+    name: str
+    build: Callable[..., Any]
+    requires: Tuple[str, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """A registered metric, the intermediates it reads and its default parameters."""
+    name: str
+    compute: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    params: Dict[str, Any] = field(default_factory=dict)
+    version: int = 1
+    description: str = ""
+
+
+class MetricRegistry:
+    """Holds the available metrics and the intermediates they depend on."""
+
+    def __init__(self):
+        self._inputs: Dict[str, MetricInput] = {}
+        self._metrics: Dict[str, MetricSpec] = {}
+
+    def add_input(self, name: str, build: Callable[..., Any], requires: Iterable[str] = (), **params) -> None:
+        """
+        Register a shared intermediate.
+
+        Args:
+            name: Name metrics use to declare the intermediate
+            build: Callable receiving the demo and the already built intermediates, followed
+                by the parameters as keyword arguments
+            requires: Names of the intermediates the builder reads
+            **params: Metric parameters the builder reads, with their defaults. A metric
+                with a parameter of the same name gets the intermediate built with its value.
+        """
+        self._inputs[name] = MetricInput(name=name, build=build, requires=tuple(requires), params=params)
+
+    def add_metric(self, spec: MetricSpec) -> None:
+        """Register a metric."""
+        unknown = [name for name in spec.inputs if name != "demo" and name not in self._inputs]
+        if unknown:
+            raise ValueError(f"Metric {spec.name} depends on unknown inputs: {unknown}")
+        self._metrics[spec.name] = spec
+
+    def metric(self, name: str, inputs: Iterable[str], version: int = 1,
+               description: str = "", **params) -> Callable:
+        """
+        Decorator registering a compute function as a metric.
+
+        The compute function receives the dict of built intermediates followed by
+        the metric parameters as keyword arguments.
+        """
+        def register(compute: Callable[..., float]) -> Callable[..., float]:
+            self.add_metric(MetricSpec(
+                name=name,
+                compute=compute,
+                inputs=tuple(inputs),
+                params=params,
+                version=version,
+                description=description or name
+            ))
+            return compute
+
+        return register
+
+    def get(self, name: str) -> MetricSpec:
+        """Look up a registered metric by name."""
+        if name not in self._metrics:
+            raise KeyError(f"Metric {name} is not registered")
+        return self._metrics[name]
+
+    def names(self) -> List[str]:
+        """Names of all registered metrics, in registration order."""
+        return list(self._metrics)
+
+    def input_params(self, name: str) -> Dict[str, Any]:
+        """Defaults of the parameters an intermediate depends on, including those of the intermediates it requires."""
+        if name == "demo" or name not in self._inputs:
+            return {}
+        metric_input = self._inputs[name]
+        params: Dict[str, Any] = {}
+        for required in metric_input.requires:
+            params.update(self.input_params(required))
+        return {**params, **metric_input.params}
+
+    def input_key(self, name: str, params: Dict[str, Any]) -> Hashable:
+        """
+        Key of an intermediate built for a metric with the given parameters.
+
+        Intermediates without parameters are keyed by their name; the others also by the
+        values of the parameters they depend on, so each distinct value is built once.
+        """
+        defaults = self.input_params(name)
+        if not defaults:
+            return name
+        return (name, tuple(sorted((key, params.get(key, default)) for key, default in defaults.items())))
+
+    def resolve_inputs(self, metric_names: Iterable[str]) -> List[MetricInput]:
+        """
+        Collect the intermediates needed by the given metrics.
+
+        Returns:
+            Intermediates ordered so that every one comes after those it requires
+        """
+        ordered: List[MetricInput] = []
+        visiting = set()
+
+        def visit(name: str) -> None:
+            if name == "demo" or any(inp.name == name for inp in ordered):
+                return
+            if name in visiting:
+                raise ValueError(f"Metric input {name} has a circular dependency")
+            if name not in self._inputs:
+                raise KeyError(f"Metric input {name} is not registered")
+
+            visiting.add(name)
+            for required in self._inputs[name].requires:
+                visit(required)
+            visiting.discard(name)
+            ordered.append(self._inputs[name])
+
+        for metric_name in metric_names:
+            for input_name in self.get(metric_name).inputs:
+                visit(input_name)
+
+        return ordered
+
+
+class BatchMetricEvaluator:
+    """
+    Computes many metrics for a demo while sharing their intermediates.
+
+    With a result store, metrics already computed for the same game content,
+    metric version and parameters are read from the store instead of recomputed.
+    """
+
+    def __init__(self, registry: Optional[MetricRegistry] = None, max_workers: Optional[int] = None,
+                 cache: Optional[MetricResultStore] = None):
+        self.registry = registry or default_registry()
+        self.max_workers = max_workers
+        self.cache = cache
+
+    def cache_key(self, game_hash: str, name: str, params: Optional[Dict[str, Dict[str, Any]]] = None) -> MetricKey:
+        """Cache key of a metric for a game, with the metric's defaults merged with the overrides."""
+        spec = self.registry.get(name)
+        return metric_key(game_hash, name, spec.version, self._params(spec, params or {}))
+
+    def breakdown_cache_key(self, game_hash: str, name: str, by: Sequence[str],
+                            params: Optional[Dict[str, Dict[str, Any]]] = None) -> MetricKey:
+        """Cache key of a metric's breakdown by the given keys for a game."""
+        spec = self.registry.get(name)
+        return metric_key(game_hash, name, spec.version, {**self._params(spec, params or {}), "breakdown_by": list(by)})
+
+    def cached_breakdowns(self, game_hash: str, by: Sequence[str], metric_names: Optional[Iterable[str]] = None,
+                          params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, pl.DataFrame]:
+        """
+        Look up already computed metric breakdowns of a game without building anything.
+
+        Returns:
+            Dict from metric name to its breakdown (columns metric, the by columns, value and
+            weight) for every requested metric in the cache
+        """
+        if self.cache is None:
+            return {}
+
+        names = list(metric_names) if metric_names is not None else self.registry.names()
+        keys = {self.breakdown_cache_key(game_hash, name, by, params): name for name in names}
+        return {
+            keys[key]: pl.DataFrame(rows, schema=_breakdown_schema(by))
+            for key, rows in self.cache.get_many(keys).items()
+        }
+
+    def cached_values(self, game_hash: str, metric_names: Optional[Iterable[str]] = None,
+                      params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, float]:
+        """
+        Look up already computed metrics of a game without building anything.
+
+        Returns:
+            Dict from metric name to value for every requested metric in the cache
+        """
+        if self.cache is None:
+            return {}
+
+        names = list(metric_names) if metric_names is not None else self.registry.names()
+        keys = {self.cache_key(game_hash, name, params): name for name in names}
+        return {keys[key]: float(value) for key, value in self.cache.get_many(keys).items()}
+
+    def build_inputs(self, demo, metric_names: Iterable[str], seed: Optional[Dict[str, Any]] = None,
+                     params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Build every intermediate the given metrics need, each exactly once.
+
+        Lazy intermediates are collected as soon as they are built so that every
+        metric reading them shares one materialized table instead of re-running its plan.
+
+        Args:
+            demo: Parsed demo, or None when the intermediates are seeded
+            metric_names: Metrics whose intermediates to build
+            seed: Intermediates that are already available, e.g. {"frames": MatchFrames}
+            params: Per-metric parameter overrides, keyed by metric name
+
+        Returns:
+            Dict from input key (see MetricRegistry.input_key) to intermediate
+        """
+        inputs: Dict[Hashable, Any] = {"demo": demo, **(seed or {})}
+        for name in metric_names:
+            values = self._params(self.registry.get(name), params or {})
+            for metric_input in self.registry.resolve_inputs([name]):
+                key = self.registry.input_key(metric_input.name, values)
+                if key in inputs:
+                    continue
+                own = {param: values.get(param, default) for param, default in metric_input.params.items()}
+                built = metric_input.build(demo, self._view(inputs, metric_input.requires, values), **own)
+                if isinstance(built, pl.LazyFrame):
+                    built = built.collect().lazy()
+                inputs[key] = built
+        return inputs
+
+    @staticmethod
+    def _params(spec: MetricSpec, params: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """A metric's default parameters merged with its overrides."""
+        return {**spec.params, **params.get(spec.name, {})}
+
+    def _view(self, inputs: Dict[Hashable, Any], names: Iterable[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """The built intermediates as a builder or metric with the given parameters sees them, by name."""
+        return {**inputs, **{name: inputs[self.registry.input_key(name, params)] for name in names if name != "demo"}}
+
+    def _compute(self, inputs: Dict[Hashable, Any], specs: List[MetricSpec],
+                 params: Dict[str, Dict[str, Any]]) -> List[Any]:
+        """Run the compute functions, then collect all lazy results in one parallel pass."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(
+                    spec.compute, self._view(inputs, spec.inputs, self._params(spec, params)),
+                    **self._params(spec, params)
+                )
+                for spec in specs
+            ]
+            results = [future.result() for future in futures]
+
+        lazy_positions = [i for i, result in enumerate(results) if isinstance(result, pl.LazyFrame)]
+        for i, collected in zip(lazy_positions, pl.collect_all([results[i] for i in lazy_positions])):
+            results[i] = collected
+        return results
+
+    def evaluate(self, demo, metric_names: Optional[Iterable[str]] = None,
+                 params: Optional[Dict[str, Dict[str, Any]]] = None,
+                 game_hash: Optional[str] = None) -> pl.DataFrame:
+        """
+        Compute metrics for a demo.
+
+        Args:
+            demo: Parsed demo
+            metric_names: Metrics to compute (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+            game_hash: Content hash of the demo; enables the result cache when one is configured
+
+        Returns:
+            DataFrame with one row per metric and columns metric and value
+        """
+        values, _ = self._evaluate(demo, metric_names, params, game_hash)
+        return values
+
+    def evaluate_with_breakdown(self, demo, metric_names: Optional[Iterable[str]] = None,
+                                params: Optional[Dict[str, Dict[str, Any]]] = None,
+                                game_hash: Optional[str] = None,
+                                by: Sequence[str] = ("round_num",)) -> Tuple[pl.DataFrame, pl.DataFrame]:
+        """
+        Compute metrics and their breakdowns for a demo in one pass.
+
+        Each metric runs once; its scalar is the rollup of its breakdown. With a result
+        store, both are cached, so a repeated request needs no demo.
+
+        Args:
+            demo: Parsed demo, or None when everything requested is cached
+            metric_names: Metrics to compute (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+            game_hash: Content hash of the demo; enables the result cache when one is configured
+            by: Keys to break down by, round_num and/or player_steamid
+
+        Returns:
+            The evaluate() table and the breakdown() table
+        """
+        return self._evaluate(demo, metric_names, params, game_hash, [key for key in by if key != "game_id"])
+
+    def _evaluate(self, demo, metric_names: Optional[Iterable[str]], params: Optional[Dict[str, Dict[str, Any]]],
+                  game_hash: Optional[str],
+                  by: Optional[List[str]] = None) -> Tuple[pl.DataFrame, Optional[pl.DataFrame]]:
+        """Compute the scalars, and the breakdowns when by is given, of the metrics not in the cache."""
+        names = list(metric_names) if metric_names is not None else self.registry.names()
+        params = params or {}
+
+        hits = self.cached_values(game_hash, names, params) if game_hash is not None else {}
+        breakdown_hits = (
+            self.cached_breakdowns(game_hash, by, names, params) if game_hash is not None and by is not None else {}
+        )
+        missing = [name for name in names if name not in hits or (by is not None and name not in breakdown_hits)]
+
+        computed: Dict[str, float] = {}
+        computed_breakdowns: Dict[str, pl.DataFrame] = {}
+        if demo is None:
+            computed = {name: 0.0 for name in missing}
+            if by is not None:
+                computed_breakdowns = {name: pl.DataFrame(schema=_breakdown_schema(by)) for name in missing}
+        elif missing:
+            inputs = self.build_inputs(demo, missing, params=params)
+            specs = [self.registry.get(name) for name in missing]
+            for name, result in zip(missing, self._compute(inputs, specs, params)):
+                computed[name] = _first_value(result)
+                if by is not None:
+                    computed_breakdowns[name] = _breakdown_rows(name, result, ["game_id"] + by).drop("game_id")
+
+            if self.cache is not None and game_hash is not None:
+                entries = {self.cache_key(game_hash, name, params): value for name, value in computed.items()}
+                entries.update({
+                    self.breakdown_cache_key(game_hash, name, by, params): breakdown.to_dict(as_series=False)
+                    for name, breakdown in computed_breakdowns.items()
+                })
+                self.cache.put_many(entries)
+
+        values = pl.DataFrame(
+            {"metric": names, "value": [hits[name] if name in hits else computed[name] for name in names]},
+            schema={"metric": pl.String, "value": pl.Float64}
+        )
+        if by is None:
+            return values, None
+
+        breakdown = pl.concat(
+            [breakdown_hits[name] if name in breakdown_hits else computed_breakdowns[name] for name in names]
+            or [pl.DataFrame(schema=_breakdown_schema(by))]
+        )
+        return values, breakdown.sort(["metric"] + by, nulls_last=True)
+
+    def evaluate_frames(self, frames: MatchFrames, metric_names: Optional[Iterable[str]] = None,
+                        params: Optional[Dict[str, Dict[str, Any]]] = None) -> pl.DataFrame:
+        """
+        Compute metrics for every game of a set of lazy tables.
+
+        Metric plans run over all games at once, so with frames scanned from the
+        Parquet store only the columns and row groups the metrics read are loaded.
+
+        Args:
+            frames: Lazy tables of one or more games
+            metric_names: Metrics to compute (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+
+        Returns:
+            DataFrame with columns game_id, metric and value, one row per game and metric.
+            Games a metric has no value for get 0.0.
+        """
+        names = list(metric_names) if metric_names is not None else self.registry.names()
+        specs = [self.registry.get(name) for name in names]
+
+        inputs = self.build_inputs(None, names, seed={"frames": frames}, params=params)
+        game_ids = frames.games.select("game_id").collect()
+
+        per_metric = []
+        for name, result in zip(names, self._compute(inputs, specs, params or {})):
+            if isinstance(result, pl.DataFrame):
+                values = game_ids.join(_rollup(result, ["game_id"]).select(["game_id", "value"]),
+                                       on="game_id", how="left")
+            else:
+                values = game_ids.with_columns(pl.lit(result).alias("value"))
+            per_metric.append(values.select(
+                "game_id",
+                pl.lit(name).alias("metric"),
+                pl.col("value").cast(pl.Float64).fill_null(0.0).fill_nan(0.0)
+            ))
+
+        if not per_metric:
+            return pl.DataFrame(schema={"game_id": pl.String, "metric": pl.String, "value": pl.Float64})
+        return pl.concat(per_metric)
+
+    def breakdown_frames(self, frames: MatchFrames, metric_names: Optional[Iterable[str]] = None,
+                         params: Optional[Dict[str, Dict[str, Any]]] = None,
+                         by: Sequence[str] = ("game_id", "round_num")) -> pl.DataFrame:
+        """
+        Compute metric breakdowns for every game of a set of lazy tables.
+
+        Args:
+            frames: Lazy tables of one or more games
+            metric_names: Metrics to compute (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+            by: Keys to break down by, any of game_id, round_num and player_steamid
+
+        Returns:
+            Long DataFrame with columns metric, the by columns, value and weight. A key a
+            metric has no breakdown for (e.g. player_steamid for spacing) is null, and
+            metrics that only produce a scalar are left out.
+        """
+        names = list(metric_names) if metric_names is not None else self.registry.names()
+        specs = [self.registry.get(name) for name in names]
+        by = list(by)
+
+        inputs = self.build_inputs(None, names, seed={"frames": frames}, params=params)
+
+        per_metric = [
+            _breakdown_rows(name, result, by)
+            for name, result in zip(names, self._compute(inputs, specs, params or {}))
+        ]
+        return pl.concat(per_metric or [pl.DataFrame(schema=_breakdown_schema(by))]).sort(
+            ["metric"] + by, nulls_last=True
+        )
+
+    def breakdown(self, demo, metric_names: Optional[Iterable[str]] = None,
+                  params: Optional[Dict[str, Dict[str, Any]]] = None,
+                  by: Sequence[str] = ("round_num",)) -> pl.DataFrame:
+        """
+        Compute per-round (or per-round and player) metric values for a demo.
+
+        Args:
+            demo: Parsed demo
+            metric_names: Metrics to compute (default: every registered metric)
+            params: Per-metric parameter overrides, keyed by metric name
+            by: Keys to break down by, round_num and/or player_steamid
+
+        Returns:
+            Long DataFrame with columns metric, the by columns, value and weight
+        """
+        keys = [key for key in by if key != "game_id"]
+        frames = MatchFrames.from_demo(demo)
+        return self.breakdown_frames(frames, metric_names, params, by=["game_id"] + keys).drop("game_id")
+
+
+def _rollup(result: pl.DataFrame, by: Sequence[str]) -> pl.DataFrame:
+    """Roll a breakdown up to the given keys, keeping only the keys the breakdown has."""
+    if "weight" not in result.columns:
+        return result
+    return metrics.summarize(result.lazy(), [key for key in by if key in result.columns]).collect()
+
+
+def _breakdown_schema(by: Sequence[str]) -> Dict[str, pl.DataType]:
+    """Schema of a long breakdown table by the given keys."""
+    return {"metric": pl.String, **{key: TICK_SCHEMA[key] for key in by}, "value": pl.Float64, "weight": pl.Int64}
+
+
+def _breakdown_rows(name: str, result: Any, by: Sequence[str]) -> pl.DataFrame:
+    """
+    Roll a metric result up to the given keys as rows of a long breakdown table.
+
+    A key the metric has no breakdown for is null; a metric that only produces a scalar has no rows.
+    """
+    if not isinstance(result, pl.DataFrame) or "weight" not in result.columns:
+        return pl.DataFrame(schema=_breakdown_schema(by))
+
+    rolled_up = _rollup(result, by)
+    return rolled_up.select(
+        pl.lit(name).alias("metric"),
+        *[
+            pl.col(key).cast(TICK_SCHEMA[key]) if key in rolled_up.columns
+            else pl.lit(None, dtype=TICK_SCHEMA[key]).alias(key)
+            for key in by
+        ],
+        pl.col("value").cast(pl.Float64),
+        pl.col("weight").cast(pl.Int64)
+    )
+
+
+def _first_value(result: Any) -> float:
+    """Reduce a single-game metric result (float, breakdown or game_id/value table) to a float."""
+    if isinstance(result, pl.DataFrame):
+        result = _rollup(result, ["game_id"])
+        if result.is_empty() or result["value"][0] is None:
+            return 0.0
+        result = result["value"][0]
+    return float(result)
+
+
+def _side_ticks(source: str, side: str) -> Callable[[Any, Dict[str, Any]], pl.LazyFrame]:
+    """Builder selecting the living players of one side from another tick intermediate."""
+    return lambda demo, inputs: inputs[source].filter(metrics.living(side))
+
+
+def _register_inputs(registry: MetricRegistry) -> None:
+    """Register the shared intermediates of the built-in metrics."""
+    registry.add_input("frames", lambda demo, inputs: MatchFrames.from_demo(demo))
+    registry.add_input(
+        "alive_intervals",
+        lambda demo, inputs: metrics.build_alive_intervals(inputs["frames"]),
+        requires=["frames"]
+    )
+    registry.add_input(
+        "round_ticks",
+        lambda demo, inputs: metrics.build_round_ticks(inputs["frames"], inputs["alive_intervals"]),
+        requires=["frames", "alive_intervals"]
+    )
+    registry.add_input(
+        "window_ticks",
+        lambda demo, inputs: metrics.select_window_ticks(inputs["round_ticks"]),
+        requires=["round_ticks"]
+    )
+    registry.add_input("t_window_ticks", _side_ticks("window_ticks", "t"), requires=["window_ticks"])
+    registry.add_input("ct_window_ticks", _side_ticks("window_ticks", "ct"), requires=["window_ticks"])
+    registry.add_input(
+        "player_deaths", lambda demo, inputs: metrics.build_player_deaths(inputs["frames"]), requires=["frames"]
+    )
+    registry.add_input(
+        "death_index",
+        lambda demo, inputs: metrics.index_first_deaths(inputs["player_deaths"]),
+        requires=["player_deaths"]
+    )
+    registry.add_input(
+        "rotations",
+        lambda demo, inputs: metrics.build_rotations(inputs["round_ticks"], inputs["frames"].sites),
+        requires=["round_ticks", "frames"]
+    )
+    registry.add_input(
+        "executes",
+        lambda demo, inputs: metrics.build_executes(inputs["frames"], inputs["frames"].sites),
+        requires=["frames"]
+    )
+    registry.add_input(
+        "pacing",
+        lambda demo, inputs: metrics.pacing_by_round(
+            metrics.pacing_events(inputs["frames"]), inputs["frames"].rounds, inputs["frames"].games
+        ),
+        requires=["frames"]
+    )
+    registry.add_input(
+        "game_state", lambda demo, inputs: game_state.build_game_state(inputs["frames"]), requires=["frames"]
+    )
+    registry.add_input(
+        "clutches",
+        lambda demo, inputs: clutches.build_clutches(inputs["frames"], inputs["game_state"]),
+        requires=["frames", "game_state"]
+    )
+    registry.add_input(
+        "damage", lambda demo, inputs: damage.capped_damage(inputs["frames"].event("player_hurt")), requires=["frames"]
+    )
+    registry.add_input(
+        "flash_effects",
+        lambda demo, inputs, flash_assist_window: utility.flash_effects(inputs["frames"], flash_assist_window),
+        requires=["frames"], flash_assist_window=utility.DEFAULT_FLASH_ASSIST_WINDOW
+    )
+    registry.add_input(
+        "fire_intervals",
+        lambda demo, inputs, fire_duration: utility.fire_intervals(inputs["frames"], fire_duration),
+        requires=["frames"], fire_duration=utility.DEFAULT_FIRE_DURATION
+    )
+    registry.add_input(
+        "fire_exposures",
+        lambda demo, inputs, displacement_window: utility.fire_exposures(
+            inputs["fire_intervals"], inputs["round_ticks"].filter(pl.col("is_alive")), displacement_window
+        ),
+        requires=["round_ticks", "fire_intervals"], displacement_window=utility.DEFAULT_DISPLACEMENT_WINDOW
+    )
+    registry.add_input(
+        "fire_effects",
+        lambda demo, inputs: utility.fire_effects(
+            inputs["frames"], fires=inputs["fire_intervals"], exposures=inputs["fire_exposures"],
+            damage=inputs["damage"]
+        ),
+        requires=["frames", "fire_intervals", "fire_exposures", "damage"]
+    )
+    registry.add_input(
+        "bombsite_centroids",
+        lambda demo, inputs: metrics.build_bombsite_centroids(inputs["frames"]),
+        requires=["frames"]
+    )
+
+
+def _register_metrics(registry: MetricRegistry) -> None:
+    """Register the built-in metrics of the metrics module."""
+
+    @registry.metric("t_side_avg_dist_to_bombsite", inputs=["t_window_ticks", "bombsite_centroids"], version=2,
+                     description="T-Side Average Distance to Bombsite")
+    def t_side_avg_dist_to_bombsite(inputs):
+        return metrics.avg_dist_to_bombsite_breakdown(inputs["t_window_ticks"], inputs["bombsite_centroids"])
+
+    @registry.metric("ct_side_forward_presence_count", inputs=["frames", "ct_window_ticks"], version=2,
+                     description="CT-Side Forward Presence Count")
+    def ct_side_forward_presence_count(inputs):
+        by_round = metrics.forward_presence_by_round(inputs["ct_window_ticks"], inputs["frames"].spawns)
+        return metrics.forward_presence_breakdown(by_round)
+
+    for side in ("t", "ct"):
+        def player_spacing(inputs, side=side):
+            return metrics.player_spacing_breakdown(metrics.spacing_by_tick(inputs[f"{side}_window_ticks"]))
+
+        registry.add_metric(MetricSpec(
+            name=f"{side}_side_player_spacing",
+            compute=player_spacing,
+            inputs=(f"{side}_window_ticks",),
+            version=2,
+            description=f"{side.upper()}-Side Player Spacing"
+        ))
+
+    @registry.metric("rotation_timing", inputs=["rotations"], description="Rotation Timing (s)")
+    def rotation_timing(inputs):
+        return metrics.rotation_timing_breakdown(inputs["rotations"])
+
+    @registry.metric("rotation_success_rate", inputs=["rotations", "death_index"],
+                     description="Rotation Success Rate", survival_time=30)
+    def rotation_success_rate(inputs, survival_time):
+        return metrics.rotation_success_breakdown(inputs["rotations"], inputs["death_index"], survival_time)
+
+    @registry.metric("engagement_success_on_rotation", inputs=["rotations", "player_deaths"],
+                     description="Engagement Success on Rotation")
+    def engagement_success_on_rotation(inputs):
+        return metrics.engagement_success_breakdown(inputs["rotations"], inputs["player_deaths"])
+
+    @registry.metric("round_win_percentage", inputs=["frames", "executes"], version=2,
+                     description="Round Win Percentage")
+    def round_win_percentage(inputs):
+        return metrics.round_win_breakdown(inputs["frames"], inputs["executes"])
+
+    @registry.metric("entry_success_rate", inputs=["frames", "round_ticks", "death_index", "executes"], version=2,
+                     description="Entry Success Rate", entry_time_window=15)
+    def entry_success_rate(inputs, entry_time_window):
+        entries = metrics.entry_by_round(inputs["round_ticks"], inputs["death_index"],
+                                         inputs["frames"].sites, inputs["executes"], entry_time_window)
+        return metrics.entry_success_breakdown(entries)
+
+    @registry.metric("trade_efficiency", inputs=["frames", "player_deaths"],
+                     description="Trade Efficiency", trade_time_window=5)
+    def trade_efficiency(inputs, trade_time_window):
+        return metrics.trade_efficiency_breakdown(inputs["player_deaths"], inputs["frames"].games, trade_time_window)
+
+    @registry.metric("time_to_first_kill", inputs=["pacing"], description="Time to First Kill (s)")
+    def time_to_first_kill(inputs):
+        return metrics.pacing_breakdown(inputs["pacing"], "ttfk")
+
+    @registry.metric("time_to_bomb_plant", inputs=["pacing"], description="Time to Bomb Plant (s)")
+    def time_to_bomb_plant(inputs):
+        return metrics.pacing_breakdown(inputs["pacing"], "time_to_plant")
+
+    @registry.metric("average_death_time", inputs=["pacing"], description="Average Death Time (s)")
+    def average_death_time(inputs):
+        return metrics.pacing_breakdown(inputs["pacing"], "avg_death_time", weight="deaths")
+
+    @registry.metric("post_plant_win_percentage", inputs=["frames", "game_state"],
+                     description="Post-Plant Win Percentage")
+    def post_plant_win_percentage(inputs):
+        return game_state.post_plant_win_breakdown(inputs["frames"], inputs["game_state"])
+
+    @registry.metric("clutch_win_rate", inputs=["clutches"], description="Clutch Win Rate")
+    def clutch_win_rate(inputs):
+        return clutches.clutch_win_breakdown(inputs["clutches"])
+
+    @registry.metric("t_opening_duel_win_rate", inputs=["player_deaths"],
+                     description="T-Side Opening Duel Win Rate")
+    def t_opening_duel_win_rate(inputs):
+        return duels.opening_duel_breakdown(inputs["player_deaths"])
+
+    @registry.metric("headshot_rate", inputs=["player_deaths"], description="Headshot Rate")
+    def headshot_rate(inputs):
+        return duels.headshot_rate_breakdown(inputs["player_deaths"])
+
+    @registry.metric("adr", inputs=["alive_intervals", "damage"], description="Average Damage per Round")
+    def adr(inputs):
+        return damage.adr_breakdown(inputs["alive_intervals"], inputs["damage"])
+
+    @registry.metric("utility_adr", inputs=["alive_intervals", "damage"],
+                     description="Utility Damage per Round")
+    def utility_adr(inputs):
+        return damage.adr_breakdown(inputs["alive_intervals"], inputs["damage"], utility_only=True)
+
+    @registry.metric("crossfire_density", inputs=["round_ticks", "bombsite_centroids"], version=2,
+                     description="CT-Side Crossfire Density", window_seconds=crossfire.DEFAULT_CROSSFIRE_WINDOW,
+                     view_angle=crossfire.DEFAULT_VIEW_ANGLE, min_separation=crossfire.DEFAULT_MIN_SEPARATION,
+                     max_range=crossfire.DEFAULT_MAX_RANGE)
+    def crossfire_density(inputs, window_seconds, view_angle, min_separation, max_range):
+        ct_ticks = metrics.select_window_ticks(inputs["round_ticks"], window_seconds).filter(metrics.living("ct"))
+        by_tick = crossfire.crossfire_by_tick(
+            ct_ticks, crossfire.sites_as_chokepoints(inputs["bombsite_centroids"]),
+            view_angle, min_separation, max_range
+        )
+        return crossfire.crossfire_density_breakdown(by_tick)
+
+    @registry.metric("enemy_blind_time_per_flash", inputs=["flash_effects"],
+                     description="Enemy Blind Time per Flash (s)")
+    def enemy_blind_time_per_flash(inputs):
+        return utility.enemy_blind_time_breakdown(inputs["flash_effects"])
+
+    @registry.metric("flash_assists_per_flash", inputs=["flash_effects"], description="Flash Assists per Flash",
+                     flash_assist_window=utility.DEFAULT_FLASH_ASSIST_WINDOW)
+    def flash_assists_per_flash(inputs, flash_assist_window):
+        return utility.flash_assist_breakdown(inputs["flash_effects"])
+
+    @registry.metric("molotov_utility_damage", inputs=["fire_effects"], version=3,
+                     description="Enemy Fire Damage per Molotov", fire_duration=utility.DEFAULT_FIRE_DURATION)
+    def molotov_utility_damage(inputs, fire_duration):
+        return utility.utility_damage_breakdown(inputs["fire_effects"])
+
+    @registry.metric("position_denial_score", inputs=["fire_effects"], version=2,
+                     description="Position Denial Score",
+                     fire_duration=utility.DEFAULT_FIRE_DURATION,
+                     displacement_window=utility.DEFAULT_DISPLACEMENT_WINDOW)
+    def position_denial_score(inputs, fire_duration, displacement_window):
+        return utility.position_denial_breakdown(inputs["fire_effects"])
+
+
+def default_registry() -> MetricRegistry:
+    """Create a registry holding every built-in metric."""
+    registry = MetricRegistry()
+    _register_inputs(registry)
+    _register_metrics(registry)
+    return registry
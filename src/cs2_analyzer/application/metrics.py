@@ -1,13 +1,17 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 import polars as pl
 
-import math
+from .frames import MatchFrames, SITE_SCHEMA, DEFAULT_SITE_RADIUS
+from .geometry import distance_expr, in_sphere_expr, squared_distance_expr
 
-def euclidean_distance(p1: Dict, p2: Dict) -> float:
-    """Calculates the Euclidean distance between two points in 3D space."""
-    return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2 + (p1['z'] - p2['z'])**2)
+GAME_ROUND = ["game_id", "round_num"]
+GAME_ROUND_PLAYER = GAME_ROUND + ["player_steamid"]
 
+# Grenade events whose landing point shows where utility was aimed
+GRENADE_EVENTS = ["smokegrenade_detonate", "flashbang_detonate", "hegrenade_detonate", "inferno_startburn"]
 
+# Events the round pacing metrics are timed from
+PACING_EVENTS = ["player_death", "bomb_planted"]
 
 def calculate_ttfk(events: List[Dict]) -> float:
     """Calculates the Time to First Kill (TTFK) for a round."""
@@ -24,113 +28,445 @@ def calculate_time_to_bomb_plant(events: List[Dict]) -> float:
     return 0.0
 
 def calculate_average_death_timestamp(events: List[Dict]) -> float:
-    """Calculates the average death timestamp for a round."""
+    """Calculates the average timestamp over all deaths in the events, like the batch average_death_time."""
     death_timestamps = [event.get("timestamp", 0.0) for event in events if event.get("event_name") == "player_death"]
     if not death_timestamps:
         return 0.0
     return sum(death_timestamps) / len(death_timestamps)
 
+def pacing_events(frames: MatchFrames) -> pl.LazyFrame:
+    """
+    Stacks the events the pacing metrics read into one table shaped like the stored events table.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick and event_type.
+    """
+    return pl.concat([
+        frames.event(name).select(GAME_ROUND + ["tick", pl.lit(name).alias("event_type")]) for name in PACING_EVENTS
+    ])
+
+
+def pacing_by_round(events: pl.LazyFrame, rounds: pl.LazyFrame, games: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Times the kills and the plant of every round in one group_by.
+
+    Args:
+        events: Events with game_id, round_num, tick and event_type, e.g. pacing_events()
+            or the stored events table of any number of games
+        rounds: Rounds with game_id, round_num and freeze_end
+        games: Games with game_id and tickrate
+
+    Returns:
+        LazyFrame with one row per round and columns game_id, round_num, deaths,
+        ttfk, time_to_plant and avg_death_time, in seconds after freeze end (null
+        when the round has no kill or no plant).
+    """
+    seconds = (pl.col("tick") - pl.col("freeze_end")) / pl.col("tickrate")
+    is_death = pl.col("event_type") == "player_death"
+    is_plant = pl.col("event_type") == "bomb_planted"
+
+    timings = events.select(GAME_ROUND + ["tick", "event_type"]).filter(
+        pl.col("event_type").is_in(PACING_EVENTS)
+    ).join(
+        rounds.select(GAME_ROUND + ["freeze_end"]), on=GAME_ROUND
+    ).join(
+        games.select(["game_id", "tickrate"]), on="game_id"
+    ).group_by(GAME_ROUND).agg(
+        is_death.sum().cast(pl.Int64).alias("deaths"),
+        seconds.filter(is_death).min().alias("ttfk"),
+        seconds.filter(is_plant).min().alias("time_to_plant"),
+        seconds.filter(is_death).mean().alias("avg_death_time")
+    )
+
+    return rounds.select(GAME_ROUND).join(timings, on=GAME_ROUND, how="left").with_columns(
+        pl.col("deaths").fill_null(0)
+    )
+
+
+def pacing_breakdown(by_round: pl.LazyFrame, column: str, weight: Optional[str] = None) -> pl.LazyFrame:
+    """
+    Turns one timing of pacing_by_round into a breakdown.
+
+    Args:
+        by_round: Output of pacing_by_round()
+        column: ttfk, time_to_plant or avg_death_time
+        weight: Column counting the samples behind the value (default: one per round)
+
+    Returns:
+        LazyFrame with columns game_id, round_num, value and weight.
+    """
+    return by_round.select(
+        GAME_ROUND + [
+            pl.col(column).alias("value"),
+            (pl.col(weight).cast(pl.UInt32) if weight else pl.lit(1, dtype=pl.UInt32)).alias("weight")
+        ]
+    )
+
+
+def calculate_pacing_by_round(demo) -> pl.DataFrame:
+    """
+    Times the first kill, the plant and the average death of every round of a demo.
+
+    Returns:
+        DataFrame with columns round_num, deaths, ttfk, time_to_plant and avg_death_time.
+    """
+    if demo is None:
+        return pl.DataFrame(schema={"round_num": pl.Int64, "deaths": pl.Int64, "ttfk": pl.Float64,
+                                    "time_to_plant": pl.Float64, "avg_death_time": pl.Float64})
+
+    frames = MatchFrames.from_demo(demo)
+    return _single_game(pacing_by_round(pacing_events(frames), frames.rounds, frames.games))
+
+
+def _scalar(plan: pl.LazyFrame) -> float:
+    """Collects a single-game value plan into a float, 0.0 when it has no value."""
+    result = plan.collect()
+    if result.is_empty() or result["value"][0] is None:
+        return 0.0
+    return float(result["value"][0])
+
+
+def summarize(breakdown: pl.LazyFrame, by: Sequence[str] = ("game_id",)) -> pl.LazyFrame:
+    """
+    Rolls a metric breakdown up to coarser keys.
+
+    Every breakdown has a value and a weight column (the number of samples behind the
+    value), so the rollup is the weighted mean of the values. Rolling up to game_id
+    gives exactly the metric's scalar.
+
+    Returns:
+        LazyFrame with the by columns, value and weight.
+    """
+    return breakdown.filter(pl.col("value").is_not_null() & (pl.col("weight") > 0)).group_by(list(by)).agg(
+        ((pl.col("value") * pl.col("weight")).sum() / pl.col("weight").sum()).alias("value"),
+        pl.col("weight").sum()
+    )
+
+
+def _single_game(plan: pl.LazyFrame) -> pl.DataFrame:
+    """Collects a single-game plan without its game_id column, sorted by round."""
+    return plan.collect().drop("game_id").sort("round_num")
+
+
+def build_alive_intervals(frames: MatchFrames) -> pl.LazyFrame:
+    """
+    Builds the interval each player is alive in every round.
+
+    A player is alive from their first tick row of the round until their first death
+    in it, exclusive; death_tick is null for players who survive the round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, spawn_tick and death_tick.
+    """
+    deaths = index_first_deaths(build_player_deaths(frames)).rename({"user_steamid": "player_steamid"})
+
+    return frames.ticks.group_by(GAME_ROUND_PLAYER).agg(
+        pl.col("tick").min().alias("spawn_tick")
+    ).join(deaths, on=GAME_ROUND_PLAYER, how="left")
+
+
+def with_alive_mask(ticks: pl.LazyFrame, alive_intervals: pl.LazyFrame) -> pl.LazyFrame:
+    """Adds an is_alive column to tick rows by joining them to their player's alive interval."""
+    return ticks.join(
+        alive_intervals.select(GAME_ROUND_PLAYER + ["spawn_tick", "death_tick"]), on=GAME_ROUND_PLAYER, how="left"
+    ).with_columns(
+        (
+            (pl.col("spawn_tick").is_null() | (pl.col("tick") >= pl.col("spawn_tick"))) &
+            (pl.col("death_tick").is_null() | (pl.col("tick") < pl.col("death_tick")))
+        ).alias("is_alive")
+    ).drop(["spawn_tick", "death_tick"])
+
+
+def living(side: str) -> pl.Expr:
+    """Builds an expression that is true for alive-masked tick rows of living players of a side."""
+    return (pl.col("side") == side) & pl.col("is_alive")
+
+
+def build_round_ticks(frames: MatchFrames, alive_intervals: Optional[pl.LazyFrame] = None) -> pl.LazyFrame:
+    """
+    Joins every tick row to its round's freeze end and game tickrate and drops freeze-time rows.
+
+    This is the single pass over the tick data that the positional metrics share. It
+    also masks the rows of dead players, so metrics keep only living players with a
+    filter on is_alive.
+
+    Args:
+        frames: Lazy tables of the games
+        alive_intervals: Output of build_alive_intervals() (default: built from frames)
+
+    Returns:
+        Tick rows from freeze end onwards with added freeze_end, tickrate and is_alive columns.
+    """
+    if alive_intervals is None:
+        alive_intervals = build_alive_intervals(frames)
+
+    rounds = frames.rounds.select(GAME_ROUND + ["freeze_end"]).join(
+        frames.games.select(["game_id", "tickrate"]), on="game_id", how="left"
+    )
+    return with_alive_mask(
+        frames.ticks.join(rounds, on=GAME_ROUND, how="inner").filter(pl.col("tick") >= pl.col("freeze_end")),
+        alive_intervals
+    )
+
+
+def select_window_ticks(round_ticks: pl.LazyFrame, window_seconds: int = 30) -> pl.LazyFrame:
+    """Selects the round tick rows within the first seconds after freeze end."""
+    return round_ticks.filter(pl.col("tick") <= pl.col("freeze_end") + window_seconds * pl.col("tickrate"))
+
+
+def build_player_deaths(frames: MatchFrames) -> pl.LazyFrame:
+    """Returns the player_death events."""
+    return frames.event("player_death")
+
+
+def index_first_deaths(player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Builds the first death tick of every player in every round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, user_steamid and death_tick.
+    """
+    return player_deaths.filter(pl.col("round_num").is_not_null()).group_by(
+        GAME_ROUND + ["user_steamid"]
+    ).agg(pl.col("tick").min().alias("death_tick"))
+
+
+def build_death_index(demo) -> pl.DataFrame:
+    """
+    Builds the first death tick of every player in every round of a demo.
+
+    Returns:
+        DataFrame with columns round_num, user_steamid and death_tick.
+    """
+    if demo is None:
+        return pl.DataFrame(schema={"round_num": pl.Int64, "user_steamid": pl.Int64, "death_tick": pl.Int64})
+
+    return _single_game(index_first_deaths(build_player_deaths(MatchFrames.from_demo(demo))))
+
+
+def _join_death_index(frame: pl.LazyFrame, death_index: pl.LazyFrame) -> pl.LazyFrame:
+    """Left joins each player's first death tick in the round onto the frame."""
+    return frame.join(
+        death_index,
+        left_on=GAME_ROUND + ["player_steamid"],
+        right_on=GAME_ROUND + ["user_steamid"],
+        how="left"
+    )
+
+
+def _in_site_radius() -> pl.Expr:
+    """Builds an expression that is true for X/Y/Z rows joined to a site they are inside of."""
+    return in_sphere_expr(pl.col("x"), pl.col("y"), pl.col("z"), pl.col("radius"))
+
+
+def build_bombsite_centroids(frames: MatchFrames) -> pl.LazyFrame:
+    """
+    Estimates each bombsite's location from the mean position of its planters.
+
+    Returns:
+        LazyFrame of sites with columns game_id, site, x, y, z and radius.
+    """
+    bombsite_mapping = {
+        "394": "A",
+        "486": "B"
+    }
+
+    return frames.event("bomb_planted").with_columns(
+        pl.col("site").cast(pl.String).replace(bombsite_mapping).alias("site")
+    ).filter(
+        pl.col("site").is_in(["A", "B"])
+    ).group_by(["game_id", "site"]).agg(
+        pl.mean("user_X").alias("x"),
+        pl.mean("user_Y").alias("y"),
+        pl.mean("user_Z").alias("z"),
+    ).with_columns(
+        pl.lit(DEFAULT_SITE_RADIUS).alias("radius")
+    ).select(list(SITE_SCHEMA))
+
+
+def build_rotations(round_ticks: pl.LazyFrame, sites: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Finds every rotation between bombsites in the round tick rows.
+
+    A rotation starts on the tick a player leaves a bombsite radius and ends on the
+    tick they next enter one.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, exit_tick, entry_tick,
+        site and tickrate, where site is the bombsite that was entered.
+    """
+    player_round = GAME_ROUND + ["player_steamid"]
+    player_ticks = round_ticks.select(player_round + ["tick", "tickrate", "X", "Y", "Z"])
+
+    # Label each row with the first site (in site order) whose radius contains it.
+    ordered_sites = sites.with_columns(pl.int_range(pl.len()).over("game_id").alias("site_order"))
+    site_labels = player_ticks.join(ordered_sites, on="game_id").filter(_in_site_radius()).group_by(
+        player_round + ["tick"]
+    ).agg(pl.col("site").sort_by("site_order").first())
+
+    site_ticks = player_ticks.drop(["X", "Y", "Z"]).join(
+        site_labels, on=player_round + ["tick"], how="left"
+    ).sort(player_round + ["tick"]).with_columns(
+        pl.col("site").is_not_null().alias("in_site")
+    )
+
+    # Keep only the ticks where a player enters or leaves a site, so entries and exits alternate.
+    # The rows are sorted by player, so comparing with the previous row avoids a window over every tick.
+    same_player = pl.all_horizontal([pl.col(key) == pl.col(key).shift(1) for key in player_round])
+    previous_in_site = pl.when(same_player).then(pl.col("in_site").shift(1)).otherwise(False)
+    transitions = site_ticks.filter(pl.col("in_site") != previous_in_site)
+
+    return transitions.with_columns(
+        pl.col("tick").shift(1).over(player_round).alias("exit_tick"),
+        (~pl.col("in_site")).shift(1).over(player_round).fill_null(False).alias("after_exit")
+    ).filter(
+        pl.col("in_site") & pl.col("after_exit")
+    ).select(
+        player_round + ["exit_tick", pl.col("tick").alias("entry_tick"), "site", "tickrate"]
+    )
+
+
+def avg_dist_to_bombsite_breakdown(side_ticks: pl.LazyFrame, sites: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the distance of each tick row to its nearest bombsite per round and player.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value and weight (tick rows).
+    """
+    nearest = side_ticks.select(GAME_ROUND_PLAYER + ["X", "Y", "Z"]).with_row_index("row_id").join(
+        sites, on="game_id"
+    ).group_by(GAME_ROUND_PLAYER + ["row_id"]).agg(
+        squared_distance_expr(pl.col("x"), pl.col("y"), pl.col("z")).min().sqrt().alias("distance")
+    )
+
+    return nearest.group_by(GAME_ROUND_PLAYER).agg(
+        pl.col("distance").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def avg_dist_to_bombsite(side_ticks: pl.LazyFrame, sites: pl.LazyFrame) -> pl.LazyFrame:
+    """Averages the distance of each tick row to its nearest bombsite into a game_id/value LazyFrame."""
+    return summarize(avg_dist_to_bombsite_breakdown(side_ticks, sites))
+
+
 def calculate_t_side_avg_dist_to_bombsite(demo) -> float:
     """Calculates the T-side average distance to bombsite for a round."""
     if demo is None:
         return 0.0
 
-    bomb_planted_events = demo.events['bomb_planted']
-    bombsite_locations = {}
-    if not bomb_planted_events.is_empty():
-        bombsite_mapping = {
-            394: "A",
-            486: "B"
-        }
-        bombsites = bomb_planted_events.group_by("site").agg(
-            [
-                pl.mean("user_X").alias("x"),
-                pl.mean("user_Y").alias("y"),
-                pl.mean("user_Z").alias("z"),
-            ]
-        )
-        for site in bombsites.iter_rows(named=True):
-            site_name = bombsite_mapping.get(site["site"])
-            if site_name:
-                bombsite_locations[site_name] = site
-
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-
-    all_min_distances = []
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
-        end_tick = freeze_end + (30 * tickrate)
-
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) & 
-            (pl.col("tick") >= freeze_end) & 
-            (pl.col("tick") <= end_tick) & 
-            (pl.col("side") == "t")
+    frames = MatchFrames.from_demo(demo)
+    t_ticks = select_window_ticks(build_round_ticks(frames)).filter(living("t"))
+    return _scalar(avg_dist_to_bombsite(t_ticks, build_bombsite_centroids(frames)))
+
+
+def forward_presence_by_round(ct_ticks: pl.LazyFrame, spawns: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the number of forward CT players per tick for each round.
+
+    A CT player is forward when they are closer to the T spawn than to the CT spawn.
+
+    Returns:
+        LazyFrame with columns game_id, round_num and forward_presence.
+    """
+    def spawn_of(side: str) -> pl.LazyFrame:
+        return spawns.filter(pl.col("side") == side).select(
+            "game_id",
+            pl.col("x").alias(f"{side}_x"),
+            pl.col("y").alias(f"{side}_y"),
+            pl.col("z").alias(f"{side}_z")
         )
 
-        if not round_ticks.is_empty():
-            min_distances = []
-            for tick in round_ticks.iter_rows(named=True):
-                player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-                distances = [euclidean_distance(player_pos, loc) for loc in bombsite_locations.values()]
-                if distances:
-                    min_distances.append(min(distances))
-            
-            if min_distances:
-                all_min_distances.extend(min_distances)
-
-    if not all_min_distances:
-        return 0.0
+    dist_to_t_spawn = squared_distance_expr(pl.col("t_x"), pl.col("t_y"), pl.col("t_z"))
+    dist_to_ct_spawn = squared_distance_expr(pl.col("ct_x"), pl.col("ct_y"), pl.col("ct_z"))
+
+    forward_per_tick = ct_ticks.join(spawn_of("t"), on="game_id").join(spawn_of("ct"), on="game_id").group_by(
+        GAME_ROUND + ["tick"]
+    ).agg(
+        (dist_to_t_spawn < dist_to_ct_spawn).sum().alias("forward_players")
+    )
+
+    return forward_per_tick.group_by(GAME_ROUND).agg(
+        pl.col("forward_players").mean().cast(pl.Float64).alias("forward_presence")
+    )
+
+
+def forward_presence_breakdown(by_round: pl.LazyFrame) -> pl.LazyFrame:
+    """Turns per-round forward presence into a breakdown where every round weighs the same."""
+    return by_round.select(
+        GAME_ROUND + [pl.col("forward_presence").alias("value"), pl.lit(1, dtype=pl.UInt32).alias("weight")]
+    )
+
+
+def forward_presence(by_round: pl.LazyFrame) -> pl.LazyFrame:
+    """Averages the per-round forward presence of each game into a game_id/value LazyFrame."""
+    return summarize(forward_presence_breakdown(by_round))
 
-    return sum(all_min_distances) / len(all_min_distances)
+
+def calculate_ct_side_forward_presence_by_round(demo) -> pl.DataFrame:
+    """
+    Calculates the CT-side forward presence count for each round.
+
+    Forward players are counted per tick over the first 30 seconds of the round and
+    averaged over the ticks of that round.
+
+    Returns:
+        DataFrame with columns round_num and forward_presence, sorted by round.
+    """
+    if demo is None:
+        return pl.DataFrame(schema={"round_num": pl.Int64, "forward_presence": pl.Float64})
+
+    frames = MatchFrames.from_demo(demo)
+    ct_ticks = select_window_ticks(build_round_ticks(frames)).filter(living("ct"))
+    return _single_game(forward_presence_by_round(ct_ticks, frames.spawns))
 
 
 def calculate_ct_side_forward_presence_count(demo) -> float:
-    """Calculates the CT-side forward presence count for a round."""
+    """Calculates the CT-side forward presence count, averaged over rounds."""
     if demo is None:
         return 0.0
 
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-    t_spawn = demo.t_spawn
-    ct_spawn = demo.ct_spawn
-
-    forward_counts = []
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
-        end_tick = freeze_end + (30 * tickrate)
-
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end) &
-            (pl.col("tick") <= end_tick) &
-            (pl.col("side") == "ct")
-        )
+    frames = MatchFrames.from_demo(demo)
+    ct_ticks = select_window_ticks(build_round_ticks(frames)).filter(living("ct"))
+    return _scalar(forward_presence(forward_presence_by_round(ct_ticks, frames.spawns)))
 
-        if not round_ticks.is_empty():
-            forward_players = 0
-            for tick in round_ticks.iter_rows(named=True):
-                player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-                dist_to_ct_spawn = euclidean_distance(player_pos, ct_spawn)
-                dist_to_t_spawn = euclidean_distance(player_pos, t_spawn)
-
-                if dist_to_t_spawn < dist_to_ct_spawn:
-                    forward_players += 1
-            
-            # Get the number of unique ticks to average the forward_players
-            num_ticks = round_ticks.select(pl.col("tick").n_unique()).item()
-            if num_ticks > 0:
-                forward_counts.append(forward_players / num_ticks)
-
-    if not forward_counts:
-        return 0.0
 
-    return sum(forward_counts) / len(forward_counts)
+def spacing_by_tick(side_ticks: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the pairwise distance between the players of each tick.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick and spacing for ticks with two or more players.
+    """
+    tick_key = GAME_ROUND + ["tick"]
+    positions = side_ticks.select(tick_key + ["X", "Y", "Z"]).with_columns(
+        pl.int_range(pl.len()).over(tick_key).alias("slot")
+    )
+
+    pairs = positions.join(positions, on=tick_key, suffix="_other").filter(
+        pl.col("slot") < pl.col("slot_other")
+    )
+
+    distance = distance_expr(pl.col("X_other"), pl.col("Y_other"), pl.col("Z_other"))
+    return pairs.group_by(tick_key).agg(distance.mean().alias("spacing"))
+
+
+def player_spacing_breakdown(by_tick: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the per-tick spacing of each round.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, value and weight (ticks).
+    """
+    return by_tick.group_by(GAME_ROUND).agg(
+        pl.col("spacing").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def player_spacing(by_tick: pl.LazyFrame) -> pl.LazyFrame:
+    """Averages the per-tick spacing of each game into a game_id/value LazyFrame."""
+    return summarize(player_spacing_breakdown(by_tick))
 
 
 def calculate_player_spacing(demo, side: str) -> float:
@@ -138,42 +474,26 @@ def calculate_player_spacing(demo, side: str) -> float:
     if demo is None:
         return 0.0
 
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-
-    avg_spacings = []
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
-        end_tick = freeze_end + (30 * tickrate)
-
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end) &
-            (pl.col("tick") <= end_tick) &
-            (pl.col("side") == side)
-        )
+    side_ticks = select_window_ticks(build_round_ticks(MatchFrames.from_demo(demo))).filter(living(side))
+    return _scalar(player_spacing(spacing_by_tick(side_ticks)))
 
-        if not round_ticks.is_empty():
-            for tick_num in round_ticks.select("tick").unique().to_series():
-                tick_players = round_ticks.filter(pl.col("tick") == tick_num)
-                if len(tick_players) > 1:
-                    distances = []
-                    player_pos = tick_players.select(["X", "Y", "Z"]).to_dicts()
-                    for i in range(len(player_pos)):
-                        for j in range(i + 1, len(player_pos)):
-                            p1 = {'x': player_pos[i]['X'], 'y': player_pos[i]['Y'], 'z': player_pos[i]['Z']}
-                            p2 = {'x': player_pos[j]['X'], 'y': player_pos[j]['Y'], 'z': player_pos[j]['Z']}
-                            distances.append(euclidean_distance(p1, p2))
-                    
-                    if distances:
-                        avg_spacings.append(sum(distances) / len(distances))
-
-    if not avg_spacings:
-        return 0.0
 
-    return sum(avg_spacings) / len(avg_spacings)
+def rotation_timing_breakdown(rotations: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the rotation duration in seconds per round and player.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value and weight (rotations).
+    """
+    return rotations.group_by(GAME_ROUND_PLAYER).agg(
+        ((pl.col("entry_tick") - pl.col("exit_tick")) / pl.col("tickrate")).mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def rotation_timing(rotations: pl.LazyFrame) -> pl.LazyFrame:
+    """Averages the duration in seconds of each game's rotations into a game_id/value LazyFrame."""
+    return summarize(rotation_timing_breakdown(rotations))
 
 
 def calculate_rotation_timing(demo) -> float:
@@ -181,54 +501,34 @@ def calculate_rotation_timing(demo) -> float:
     if demo is None:
         return 0.0
 
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-    bombsite_locations = demo.bombsite_locations
-
-    rotation_times = []
+    frames = MatchFrames.from_demo(demo)
+    return _scalar(rotation_timing(build_rotations(build_round_ticks(frames), frames.sites)))
 
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
 
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end)
-        )
+def rotation_success_breakdown(rotations: pl.LazyFrame, death_index: pl.LazyFrame,
+                               survival_time: int = 30) -> pl.LazyFrame:
+    """
+    Calculates the share of rotations survived for survival_time seconds per round and player.
 
-        if round_ticks.is_empty():
-            continue
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid, value and weight (rotations).
+    """
+    survival_deadline = pl.col("entry_tick") + survival_time * pl.col("tickrate")
+    died_after_rotation = (
+        (pl.col("death_tick") > pl.col("entry_tick")) &
+        (pl.col("death_tick") <= survival_deadline)
+    ).fill_null(False)
 
-        for player_id in round_ticks.select("player_steamid").unique().to_series():
-            player_ticks = round_ticks.filter(pl.col("player_steamid") == player_id).sort("tick")
-            
-            last_site = None
-            exit_tick = None
+    return _join_death_index(rotations, death_index).group_by(GAME_ROUND_PLAYER).agg(
+        (~died_after_rotation).mean().alias("value"),
+        pl.len().alias("weight")
+    )
 
-            for tick in player_ticks.iter_rows(named=True):
-                player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-                current_site = None
 
-                for site_name, site_loc in bombsite_locations.items():
-                    if euclidean_distance(player_pos, site_loc) <= site_loc["radius"]:
-                        current_site = site_name
-                        break
-                
-                if last_site and not current_site:
-                    exit_tick = tick["tick"]
-
-                if not last_site and current_site and exit_tick:
-                    rotation_time = (tick["tick"] - exit_tick) / tickrate
-                    rotation_times.append(rotation_time)
-                    exit_tick = None
-
-                last_site = current_site
-
-    if not rotation_times:
-        return 0.0
-
-    return sum(rotation_times) / len(rotation_times)
+def rotation_success_rate(rotations: pl.LazyFrame, death_index: pl.LazyFrame,
+                          survival_time: int = 30) -> pl.LazyFrame:
+    """Calculates the share of rotations after which the player survived for survival_time seconds."""
+    return summarize(rotation_success_breakdown(rotations, death_index, survival_time))
 
 
 def calculate_rotation_success_rate(demo, survival_time: int = 30) -> float:
@@ -236,67 +536,53 @@ def calculate_rotation_success_rate(demo, survival_time: int = 30) -> float:
     if demo is None:
         return 0.0
 
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-    bombsite_locations = demo.bombsite_locations
-    player_death_events = demo.events.get("player_death", pl.DataFrame())
+    frames = MatchFrames.from_demo(demo)
+    rotations = build_rotations(build_round_ticks(frames), frames.sites)
+    death_index = index_first_deaths(build_player_deaths(frames))
+    return _scalar(rotation_success_rate(rotations, death_index, survival_time))
 
-    total_rotations = 0
-    successful_rotations = 0
 
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
+def engagement_success_breakdown(rotations: pl.LazyFrame, player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Calculates the share of kills during rotations that the rotating player won.
 
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end)
-        )
+    Every death between a rotation's exit and entry tick is an engagement. It is won
+    when the rotating player is the attacker and survives the rotation.
 
-        if round_ticks.is_empty():
-            continue
-
-        for player_id in round_ticks.select("player_steamid").unique().to_series():
-            player_ticks = round_ticks.filter(pl.col("player_steamid") == player_id).sort("tick")
-            
-            last_site = None
-            exit_tick = None
-
-            for tick in player_ticks.iter_rows(named=True):
-                player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-                current_site = None
-
-                for site_name, site_loc in bombsite_locations.items():
-                    if euclidean_distance(player_pos, site_loc) <= site_loc["radius"]:
-                        current_site = site_name
-                        break
-                
-                if last_site and not current_site:
-                    exit_tick = tick["tick"]
-
-                if not last_site and current_site and exit_tick:
-                    total_rotations += 1
-                    rotation_end_tick = tick["tick"]
-                    survival_deadline = rotation_end_tick + (survival_time * tickrate)
-
-                    player_death = player_death_events.filter(
-                        (pl.col("user_steamid") == player_id) &
-                        (pl.col("tick") > rotation_end_tick) &
-                        (pl.col("tick") <= survival_deadline)
-                    )
-
-                    if player_death.is_empty():
-                        successful_rotations += 1
-                    
-                    exit_tick = None
-
-                last_site = current_site
-
-    if total_rotations == 0:
-        return 0.0
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the rotating player),
+        value and weight (engagements).
+    """
+    deaths = player_deaths.select(
+        GAME_ROUND + [
+            pl.col("tick").alias("death_tick"),
+            pl.col("user_steamid").alias("victim"),
+            pl.col("attacker_steamid").alias("attacker")
+        ]
+    )
 
-    return successful_rotations / total_rotations
+    engagements = rotations.join(deaths, on=GAME_ROUND).filter(
+        (pl.col("death_tick") > pl.col("exit_tick")) &
+        (pl.col("death_tick") <= pl.col("entry_tick"))
+    )
+
+    rotation_key = GAME_ROUND + ["player_steamid", "exit_tick"]
+    player_died = (pl.col("victim") == pl.col("player_steamid")).fill_null(False).any().over(rotation_key)
+    won = (
+        (pl.col("attacker") == pl.col("player_steamid")) &
+        (pl.col("victim") != pl.col("player_steamid")) &
+        ~pl.col("player_died")
+    ).fill_null(False)
+
+    return engagements.with_columns(player_died.alias("player_died")).group_by(GAME_ROUND_PLAYER).agg(
+        won.mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def engagement_success_rate(rotations: pl.LazyFrame, player_deaths: pl.LazyFrame) -> pl.LazyFrame:
+    """Calculates the share of kills during rotations that the rotating player won, per game."""
+    return summarize(engagement_success_breakdown(rotations, player_deaths))
 
 
 def calculate_engagement_success_on_rotation(demo) -> float:
@@ -304,79 +590,88 @@ def calculate_engagement_success_on_rotation(demo) -> float:
     if demo is None:
         return 0.0
 
-    ticks = demo.ticks
-    rounds = demo.rounds
-    tickrate = demo.tickrate
-    bombsite_locations = demo.bombsite_locations
-    player_death_events = demo.events.get("player_death", pl.DataFrame())
+    frames = MatchFrames.from_demo(demo)
+    rotations = build_rotations(build_round_ticks(frames), frames.sites)
+    return _scalar(engagement_success_rate(rotations, build_player_deaths(frames)))
+
+
+def build_executes(frames: MatchFrames, sites: pl.LazyFrame, min_grenades: int = 3,
+                   execute_window: float = 6, execute_radius: float = 1000) -> pl.LazyFrame:
+    """
+    Detects the T-side set execute of every round: a burst of utility at one bombsite.
+
+    Each T grenade is assigned to the nearest site its landing point is within
+    execute_radius of. A rolling window of execute_window seconds over each round's
+    grenades at a site, ordered by time, counts the grenades landed by then; the
+    round's execute starts at the first window that reaches min_grenades.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, site, execute_tick (first grenade
+        of the burst) and grenades (in the burst).
+    """
+    # Landing points as X/Y/Z like tick positions, so the site's x/y/z columns keep their names
+    grenades = pl.concat([
+        frames.event(name).select(GAME_ROUND + ["tick", "user_side", pl.col(["x", "y", "z"]).name.to_uppercase()])
+        for name in GRENADE_EVENTS
+    ]).filter(pl.col("user_side") == "t").drop("user_side").with_row_index("grenade_id")
+
+    aimed = grenades.join(sites.select(["game_id", "site", "x", "y", "z"]), on="game_id").with_columns(
+        distance_expr(pl.col("x"), pl.col("y"), pl.col("z")).alias("site_distance")
+    ).filter(pl.col("site_distance") <= execute_radius).sort("site_distance").unique(
+        "grenade_id", keep="first"
+    ).join(frames.games.select(["game_id", "tickrate"]), on="game_id").with_columns(
+        # Milliseconds since the start of the demo, so one window length fits every tickrate
+        (pl.col("tick") * 1000 // pl.col("tickrate")).alias("time_ms")
+    ).sort("time_ms")
+
+    return aimed.rolling(
+        index_column="time_ms", period=f"{int(execute_window * 1000) + 1}i", group_by=GAME_ROUND + ["site"]
+    ).agg(
+        pl.len().alias("grenades"),
+        pl.col("tick").min().alias("execute_tick"),
+        pl.col("tick").max().alias("burst_tick")
+    ).filter(pl.col("grenades") >= min_grenades).sort("burst_tick").group_by(GAME_ROUND, maintain_order=True).agg(
+        pl.all().first()
+    ).select(GAME_ROUND + ["site", "execute_tick", pl.col("grenades").cast(pl.Int64)])
+
+
+def calculate_executes(demo, min_grenades: int = 3, execute_window: float = 6) -> pl.DataFrame:
+    """
+    Detects the T-side set executes of a demo.
+
+    Returns:
+        DataFrame with columns round_num, site, execute_tick and grenades.
+    """
+    if demo is None:
+        return pl.DataFrame(schema={"round_num": pl.Int64, "site": pl.String,
+                                    "execute_tick": pl.Int64, "grenades": pl.Int64})
 
-    total_engagements = 0
-    successful_engagements = 0
+    frames = MatchFrames.from_demo(demo)
+    return _single_game(build_executes(frames, frames.sites, min_grenades, execute_window))
 
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
 
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end)
-        )
+def round_win_breakdown(frames: MatchFrames, executes: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Marks every executed round with whether the T side won it.
 
-        if round_ticks.is_empty():
-            continue
-
-        for player_id in round_ticks.select("player_steamid").unique().to_series():
-            player_ticks = round_ticks.filter(pl.col("player_steamid") == player_id).sort("tick")
-            
-            last_site = None
-            exit_tick = None
-
-            for tick in player_ticks.iter_rows(named=True):
-                player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-                current_site = None
-
-                for site_name, site_loc in bombsite_locations.items():
-                    if euclidean_distance(player_pos, site_loc) <= site_loc["radius"]:
-                        current_site = site_name
-                        break
-                
-                if last_site and not current_site:
-                    exit_tick = tick["tick"]
-
-                if not last_site and current_site and exit_tick:
-                    rotation_start_tick = exit_tick
-                    rotation_end_tick = tick["tick"]
-
-                    # Check for engagements during rotation
-                    rotation_engagements = player_death_events.filter(
-                        (pl.col("tick") > rotation_start_tick) &
-                        (pl.col("tick") <= rotation_end_tick)
-                    )
-
-                    if not rotation_engagements.is_empty():
-                        for engagement in rotation_engagements.iter_rows(named=True):
-                            total_engagements += 1
-                            attacker = engagement.get("attacker_steamid")
-                            victim = engagement.get("user_steamid")
-
-                            if attacker == player_id and victim != player_id:
-                                # Check if the rotating player survived the engagement
-                                player_died_in_engagement = player_death_events.filter(
-                                    (pl.col("tick") > rotation_start_tick) &
-                                    (pl.col("tick") <= rotation_end_tick) &
-                                    (pl.col("user_steamid") == player_id)
-                                ).is_empty()
-                                if player_died_in_engagement:
-                                    successful_engagements += 1
-
-                    exit_tick = None
-
-                last_site = current_site
-
-    if total_engagements == 0:
-        return 0.0
+    Returns:
+        LazyFrame with columns game_id, round_num, value (1.0 for a T win) and weight.
+    """
+    executed_rounds = executes.select(GAME_ROUND).unique()
 
-    return successful_engagements / total_engagements
+    return executed_rounds.join(
+        frames.rounds.select(GAME_ROUND + ["winner_side"]), on=GAME_ROUND, how="left"
+    ).select(
+        GAME_ROUND + [
+            (pl.col("winner_side") == "t").fill_null(False).cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def round_win_percentage(frames: MatchFrames, executes: pl.LazyFrame) -> pl.LazyFrame:
+    """Calculates the share of executed rounds won by the T side for each game."""
+    return summarize(round_win_breakdown(frames, executes))
 
 
 def calculate_round_win_percentage(demo) -> float:
@@ -384,124 +679,138 @@ def calculate_round_win_percentage(demo) -> float:
     if demo is None:
         return 0.0
 
-    rounds = demo.rounds
-    bomb_planted_events = demo.events.get("bomb_planted", pl.DataFrame())
+    frames = MatchFrames.from_demo(demo)
+    return _scalar(round_win_percentage(frames, build_executes(frames, frames.sites)))
 
-    if bomb_planted_events.is_empty():
-        return 0.0
 
-    planted_rounds = bomb_planted_events.select("round_num").unique().to_series()
-    
-    total_planted_rounds = len(planted_rounds)
-    if total_planted_rounds == 0:
-        return 0.0
+def entry_by_round(round_ticks: pl.LazyFrame, death_index: pl.LazyFrame, sites: pl.LazyFrame,
+                   executes: pl.LazyFrame, entry_time_window: int = 15) -> pl.LazyFrame:
+    """
+    Detects the T-side site entry of every executed round.
 
-    won_planted_rounds = rounds.filter(
-        (pl.col("round_num").is_in(planted_rounds)) &
-        (pl.col("winner_side") == "t")
-    ).height
+    The entry is the earliest tick within the entry window after the execute starts
+    at which a T player is inside the executed site's radius without dying before
+    the window ends.
 
-    return won_planted_rounds / total_planted_rounds
+    Returns:
+        LazyFrame with columns game_id, round_num, entry_success, entry_player and entry_tick.
+        entry_player and entry_tick are null for rounds without a successful entry.
+    """
+    t_ticks = round_ticks.filter(pl.col("side") == "t").join(
+        executes.select(GAME_ROUND + ["site", "execute_tick"]), on=GAME_ROUND
+    )
 
+    entry_window_end = pl.col("execute_tick") + entry_time_window * pl.col("tickrate")
 
-def calculate_entry_success_rate(demo, entry_time_window: int = 15) -> float:
-    """Calculates the T-side entry success rate for set executes."""
-    if demo is None:
-        return 0.0
+    in_site = t_ticks.filter(
+        (pl.col("tick") >= pl.col("execute_tick")) & (pl.col("tick") <= entry_window_end)
+    ).join(
+        sites, on=["game_id", "site"]
+    ).filter(_in_site_radius())
 
-    rounds = demo.rounds
-    ticks = demo.ticks
-    tickrate = demo.tickrate
-    player_death_events = demo.events.get("player_death", pl.DataFrame())
-    bombsite_locations = demo.bombsite_locations
-
-    total_executes = 0
-    successful_entries = 0
-
-    for r in rounds.iter_rows(named=True):
-        round_num = r["round_num"]
-        freeze_end = r["freeze_end"]
-        
-        round_ticks = ticks.filter(
-            (pl.col("round_num") == round_num) &
-            (pl.col("tick") >= freeze_end) &
-            (pl.col("side") == "t")
-        )
+    entries = _join_death_index(in_site, death_index).filter(
+        pl.col("death_tick").is_null() | (pl.col("death_tick") > entry_window_end)
+    ).group_by(GAME_ROUND).agg(
+        pl.col("player_steamid").sort_by("tick").first().alias("entry_player"),
+        pl.col("tick").min().alias("entry_tick")
+    )
 
-        if round_ticks.is_empty():
-            continue
+    return executes.select(GAME_ROUND).unique().join(entries, on=GAME_ROUND, how="left").with_columns(
+        pl.col("entry_tick").is_not_null().alias("entry_success")
+    ).select(GAME_ROUND + ["entry_success", "entry_player", "entry_tick"])
 
-        # Simplified: Assume an execute happens in any T-side round for now.
-        # A more complex implementation would detect coordinated pushes.
-        total_executes += 1
-        
-        entry_window_end = freeze_end + (entry_time_window * tickrate)
 
-        entry_ticks = round_ticks.filter(
-            (pl.col("tick") <= entry_window_end)
-        )
+def calculate_entry_by_round(demo, entry_time_window: int = 15) -> pl.DataFrame:
+    """
+    Detects the T-side site entry of every executed round of a demo.
 
-        entry_success = False
-        for tick in entry_ticks.iter_rows(named=True):
-            player_pos = {'x': tick['X'], 'y': tick['Y'], 'z': tick['Z']}
-            for site_loc in bombsite_locations.values():
-                if euclidean_distance(player_pos, site_loc) <= site_loc.get("radius", 200): # Default radius
-                    # Check if player survived the entry
-                    player_id = tick["player_steamid"]
-                    death_event = player_death_events.filter(
-                        (pl.col("user_steamid") == player_id) &
-                        (pl.col("tick") <= entry_window_end)
-                    )
-                    if death_event.is_empty():
-                        entry_success = True
-                        break
-            if entry_success:
-                break
-        
-        if entry_success:
-            successful_entries += 1
-
-    if total_executes == 0:
-        return 0.0
+    Args:
+        demo: Parsed demo
+        entry_time_window: Seconds after the execute starts in which the entry must happen
 
-    return successful_entries / total_executes
+    Returns:
+        DataFrame with columns round_num, entry_success, entry_player and entry_tick.
+    """
+    if demo is None:
+        return pl.DataFrame(schema={"round_num": pl.Int64, "entry_success": pl.Boolean,
+                                    "entry_player": pl.Int64, "entry_tick": pl.Int64})
 
+    frames = MatchFrames.from_demo(demo)
+    death_index = index_first_deaths(build_player_deaths(frames))
+    executes = build_executes(frames, frames.sites)
+    return _single_game(
+        entry_by_round(build_round_ticks(frames), death_index, frames.sites, executes, entry_time_window)
+    )
 
-def calculate_trade_efficiency(demo, trade_time_window: int = 5) -> float:
-    """Calculates the T-side trade efficiency for set executes."""
+
+def entry_success_breakdown(entries: pl.LazyFrame) -> pl.LazyFrame:
+    """Turns the entry of every executed round into a breakdown with value 1.0 for a successful entry."""
+    return entries.select(
+        GAME_ROUND + [
+            pl.col("entry_success").cast(pl.Float64).alias("value"),
+            pl.lit(1, dtype=pl.UInt32).alias("weight")
+        ]
+    )
+
+
+def entry_success_rate(entries: pl.LazyFrame) -> pl.LazyFrame:
+    """Calculates the share of executed rounds with a successful entry for each game."""
+    return summarize(entry_success_breakdown(entries))
+
+
+def calculate_entry_success_rate(demo, entry_time_window: int = 15) -> float:
+    """Calculates the T-side entry success rate for set executes."""
     if demo is None:
         return 0.0
 
-    player_death_events = demo.events.get("player_death", pl.DataFrame())
-    tickrate = demo.tickrate
+    frames = MatchFrames.from_demo(demo)
+    death_index = index_first_deaths(build_player_deaths(frames))
+    executes = build_executes(frames, frames.sites)
+    entries = entry_by_round(build_round_ticks(frames), death_index, frames.sites, executes, entry_time_window)
+    return _scalar(entry_success_rate(entries))
 
-    if player_death_events.is_empty():
-        return 0.0
 
-    t_deaths = 0
-    traded_deaths = 0
+def trade_efficiency_breakdown(player_deaths: pl.LazyFrame, games: pl.LazyFrame,
+                               trade_time_window: int = 5) -> pl.LazyFrame:
+    """
+    Calculates the share of T deaths followed by a T kill on a CT within the trade window.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the T player who died),
+        value and weight (deaths).
+    """
+    t_deaths = player_deaths.filter(pl.col("user_side") == "t").join(
+        games.select(["game_id", "tickrate"]), on="game_id"
+    ).select(
+        ["game_id", "round_num", pl.col("user_steamid").alias("player_steamid"), "tick", "tickrate"]
+    ).sort("tick")
+
+    trade_kills = player_deaths.filter(
+        (pl.col("user_side") == "ct") &
+        (pl.col("attacker_side") == "t")
+    ).select(["game_id", pl.col("tick").alias("trade_tick")]).sort("trade_tick")
+
+    next_trades = t_deaths.join_asof(
+        trade_kills, left_on="tick", right_on="trade_tick", by="game_id",
+        strategy="forward", allow_exact_matches=False, check_sortedness=False
+    )
 
-    t_players = demo.t_players
-    ct_players = demo.ct_players
+    traded = (pl.col("trade_tick") <= pl.col("tick") + trade_time_window * pl.col("tickrate")).fill_null(False)
+    return next_trades.group_by(GAME_ROUND_PLAYER).agg(
+        traded.mean().alias("value"),
+        pl.len().alias("weight")
+    )
 
-    for death in player_death_events.iter_rows(named=True):
-        if death.get("user_side") == "t":
-            t_deaths += 1
-            death_tick = death["tick"]
-            trade_window_end = death_tick + (trade_time_window * tickrate)
 
-            # Check for a CT death within the trade window
-            trade_kill = player_death_events.filter(
-                (pl.col("tick") > death_tick) &
-                (pl.col("tick") <= trade_window_end) &
-                (pl.col("user_side") == "ct") &
-                (pl.col("attacker_side") == "t")
-            )
+def trade_efficiency(player_deaths: pl.LazyFrame, games: pl.LazyFrame, trade_time_window: int = 5) -> pl.LazyFrame:
+    """Calculates the share of T deaths followed by a T kill on a CT within the trade window, per game."""
+    return summarize(trade_efficiency_breakdown(player_deaths, games, trade_time_window))
 
-            if not trade_kill.is_empty():
-                traded_deaths += 1
 
-    if t_deaths == 0:
+def calculate_trade_efficiency(demo, trade_time_window: int = 5) -> float:
+    """Calculates the T-side trade efficiency for set executes."""
+    if demo is None:
         return 0.0
 
-    return traded_deaths / t_deaths
+    frames = MatchFrames.from_demo(demo)
+    return _scalar(trade_efficiency(build_player_deaths(frames), frames.games, trade_time_window))
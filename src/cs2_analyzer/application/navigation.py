@@ -0,0 +1,185 @@
+"""
+Nav-mesh path distances.
+
+Straight-line distance ignores walls. build_nav_distances() turns an awpy nav mesh
+into an area-to-area shortest-path matrix (multi-source Dijkstra over the area graph,
+edges weighted by the distance between area centroids) once per map, offline; the
+result is saved as compressed NumPy and cached per map by nav_distances(). At query
+time positions are mapped to nav areas with a vectorized nearest-area lookup and the
+path distance is a single gather from the matrix.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import polars as pl
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from .geometry import as_points
+
+DEFAULT_NAV_DIR = "data/nav"
+
+# How far below an area's lowest corner and above its highest corner a player's
+# feet may be and still count as standing on it (stairs, jumps, crouch-walking).
+AREA_Z_BELOW = 32.0
+AREA_Z_ABOVE = 72.0
+
+# Nearest area centroids considered per position before falling back to the nearest.
+AREA_CANDIDATES = 8
+
+
+class NavDistances:
+    """Area-to-area shortest-path distances of one map, with position lookup."""
+
+    def __init__(self, area_ids: np.ndarray, centroids: np.ndarray, bounds: np.ndarray, distances: np.ndarray):
+        """
+        Args:
+            area_ids: (A,) nav area ids; row i of every array describes area_ids[i]
+            centroids: (A, 3) area centroids
+            bounds: (A, 6) min_x, min_y, min_z, max_x, max_y, max_z of each area's corners
+            distances: (A, A) shortest path length from row area to column area, inf if unreachable
+        """
+        self.area_ids = np.asarray(area_ids, dtype=np.int64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float32)
+        self._tree = cKDTree(self.centroids)
+
+    def save(self, path) -> None:
+        """Save as a compressed .npz file."""
+        np.savez_compressed(path, area_ids=self.area_ids, centroids=self.centroids,
+                            bounds=self.bounds, distances=self.distances)
+
+    @classmethod
+    def load(cls, path) -> "NavDistances":
+        """Load from a file written by save()."""
+        with np.load(path) as data:
+            return cls(data["area_ids"], data["centroids"], data["bounds"], data["distances"])
+
+    def area_of(self, points) -> np.ndarray:
+        """
+        Index (into area_ids) of the nav area each position stands on.
+
+        Among the nearest area centroids, the first area whose X/Y bounds contain the
+        position and whose height range is within reach is chosen; positions on no
+        candidate area get the area with the nearest centroid.
+
+        Args:
+            points: (N, 3) positions
+
+        Returns:
+            (N,) area indices
+        """
+        points = as_points(points)
+        k = min(AREA_CANDIDATES, len(self.area_ids))
+        _, candidates = self._tree.query(points, k=k)
+        candidates = candidates.reshape(len(points), k)
+
+        bounds = self.bounds[candidates]
+        x, y, z = (points[:, axis, None] for axis in range(3))
+        on_area = (
+            (x >= bounds[..., 0]) & (x <= bounds[..., 3]) &
+            (y >= bounds[..., 1]) & (y <= bounds[..., 4]) &
+            (z >= bounds[..., 2] - AREA_Z_BELOW) & (z <= bounds[..., 5] + AREA_Z_ABOVE)
+        )
+        first = np.where(on_area.any(axis=1), on_area.argmax(axis=1), 0)
+        return candidates[np.arange(len(points)), first]
+
+    def path_distance(self, points, others) -> np.ndarray:
+        """
+        Path distance between each position and the matching position of others.
+
+        Positions on the same area use the straight-line distance.
+
+        Args:
+            points: (N, 3) positions
+            others: (N, 3) positions, or one (3,) position for all rows
+
+        Returns:
+            (N,) distances, inf where no path exists
+        """
+        points = as_points(points)
+        others = np.asarray(others, dtype=np.float64)
+        if others.ndim == 1:
+            target = np.full(len(points), self.area_of(others)[0])
+            others = np.broadcast_to(others, points.shape)
+        else:
+            others = as_points(others)
+            target = self.area_of(others)
+
+        source = self.area_of(points)
+        result = self.distances[source, target].astype(np.float64)
+        same = source == target
+        diff = points[same] - others[same]
+        result[same] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        return result
+
+    def distance_expr(self, x, y, z) -> pl.Expr:
+        """
+        Polars expression for the path distance of X/Y/Z rows to a point, usable in lazy plans.
+
+        Args:
+            x, y, z: Target coordinates as numbers, or column names of per-row targets
+        """
+        if all(isinstance(coord, str) for coord in (x, y, z)):
+            def batch(rows: pl.Series) -> pl.Series:
+                fields = [rows.struct.field(col).to_numpy() for col in ("X", "Y", "Z", x, y, z)]
+                return pl.Series(self.path_distance(np.column_stack(fields[:3]), np.column_stack(fields[3:])))
+
+            return pl.struct(["X", "Y", "Z", x, y, z]).map_batches(batch, return_dtype=pl.Float64)
+
+        def batch_to_point(rows: pl.Series) -> pl.Series:
+            points = np.column_stack([rows.struct.field(col).to_numpy() for col in ("X", "Y", "Z")])
+            return pl.Series(self.path_distance(points, np.array([x, y, z], dtype=np.float64)))
+
+        return pl.struct(["X", "Y", "Z"]).map_batches(batch_to_point, return_dtype=pl.Float64)
+
+
+def build_nav_distances(nav) -> NavDistances:
+    """
+    Compute all area-to-area shortest paths of an awpy nav mesh.
+
+    Args:
+        nav: awpy.nav.Nav (e.g. Nav.from_json(awpy.data.NAVS_DIR / "de_mirage.json"))
+
+    Returns:
+        NavDistances over every area of the mesh
+    """
+    area_ids = np.array(sorted(nav.areas), dtype=np.int64)
+    position = {area_id: i for i, area_id in enumerate(area_ids)}
+
+    corners = [np.array([(c.x, c.y, c.z) for c in nav.areas[area_id].corners], dtype=np.float64).reshape(-1, 3)
+               for area_id in area_ids]
+    centroids = np.array([c.mean(axis=0) if len(c) else np.zeros(3) for c in corners])
+    bounds = np.array([np.concatenate((c.min(axis=0), c.max(axis=0))) if len(c) else np.zeros(6) for c in corners])
+
+    edges = np.array([
+        (position[area_id], position[other])
+        for area_id in area_ids for other in nav.areas[area_id].connected_areas if other in position
+    ], dtype=np.int64).reshape(-1, 2)
+    sources, targets = edges[:, 0], edges[:, 1]
+    weights = np.linalg.norm(centroids[sources] - centroids[targets], axis=1)
+    # Coincident centroids would read as a missing edge in a sparse matrix.
+    weights = np.maximum(weights, 1e-3)
+
+    graph = csr_matrix((weights, (sources, targets)), shape=(len(area_ids), len(area_ids)))
+    distances = dijkstra(graph, directed=True)
+    return NavDistances(area_ids, centroids, bounds, distances.astype(np.float32))
+
+
+@lru_cache(maxsize=None)
+def nav_distances(map_name: str, nav_dir: str = DEFAULT_NAV_DIR) -> Optional[NavDistances]:
+    """
+    The cached path distance tables of a map, loaded from <nav_dir>/<map_name>.npz.
+
+    Returns:
+        The tables, or None when the map has not been built
+    """
+    path = Path(nav_dir) / f"{map_name}.npz"
+    if not path.exists():
+        return None
+    return NavDistances.load(path)
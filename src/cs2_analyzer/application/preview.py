@@ -0,0 +1,163 @@
+"""
+Approximate preview of the positional metrics.
+
+Positional metrics scale with the tick table. For quick triage they can run on a
+stratified sample instead: in every round a fixed fraction of the ticks is drawn
+at random and every player's row at a drawn tick is kept, so each round and each
+player is represented in proportion to the full data and per-tick metrics still see
+all players together. The estimate is the usual weighted mean of the sampled
+breakdown; its confidence interval comes from a bootstrap over rounds, vectorized
+as one (samples x rounds) index matrix per metric.
+
+Only metrics that average a per-tick value are previewed. Rotations, entries and
+fire exposures depend on transitions between consecutive ticks or on a player being
+seen somewhere at all; a tick sample misses them, which biases the estimate in a way
+the bootstrap over rounds cannot show. Those metrics are exact-only.
+"""
+
+from dataclasses import replace
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import polars as pl
+
+from .frames import MatchFrames
+from .metric_registry import BatchMetricEvaluator, MetricRegistry
+from .metrics import GAME_ROUND
+
+DEFAULT_SAMPLE_FRACTION = 0.1
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_BOOTSTRAP_SAMPLES = 1000
+
+# The intermediate every positional metric is built from
+TICK_INPUT = "round_ticks"
+
+# Positional metrics that are means of a per-tick value, so a tick sample estimates them without bias
+SAMPLEABLE_METRICS = [
+    "t_side_avg_dist_to_bombsite",
+    "ct_side_forward_presence_count",
+    "t_side_player_spacing",
+    "ct_side_player_spacing",
+    "crossfire_density",
+]
+
+PREVIEW_SCHEMA = {
+    "game_id": pl.String,
+    "metric": pl.String,
+    "value": pl.Float64,
+    "ci_low": pl.Float64,
+    "ci_high": pl.Float64,
+    "rounds": pl.Int64,
+}
+
+
+def positional_metrics(registry: MetricRegistry) -> List[str]:
+    """Names of the registered metrics built from the tick table."""
+    return [name for name in registry.names()
+            if any(metric_input.name == TICK_INPUT for metric_input in registry.resolve_inputs([name]))]
+
+
+def preview_metrics(registry: MetricRegistry) -> List[str]:
+    """Names of the registered positional metrics that can be previewed on a tick sample."""
+    return [name for name in positional_metrics(registry) if name in SAMPLEABLE_METRICS]
+
+
+def sample_ticks(ticks: pl.LazyFrame, fraction: float = DEFAULT_SAMPLE_FRACTION, seed: int = 0) -> pl.LazyFrame:
+    """
+    Draw a stratified sample of ticks: the same fraction of every round's ticks, at least one.
+
+    All player rows of a drawn tick are kept.
+    """
+    drawn = ticks.select(GAME_ROUND + ["tick"]).unique().sort(GAME_ROUND + ["tick"]).with_columns(
+        pl.int_range(pl.len()).shuffle(seed=seed).over(GAME_ROUND).alias("draw"),
+        pl.len().over(GAME_ROUND).alias("round_ticks")
+    ).filter(
+        pl.col("draw") < (pl.col("round_ticks") * fraction).ceil().clip(lower_bound=1)
+    ).select(GAME_ROUND + ["tick"])
+
+    return ticks.join(drawn, on=GAME_ROUND + ["tick"], how="semi")
+
+
+def sample_frames(frames: MatchFrames, fraction: float = DEFAULT_SAMPLE_FRACTION, seed: int = 0) -> MatchFrames:
+    """The frames with their tick table replaced by a stratified sample."""
+    return replace(frames, ticks=sample_ticks(frames.ticks, fraction, seed))
+
+
+def bootstrap_intervals(breakdown: pl.DataFrame, confidence: float = DEFAULT_CONFIDENCE,
+                        samples: int = DEFAULT_BOOTSTRAP_SAMPLES, seed: int = 0) -> pl.DataFrame:
+    """
+    Estimate each game's metric values with percentile bootstrap intervals over rounds.
+
+    Args:
+        breakdown: Per-round breakdown with columns metric, game_id, round_num, value and weight
+        confidence: Coverage of the interval
+        samples: Bootstrap resamples
+        seed: Random seed
+
+    Returns:
+        DataFrame with the columns of PREVIEW_SCHEMA
+    """
+    rng = np.random.default_rng(seed)
+    tail = (1 - confidence) / 2 * 100
+    rows = []
+
+    usable = breakdown.filter(pl.col("value").is_not_null() & pl.col("value").is_not_nan() & (pl.col("weight") > 0))
+    for (metric, game_id), group in usable.group_by(["metric", "game_id"], maintain_order=True):
+        values = group["value"].to_numpy()
+        weights = group["weight"].to_numpy().astype(np.float64)
+        estimate = float(np.average(values, weights=weights))
+
+        draws = rng.integers(0, len(values), size=(samples, len(values)))
+        resampled = (values[draws] * weights[draws]).sum(axis=1) / weights[draws].sum(axis=1)
+        low, high = np.percentile(resampled, [tail, 100 - tail])
+        rows.append({"game_id": game_id, "metric": metric, "value": estimate,
+                     "ci_low": float(low), "ci_high": float(high), "rounds": len(values)})
+
+    return pl.DataFrame(rows, schema=PREVIEW_SCHEMA)
+
+
+class PreviewEvaluator:
+    """Evaluates positional metrics on a stratified tick sample, with bootstrap confidence intervals."""
+
+    def __init__(self, evaluator: Optional[BatchMetricEvaluator] = None,
+                 fraction: float = DEFAULT_SAMPLE_FRACTION, confidence: float = DEFAULT_CONFIDENCE,
+                 samples: int = DEFAULT_BOOTSTRAP_SAMPLES, seed: int = 0):
+        if not 0 < fraction <= 1:
+            raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+        self.evaluator = evaluator or BatchMetricEvaluator()
+        self.fraction = fraction
+        self.confidence = confidence
+        self.samples = samples
+        self.seed = seed
+
+    def evaluate_frames(self, frames: MatchFrames, metric_names: Optional[Iterable[str]] = None,
+                        params: Optional[Dict[str, Dict[str, Any]]] = None) -> pl.DataFrame:
+        """
+        Preview metrics for every game of a set of lazy tables.
+
+        Args:
+            frames: Lazy tables of one or more games
+            metric_names: Metrics to preview (default: every metric of preview_metrics())
+            params: Per-metric parameter overrides, keyed by metric name
+
+        Returns:
+            DataFrame with columns game_id, metric, value, ci_low, ci_high and rounds
+            (rounds behind the estimate); metrics without a value in a game are left out
+
+        Raises:
+            ValueError: If a requested metric is exact-only
+        """
+        sampleable = preview_metrics(self.evaluator.registry)
+        names = list(metric_names) if metric_names is not None else sampleable
+        exact_only = [name for name in names if name not in sampleable]
+        if exact_only:
+            raise ValueError(f"Metrics {exact_only} cannot be estimated from a tick sample; compute them exactly")
+        breakdown = self.evaluator.breakdown_frames(
+            sample_frames(frames, self.fraction, self.seed), names, params, by=GAME_ROUND
+        )
+        return bootstrap_intervals(breakdown, self.confidence, self.samples, self.seed)
+
+    def evaluate(self, demo, metric_names: Optional[Iterable[str]] = None,
+                 params: Optional[Dict[str, Dict[str, Any]]] = None) -> pl.DataFrame:
+        """Preview metrics for a demo; as evaluate_frames without the game_id column."""
+        return self.evaluate_frames(MatchFrames.from_demo(demo), metric_names, params).drop("game_id")
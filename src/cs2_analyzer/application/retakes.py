@@ -0,0 +1,204 @@
+"""
+Retake feature extraction.
+
+Every post-plant tick of every round becomes one snapshot row with the features of
+the predictive retake model (player_advantage, time_remaining, total_ct_utility_value)
+and the round outcome as label. The pipeline is a single lazy polars plan: alive
+counts and the plant are looked up in the game-state timeline with as-of joins, the
+bomb timer counts down from the plant tick, and CT utility is the running balance of
+grenades picked up and thrown by each living CT player. Nothing loops over rounds or
+ticks in Python, so the plan runs over the whole Parquet store at once or in batches
+of games.
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from .frames import MatchFrames
+from .game_state import BOMB_TIMER, build_game_state, round_players, state_at
+from .metrics import GAME_ROUND
+
+SNAPSHOT_KEY = GAME_ROUND + ["tick"]
+
+# Utility value of each grenade type: its price
+GRENADE_VALUES = {
+    "smokegrenade": 300,
+    "flashbang": 200,
+    "hegrenade": 300,
+    "molotov": 400,
+    "incgrenade": 600,
+    "decoy": 50,
+}
+
+FEATURE_COLUMNS = ["player_advantage", "time_remaining", "total_ct_utility_value"]
+
+FEATURE_SCHEMA = {
+    "game_id": pl.String,
+    "round_num": pl.Int64,
+    "tick": pl.Int64,
+    "ct_alive": pl.Int64,
+    "t_alive": pl.Int64,
+    "player_advantage": pl.Int64,
+    "time_remaining": pl.Float64,
+    "total_ct_utility_value": pl.Int64,
+    "ct_win": pl.Boolean,
+}
+
+
+def post_plant_snapshots(frames: MatchFrames, game_state: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Lists the post-plant ticks of every round with a plant.
+
+    A snapshot is a stored tick from the plant until the bomb is defused, explodes or
+    its timer runs out. Plant and end ticks come from the game-state timeline.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick and time_remaining (seconds on the bomb timer).
+    """
+    plants = game_state.filter(pl.col("bomb_planted")).group_by(GAME_ROUND).agg(
+        pl.col("clock_tick").first().alias("plant_tick"),
+        pl.col("clock_seconds").first().alias("bomb_timer"),
+        pl.col("tickrate").first(),
+        pl.col("tick").filter(pl.col("bomb_defused") | pl.col("bomb_exploded")).min().alias("bomb_end_tick"),
+    )
+
+    return frames.ticks.select(SNAPSHOT_KEY).unique().join(plants, on=GAME_ROUND).with_columns(
+        (pl.col("bomb_timer") - (pl.col("tick") - pl.col("plant_tick")) / pl.col("tickrate")).alias("time_remaining")
+    ).filter(
+        (pl.col("tick") >= pl.col("plant_tick")) & (pl.col("time_remaining") >= 0) &
+        (pl.col("bomb_end_tick").is_null() | (pl.col("tick") <= pl.col("bomb_end_tick")))
+    ).select(SNAPSHOT_KEY + ["time_remaining"])
+
+
+def alive_counts(snapshots: pl.LazyFrame, game_state: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Looks up the living players of each side at every snapshot in the game-state timeline.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick, ct_alive and t_alive.
+    """
+    return state_at(game_state, snapshots.select(SNAPSHOT_KEY)).select(
+        SNAPSHOT_KEY + [pl.col(["ct_alive", "t_alive"]).fill_null(0)]
+    )
+
+
+def ct_utility_value(snapshots: pl.LazyFrame, players: pl.LazyFrame, frames: MatchFrames) -> pl.LazyFrame:
+    """
+    Sums the value of the grenades the living CT players hold at every snapshot.
+
+    A player's holding of a grenade type is the running count of pickups minus
+    throws in the round, floored at zero. Grenades kept from the previous round are
+    not seen by either event and are not counted.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, tick and total_ct_utility_value.
+    """
+    grenade_types = list(GRENADE_VALUES)
+    holder_key = GAME_ROUND + ["player_steamid", "grenade"]
+
+    pickups = frames.event("item_pickup").select(
+        GAME_ROUND + ["tick", "user_steamid", pl.col("item").str.strip_prefix("weapon_").alias("grenade"),
+                      pl.lit(1).alias("change")]
+    )
+    throws = frames.event("weapon_fire").select(
+        GAME_ROUND + ["tick", "user_steamid", pl.col("weapon").str.strip_prefix("weapon_").alias("grenade"),
+                      pl.lit(-1).alias("change")]
+    )
+    ct_players = players.filter(pl.col("side") == "ct").select(GAME_ROUND + ["player_steamid", "death_tick"])
+
+    balances = pl.concat([pickups, throws]).filter(pl.col("grenade").is_in(grenade_types)).rename(
+        {"user_steamid": "player_steamid", "tick": "change_tick"}
+    ).join(ct_players.select(GAME_ROUND + ["player_steamid"]), on=GAME_ROUND + ["player_steamid"]).sort(
+        "change_tick"
+    ).with_columns(
+        pl.col("change").cum_sum().over(holder_key).clip(lower_bound=0).alias("held")
+    ).select(holder_key + ["change_tick", "held"])
+
+    held = snapshots.select(SNAPSHOT_KEY).join(ct_players, on=GAME_ROUND).filter(
+        pl.col("death_tick").is_null() | (pl.col("death_tick") > pl.col("tick"))
+    ).join(
+        pl.LazyFrame({"grenade": grenade_types}), how="cross"
+    ).sort("tick").join_asof(
+        balances, left_on="tick", right_on="change_tick", by=holder_key, strategy="backward",
+        check_sortedness=False
+    )
+
+    values = pl.col("grenade").replace_strict(GRENADE_VALUES, return_dtype=pl.Int64)
+    totals = held.group_by(SNAPSHOT_KEY).agg(
+        (pl.col("held").fill_null(0) * values).sum().alias("total_ct_utility_value")
+    )
+    return snapshots.select(SNAPSHOT_KEY).join(totals, on=SNAPSHOT_KEY, how="left").with_columns(
+        pl.col("total_ct_utility_value").fill_null(0).cast(pl.Int64)
+    )
+
+
+def retake_features(frames: MatchFrames, bomb_timer: float = BOMB_TIMER) -> pl.LazyFrame:
+    """
+    Builds the retake training matrix: one row per post-plant snapshot.
+
+    Returns:
+        LazyFrame with the columns of FEATURE_SCHEMA. player_advantage is living CTs
+        minus living Ts; ct_win is the label (null when the round winner is unknown).
+    """
+    game_state = build_game_state(frames, bomb_timer=bomb_timer)
+    snapshots = post_plant_snapshots(frames, game_state)
+    players = round_players(frames)
+
+    outcomes = frames.rounds.select(
+        GAME_ROUND + [pl.when(pl.col("winner_side").is_null()).then(None).otherwise(
+            pl.col("winner_side").str.to_lowercase() == "ct"
+        ).alias("ct_win")]
+    )
+
+    return snapshots.join(alive_counts(snapshots, game_state), on=SNAPSHOT_KEY).join(
+        ct_utility_value(snapshots, players, frames), on=SNAPSHOT_KEY
+    ).join(outcomes, on=GAME_ROUND, how="left").with_columns(
+        (pl.col("ct_alive") - pl.col("t_alive")).alias("player_advantage")
+    ).select(list(FEATURE_SCHEMA)).cast(FEATURE_SCHEMA).sort(SNAPSHOT_KEY)
+
+
+def write_retake_features(frames: MatchFrames, output_path, game_ids: Optional[Iterable[str]] = None,
+                          batch_size: int = 50, bomb_timer: float = BOMB_TIMER) -> int:
+    """
+    Write the retake training matrix of many games to one Parquet file.
+
+    Games are processed in batches of batch_size, each written as its own row
+    group, so memory stays bounded however many games are stored.
+
+    Args:
+        frames: Lazy tables of the games, e.g. ParquetGameRepository.scan_frames()
+        output_path: Parquet file to write
+        game_ids: Restrict to these games (default: every game of frames)
+        batch_size: Games per batch
+        bomb_timer: Seconds from plant to detonation
+
+    Returns:
+        Number of snapshot rows written
+    """
+    if game_ids is None:
+        game_ids = frames.games.select("game_id").collect()["game_id"].to_list()
+    game_ids = list(game_ids)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    empty = pl.DataFrame(schema=FEATURE_SCHEMA).to_arrow()
+
+    rows = 0
+    with pq.ParquetWriter(output_path, empty.schema) as writer:
+        for start in range(0, len(game_ids), batch_size):
+            batch = frames.where(game_ids=game_ids[start:start + batch_size])
+            features = retake_features(batch, bomb_timer).collect().to_arrow()
+            if features.num_rows:
+                writer.write_table(features)
+                rows += features.num_rows
+        if rows == 0:
+            writer.write_table(empty)
+    return rows
+
+
+def calculate_retake_features(demo, bomb_timer: float = BOMB_TIMER) -> pl.DataFrame:
+    """Computes the retake feature snapshots of a demo."""
+    return retake_features(MatchFrames.from_demo(demo), bomb_timer).collect().drop("game_id")
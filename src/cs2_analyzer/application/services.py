@@ -28,7 +28,7 @@ class GameService:
         # Build rounds with events and positions
         rounds = self._build_rounds(demo)
 
-        game = Game(map_name=map_name, teams=teams, rounds=rounds)
+        game = Game(map_name=map_name, teams=teams, rounds=rounds, tickrate=getattr(demo, 'tickrate', None) or 64)
         return game, demo
 
     def _build_teams(self, demo) -> List[Team]:
@@ -87,7 +87,8 @@ class GameService:
                 round_number=round_num,
                 winner=winner,
                 events=events,
-                positions=positions
+                positions=positions,
+                freeze_end=round_row.get('freeze_end')
             )
             rounds.append(round_entity)
 
@@ -174,7 +175,8 @@ class GameService:
                     'Y': pos_row.get('Y'),
                     'Z': pos_row.get('Z'),
                     'yaw': pos_row.get('yaw'),
-                    'pitch': pos_row.get('pitch')
+                    'pitch': pos_row.get('pitch'),
+                    'place': pos_row.get('place')
                 }
                 positions.append(position_dict)
 
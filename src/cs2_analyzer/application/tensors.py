@@ -0,0 +1,219 @@
+"""
+Round tensors on a uniform time grid.
+
+Tick tables are ragged: rounds differ in length, players in sampling, and dead
+players drop out. build_round_tensor() resamples every round onto the same grid of
+seconds after freeze end and stacks them into one dense array of shape
+(rounds, times, players, 3), with an alive mask and index arrays naming each axis.
+Positions are linearly interpolated between a player's samples; grid points outside
+a player's samples are NaN and not alive.
+
+The resampling is one searchsorted over all players' samples at once: every sample
+gets a sort key of (series, time), so a grid point's neighbours are found in the
+concatenated sample array without per-round or per-player loops.
+
+Tensors save as plain .npy files that load memory-mapped, so analyses can run over
+more rounds than fit in memory.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import polars as pl
+
+from .frames import MatchFrames
+from .metrics import GAME_ROUND, build_round_ticks
+
+DEFAULT_TIME_STEP = 0.25
+DEFAULT_ROUND_DURATION = 115.0
+MAX_PLAYERS = 10
+
+# Side codes of the sides array
+SIDE_CODES = {"t": 0, "ct": 1}
+NO_PLAYER = -1
+
+ARRAYS = ("positions", "alive", "times", "game_ids", "round_nums", "player_ids", "sides")
+
+
+@dataclass(frozen=True)
+class RoundTensor:
+    """
+    Player positions of many rounds on a uniform time grid.
+
+    Attributes:
+        positions: (R, T, P, 3) float32 X/Y/Z, NaN where the player has no position
+        alive: (R, T, P) bool, true where the player is alive
+        times: (T,) seconds after freeze end of each grid point
+        game_ids: (R,) game of each round
+        round_nums: (R,) round number of each round
+        player_ids: (R, P) steamid in each player slot, NO_PLAYER for empty slots
+        sides: (R, P) SIDE_CODES code of each player slot, NO_PLAYER for empty slots
+    """
+    positions: np.ndarray
+    alive: np.ndarray
+    times: np.ndarray
+    game_ids: np.ndarray
+    round_nums: np.ndarray
+    player_ids: np.ndarray
+    sides: np.ndarray
+
+    def save(self, directory) -> None:
+        """Save every array as <directory>/<name>.npy."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, directory, mmap_mode: Optional[str] = "r") -> "RoundTensor":
+        """Load a tensor written by save(), memory-mapped by default."""
+        directory = Path(directory)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+                  for name in ARRAYS}
+        return cls(**arrays)
+
+    def side_mask(self, side: str) -> np.ndarray:
+        """(R, T, P) mask of the living players of a side."""
+        return self.alive & (self.sides == SIDE_CODES[side])[:, None, :]
+
+
+def build_round_tensor(frames: MatchFrames, time_step: float = DEFAULT_TIME_STEP,
+                       duration: float = DEFAULT_ROUND_DURATION, max_players: int = MAX_PLAYERS) -> RoundTensor:
+    """
+    Resample the positions of every round onto a uniform grid after freeze end.
+
+    Args:
+        frames: Lazy tables of one or more games
+        time_step: Seconds between grid points
+        duration: Seconds after freeze end the grid covers
+        max_players: Player slots per round; players beyond it (sorted by side, then steamid) are dropped
+
+    Returns:
+        RoundTensor with one entry per round that has tick rows
+    """
+    samples = build_round_ticks(frames).with_columns(
+        ((pl.col("tick") - pl.col("freeze_end")) / pl.col("tickrate")).alias("time")
+    ).filter(pl.col("side").is_in(list(SIDE_CODES))).select(
+        GAME_ROUND + ["player_steamid", "side", "time", "X", "Y", "Z", "is_alive"]
+    ).collect()
+
+    times = np.arange(0.0, duration + time_step / 2, time_step)
+    rounds = samples.select(GAME_ROUND).unique().sort(GAME_ROUND).with_row_index("round_index")
+
+    slots = samples.select(GAME_ROUND + ["player_steamid", "side"]).unique(
+        GAME_ROUND + ["player_steamid"], keep="first"
+    ).join(rounds, on=GAME_ROUND).sort(
+        ["round_index", "side", "player_steamid"], descending=[False, True, False]
+    ).with_columns(
+        pl.int_range(pl.len()).over("round_index").alias("slot")
+    ).filter(pl.col("slot") < max_players)
+
+    series = samples.join(slots.select(GAME_ROUND + ["player_steamid", "round_index", "slot"]),
+                          on=GAME_ROUND + ["player_steamid"]).with_columns(
+        (pl.col("round_index").cast(pl.Int64) * max_players + pl.col("slot")).alias("series")
+    ).sort(["series", "time"])
+
+    n_rounds = rounds.height
+    positions, alive = _resample(series, times, n_rounds * max_players)
+
+    player_ids = np.full((n_rounds, max_players), NO_PLAYER, dtype=np.int64)
+    sides = np.full((n_rounds, max_players), NO_PLAYER, dtype=np.int8)
+    round_index = slots["round_index"].to_numpy().astype(np.int64)
+    slot = slots["slot"].to_numpy().astype(np.int64)
+    player_ids[round_index, slot] = slots["player_steamid"].to_numpy()
+    sides[round_index, slot] = slots["side"].replace_strict(SIDE_CODES, return_dtype=pl.Int8).to_numpy()
+
+    return RoundTensor(
+        positions=positions.reshape(n_rounds, max_players, len(times), 3).transpose(0, 2, 1, 3).copy(),
+        alive=alive.reshape(n_rounds, max_players, len(times)).transpose(0, 2, 1).copy(),
+        times=times,
+        game_ids=rounds["game_id"].to_numpy().astype(str),
+        round_nums=rounds["round_num"].to_numpy().astype(np.int64),
+        player_ids=player_ids,
+        sides=sides,
+    )
+
+
+def _resample(series: pl.DataFrame, times: np.ndarray, n_series: int):
+    """
+    Interpolate every series of samples at the grid times.
+
+    Returns:
+        (n_series, T, 3) float32 positions and (n_series, T) alive mask
+    """
+    ids = series["series"].to_numpy()
+    sample_times = series["time"].to_numpy().astype(np.float64)
+    coords = series.select(["X", "Y", "Z"]).to_numpy().astype(np.float64)
+    sample_alive = series["is_alive"].fill_null(True).to_numpy()
+    if len(ids) == 0:
+        return (np.full((n_series, len(times), 3), np.nan, dtype=np.float32),
+                np.zeros((n_series, len(times)), dtype=bool))
+
+    # Sort keys keep each series' samples together and in time order
+    span = max(float(times[-1]), float(sample_times.max(initial=0.0))) + 1.0
+    keys = ids * span + sample_times
+    query_ids = np.repeat(np.arange(n_series), len(times))
+    queries = query_ids * span + np.tile(times, n_series)
+
+    right = np.searchsorted(keys, queries, side="left")
+    left = right - 1
+    right_ok = right < len(keys)
+    right = np.minimum(right, len(keys) - 1)
+    left_ok = left >= 0
+    left = np.maximum(left, 0)
+    right_ok &= ids[right] == query_ids
+    left_ok &= ids[left] == query_ids
+
+    exact = right_ok & (keys[right] == queries)
+    inside = exact | (left_ok & right_ok)
+
+    gap = sample_times[right] - sample_times[left]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(gap > 0, (np.tile(times, n_series) - sample_times[left]) / gap, 0.0)
+    fraction = np.where(exact, 1.0, fraction)[:, None]
+
+    positions = np.where(inside[:, None], coords[left] + fraction * (coords[right] - coords[left]), np.nan)
+    # A player is alive at a grid point if they were alive at the last sample at or before it
+    alive = inside & np.where(exact, sample_alive[right], sample_alive[left])
+
+    return positions.astype(np.float32).reshape(n_series, len(times), 3), alive.reshape(n_series, len(times))
+
+
+def centroids(tensor: RoundTensor, side: str) -> np.ndarray:
+    """(R, T, 3) mean position of a side's living players, NaN where none is alive."""
+    mask = tensor.side_mask(side)
+    counts = mask.sum(axis=2)
+    totals = np.where(mask[..., None], tensor.positions, 0.0).sum(axis=2, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts[..., None] > 0, totals / counts[..., None], np.nan)
+
+
+def distances_to(tensor: RoundTensor, point) -> np.ndarray:
+    """(R, T, P) distance of every player to a point, NaN where the player is not alive."""
+    diff = tensor.positions.astype(np.float64) - np.asarray(point, dtype=np.float64)
+    distances = np.sqrt(np.einsum("rtpi,rtpi->rtp", diff, diff))
+    return np.where(tensor.alive, distances, np.nan)
+
+
+def spacing(tensor: RoundTensor, side: str) -> np.ndarray:
+    """(R, T) mean distance over pairs of a side's living players, NaN with fewer than two."""
+    mask = tensor.side_mask(side)
+    positions = np.where(mask[..., None], tensor.positions, 0.0).astype(np.float64)
+
+    diff = positions[:, :, :, None, :] - positions[:, :, None, :, :]
+    distances = np.sqrt(np.einsum("rtpqi,rtpqi->rtpq", diff, diff))
+    pairs = mask[:, :, :, None] & mask[:, :, None, :]
+    upper = np.triu(np.ones(pairs.shape[-2:], dtype=bool), k=1)
+    pairs &= upper
+
+    pair_counts = pairs.sum(axis=(2, 3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(pair_counts > 0, np.where(pairs, distances, 0.0).sum(axis=(2, 3)) / pair_counts, np.nan)
+
+
+def calculate_round_tensor(demo, time_step: float = DEFAULT_TIME_STEP,
+                           duration: float = DEFAULT_ROUND_DURATION) -> RoundTensor:
+    """Build the round tensor of a demo."""
+    return build_round_tensor(MatchFrames.from_demo(demo), time_step, duration)
@@ -0,0 +1,387 @@
+"""
+Utility effectiveness metrics.
+
+Grenade events are matched to their effects with as-of and interval joins instead of
+per-event loops: player_blind events to the flashbang that caused them, kills to the
+last time their victim was blinded, and fire damage and tick positions to the
+molotovs burning at the time. Every function takes the lazy event tables of any
+number of games, so the same plans run on one demo or across the Parquet store.
+"""
+
+from typing import Optional
+
+import polars as pl
+
+from .damage import capped_damage
+from .frames import MatchFrames
+from .geometry import distance_expr
+from .metrics import GAME_ROUND, GAME_ROUND_PLAYER, _scalar, build_round_ticks, summarize
+
+DEFAULT_FLASH_ASSIST_WINDOW = 3
+
+# Fire area of a molotov or incendiary: a cylinder around the burn center
+DEFAULT_FIRE_RADIUS = 150.0
+DEFAULT_FIRE_HEIGHT = 80.0
+# Burn time used when no inferno_expire event was recorded
+DEFAULT_FIRE_DURATION = 7.0
+# Seconds after entering a fire by which an enemy counts as displaced if they left it
+DEFAULT_DISPLACEMENT_WINDOW = 2.0
+
+FIRE_WEAPONS = ["inferno", "molotov", "incgrenade"]
+
+
+def _ticks_within(start: str, end: str, seconds: float) -> pl.Expr:
+    """Builds an expression that is true when end is at most the given seconds after start."""
+    return (pl.col(end) - pl.col(start) <= seconds * pl.col("tickrate")).fill_null(False)
+
+
+def enemy_blinds(player_blind: pl.LazyFrame, flashes: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Matches every enemy blind to the flashbang that caused it.
+
+    A blind belongs to the thrower's latest flashbang detonation at or before it
+    (in CS2 both events share a tick). Team flashes are dropped.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, flash_tick, thrower_steamid,
+        blinded_steamid, blind_tick and blind_duration.
+    """
+    detonations = flashes.select(
+        ["game_id", pl.col("tick").alias("flash_tick"), pl.col("user_steamid").alias("thrower_steamid")]
+    ).sort("flash_tick")
+
+    return player_blind.filter(
+        pl.col("user_side") != pl.col("attacker_side")
+    ).select(
+        GAME_ROUND + [
+            pl.col("attacker_steamid").alias("thrower_steamid"),
+            pl.col("user_steamid").alias("blinded_steamid"),
+            pl.col("tick").alias("blind_tick"),
+            "blind_duration"
+        ]
+    ).sort("blind_tick").join_asof(
+        detonations, left_on="blind_tick", right_on="flash_tick", by=["game_id", "thrower_steamid"],
+        strategy="backward", check_sortedness=False
+    ).filter(pl.col("flash_tick").is_not_null())
+
+
+def flash_assists(blinds: pl.LazyFrame, player_deaths: pl.LazyFrame, games: pl.LazyFrame,
+                  flash_assist_window: float = DEFAULT_FLASH_ASSIST_WINDOW) -> pl.LazyFrame:
+    """
+    Finds the kills that a teammate of the flasher made on a blinded enemy.
+
+    Each death is joined to the victim's latest enemy blind before it; the kill is a
+    flash assist when it came within the window and not from the flasher.
+
+    Args:
+        blinds: Enemy blinds from enemy_blinds()
+        player_deaths: player_death events
+        games: Games with game_id and tickrate
+        flash_assist_window: Seconds after the blind in which a kill counts
+
+    Returns:
+        LazyFrame with columns game_id, round_num, flash_tick, thrower_steamid, tick
+        (of the kill) and attacker_steamid.
+    """
+    victim_blinds = blinds.select(
+        ["game_id", "flash_tick", "thrower_steamid", "blinded_steamid", "blind_tick"]
+    ).sort("blind_tick")
+
+    kills = player_deaths.filter(
+        pl.col("attacker_steamid").is_not_null() & (pl.col("attacker_side") != pl.col("user_side"))
+    ).select(
+        GAME_ROUND + ["tick", "attacker_steamid", pl.col("user_steamid").alias("blinded_steamid")]
+    ).join(games.select(["game_id", "tickrate"]), on="game_id").sort("tick")
+
+    return kills.join_asof(
+        victim_blinds, left_on="tick", right_on="blind_tick", by=["game_id", "blinded_steamid"],
+        strategy="backward", check_sortedness=False
+    ).filter(
+        _ticks_within("blind_tick", "tick", flash_assist_window) &
+        (pl.col("attacker_steamid") != pl.col("thrower_steamid"))
+    ).select(GAME_ROUND + ["flash_tick", "thrower_steamid", "tick", "attacker_steamid"])
+
+
+def flash_effects(frames: MatchFrames, flash_assist_window: float = DEFAULT_FLASH_ASSIST_WINDOW) -> pl.LazyFrame:
+    """
+    Summarizes the effect of every flashbang thrown.
+
+    Returns:
+        LazyFrame with one row per flashbang detonation and columns game_id, round_num,
+        player_steamid (the thrower), tick, enemies_blinded, enemy_blind_time (seconds,
+        summed over enemies) and flash_assists.
+    """
+    flashes = frames.event("flashbang_detonate")
+    blinds = enemy_blinds(frames.event("player_blind"), flashes)
+    assists = flash_assists(blinds, frames.event("player_death"), frames.games, flash_assist_window)
+
+    flash_key = ["game_id", "flash_tick", "thrower_steamid"]
+    blind_totals = blinds.group_by(flash_key).agg(
+        pl.col("blinded_steamid").n_unique().alias("enemies_blinded"),
+        pl.col("blind_duration").sum().alias("enemy_blind_time")
+    )
+    assist_counts = assists.group_by(flash_key).agg(pl.len().alias("flash_assists"))
+
+    return flashes.select(
+        GAME_ROUND + [pl.col("user_steamid").alias("player_steamid"), "tick"]
+    ).unique(["game_id", "player_steamid", "tick"]).join(
+        blind_totals, left_on=["game_id", "tick", "player_steamid"], right_on=flash_key, how="left"
+    ).join(
+        assist_counts, left_on=["game_id", "tick", "player_steamid"], right_on=flash_key, how="left"
+    ).with_columns(
+        pl.col("enemies_blinded").fill_null(0).cast(pl.Int64),
+        pl.col("enemy_blind_time").fill_null(0.0),
+        pl.col("flash_assists").fill_null(0).cast(pl.Int64)
+    )
+
+
+def enemy_blind_time_breakdown(effects: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the total enemy blind time per flashbang.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the thrower), value and weight (flashbangs).
+    """
+    return effects.group_by(GAME_ROUND_PLAYER).agg(
+        pl.col("enemy_blind_time").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def flash_assist_breakdown(effects: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the flash assists per flashbang.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the thrower), value and weight (flashbangs).
+    """
+    return effects.group_by(GAME_ROUND_PLAYER).agg(
+        pl.col("flash_assists").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def calculate_flash_effects(demo, flash_assist_window: float = DEFAULT_FLASH_ASSIST_WINDOW) -> pl.DataFrame:
+    """Computes the per-flashbang blind time and flash assists of a demo, sorted by tick."""
+    return flash_effects(MatchFrames.from_demo(demo), flash_assist_window).collect().drop("game_id").sort("tick")
+
+
+def calculate_enemy_blind_time_per_flash(demo) -> float:
+    """Calculates the average total enemy blind time (s) per flashbang."""
+    if demo is None:
+        return 0.0
+
+    return _scalar(summarize(enemy_blind_time_breakdown(flash_effects(MatchFrames.from_demo(demo)))))
+
+
+def calculate_flash_assists_per_flash(demo, flash_assist_window: float = DEFAULT_FLASH_ASSIST_WINDOW) -> float:
+    """Calculates the average number of flash assists per flashbang."""
+    if demo is None:
+        return 0.0
+
+    effects = flash_effects(MatchFrames.from_demo(demo), flash_assist_window)
+    return _scalar(summarize(flash_assist_breakdown(effects)))
+
+
+def fire_intervals(frames: MatchFrames, fire_duration: float = DEFAULT_FIRE_DURATION) -> pl.LazyFrame:
+    """
+    Pairs every inferno_startburn with its inferno_expire.
+
+    The fire ends at the first expire of the same entity after it started, or after
+    fire_duration seconds when no expire was recorded.
+
+    Returns:
+        LazyFrame with one row per fire and columns game_id, round_num, player_steamid
+        (the thrower), thrower_side, start_tick, end_tick, tickrate and x/y/z (fire center).
+    """
+    expires = frames.event("inferno_expire").select(
+        ["game_id", "entityid", pl.col("tick").alias("end_tick")]
+    ).sort("end_tick")
+
+    return frames.event("inferno_startburn").select(
+        GAME_ROUND + [
+            "entityid",
+            pl.col("user_steamid").alias("player_steamid"),
+            pl.col("user_side").alias("thrower_side"),
+            pl.col("tick").alias("start_tick"),
+            "x", "y", "z"
+        ]
+    ).sort("start_tick").join_asof(
+        expires, left_on="start_tick", right_on="end_tick", by=["game_id", "entityid"],
+        strategy="forward", allow_exact_matches=False, check_sortedness=False
+    ).join(
+        frames.games.select(["game_id", "tickrate"]), on="game_id", how="left"
+    ).with_columns(
+        pl.col("end_tick").fill_null(
+            pl.col("start_tick") + (fire_duration * pl.col("tickrate")).cast(pl.Int64)
+        )
+    ).drop("entityid")
+
+
+def in_fire(x: str = "X", y: str = "Y", z: str = "Z",
+            radius: float = DEFAULT_FIRE_RADIUS, height: float = DEFAULT_FIRE_HEIGHT) -> pl.Expr:
+    """Builds an expression that is true for positions inside the fire cylinder around x/y/z."""
+    horizontal = (pl.col(x) - pl.col("x"))**2 + (pl.col(y) - pl.col("y"))**2
+    return (horizontal <= radius**2) & ((pl.col(z) - pl.col("z")).abs() <= height)
+
+
+def fire_exposures(fires: pl.LazyFrame, ticks: pl.LazyFrame, displacement_window: float = DEFAULT_DISPLACEMENT_WINDOW,
+                   radius: float = DEFAULT_FIRE_RADIUS, height: float = DEFAULT_FIRE_HEIGHT) -> pl.LazyFrame:
+    """
+    Finds the enemies standing in each fire and whether it moved them out.
+
+    ticks should hold living players only (e.g. build_round_ticks() filtered on
+    is_alive), so a body lying in a fire is neither exposed nor displaced. Tick rows are joined to the fires of their round near their position, kept when the
+    tick is in the fire's interval and the position in its cylinder (one bulk test),
+    and reduced to each enemy's first tick in the fire. An as-of join then looks up
+    where that player was displacement_window seconds later.
+
+    Returns:
+        LazyFrame with one row per fire and exposed enemy: the fire's game_id, round_num,
+        player_steamid and start_tick, plus enemy_steamid, entry_tick, displacement (distance
+        moved by the end of the window) and displaced (out of the fire by then).
+    """
+    fire_key = GAME_ROUND + ["player_steamid", "start_tick"]
+    positions = ticks.select(GAME_ROUND + ["tick", pl.col("player_steamid").alias("enemy_steamid"), "side", "X", "Y", "Z"])
+
+    # Spatial hash on a grid of radius-sized cells: a fire is registered in the 3x3 block
+    # around its center cell, so each position only meets the fires that can contain it
+    # instead of every fire burning in its round.
+    cell = [(pl.col(axis) / radius).floor().cast(pl.Int64).alias(f"cell_{axis.lower()}") for axis in ("X", "Y")]
+    offsets = pl.LazyFrame({"dx": [-1, 0, 1] * 3, "dy": [-1] * 3 + [0] * 3 + [1] * 3})
+    fire_cells = fires.join(offsets, how="cross").with_columns(
+        ((pl.col("x") / radius).floor().cast(pl.Int64) + pl.col("dx")).alias("cell_x"),
+        ((pl.col("y") / radius).floor().cast(pl.Int64) + pl.col("dy")).alias("cell_y")
+    ).drop(["dx", "dy"])
+
+    entries = positions.with_columns(cell).join(fire_cells, on=GAME_ROUND + ["cell_x", "cell_y"]).filter(
+        (pl.col("tick") >= pl.col("start_tick")) & (pl.col("tick") <= pl.col("end_tick")) &
+        (pl.col("side") != pl.col("thrower_side")) & in_fire(radius=radius, height=height)
+    ).group_by(fire_key + ["enemy_steamid"]).agg(
+        pl.all().sort_by("tick").first()
+    ).select(
+        fire_key + ["enemy_steamid", pl.col("tick").alias("entry_tick"), "tickrate", "X", "Y", "Z", "x", "y", "z"]
+    ).with_columns(
+        (pl.col("entry_tick") + (displacement_window * pl.col("tickrate")).cast(pl.Int64)).alias("check_tick")
+    )
+
+    later = positions.select(
+        ["game_id", "enemy_steamid", pl.col("tick").alias("later_tick"),
+         pl.col("X").alias("X_later"), pl.col("Y").alias("Y_later"), pl.col("Z").alias("Z_later")]
+    ).sort("later_tick")
+
+    return entries.sort("check_tick").join_asof(
+        later, left_on="check_tick", right_on="later_tick", by=["game_id", "enemy_steamid"],
+        strategy="backward", check_sortedness=False
+    ).with_columns(
+        distance_expr(pl.col("X_later"), pl.col("Y_later"), pl.col("Z_later")).alias("displacement"),
+        (~in_fire("X_later", "Y_later", "Z_later", radius, height)).alias("displaced")
+    ).select(fire_key + ["enemy_steamid", "entry_tick", "displacement", "displaced"])
+
+
+def fire_effects(frames: MatchFrames, fire_duration: float = DEFAULT_FIRE_DURATION,
+                 displacement_window: float = DEFAULT_DISPLACEMENT_WINDOW, fires: Optional[pl.LazyFrame] = None,
+                 exposures: Optional[pl.LazyFrame] = None, damage: Optional[pl.LazyFrame] = None) -> pl.LazyFrame:
+    """
+    Summarizes the effect of every molotov and incendiary.
+
+    Utility damage is the capped fire damage the thrower dealt to enemies while it
+    burned. Each hit goes to one fire: the latest started of the thrower's fires burning
+    at its tick, so overlapping molotovs do not count a hit twice. Position denial is the share of
+    enemies caught in the fire that were out of it displacement_window seconds later.
+
+    Args:
+        frames: Lazy tables of the games
+        fire_duration: Burn time of fires without an inferno_expire event
+        displacement_window: Seconds after entering a fire by which an enemy counts as displaced
+        fires: Output of fire_intervals() (default: built from frames)
+        exposures: Output of fire_exposures() (default: built from fires and the living players' tick rows)
+        damage: Output of damage.capped_damage() (default: built from the player_hurt events)
+
+    Returns:
+        LazyFrame with one row per fire and columns game_id, round_num, player_steamid
+        (the thrower), start_tick, end_tick, utility_damage, enemies_exposed,
+        enemies_displaced and mean_displacement.
+    """
+    if fires is None:
+        fires = fire_intervals(frames, fire_duration)
+    if exposures is None:
+        exposures = fire_exposures(fires, build_round_ticks(frames).filter(pl.col("is_alive")), displacement_window)
+    if damage is None:
+        damage = capped_damage(frames.event("player_hurt"))
+    fire_key = GAME_ROUND + ["player_steamid", "start_tick"]
+
+    fire_damage = damage.filter(
+        pl.col("weapon").is_in(FIRE_WEAPONS) & (pl.col("attacker_side") != pl.col("user_side"))
+    ).select(
+        GAME_ROUND + [pl.col("attacker_steamid").alias("player_steamid"), "tick", "damage"]
+    ).with_row_index("hit_id").join(fires.select(fire_key + ["end_tick"]), on=GAME_ROUND + ["player_steamid"]).filter(
+        (pl.col("tick") >= pl.col("start_tick")) & (pl.col("tick") <= pl.col("end_tick"))
+    ).group_by("hit_id").agg(
+        pl.all().sort_by("start_tick").last()
+    ).group_by(fire_key).agg(pl.col("damage").sum().alias("utility_damage"))
+
+    exposure_totals = exposures.group_by(fire_key).agg(
+        pl.len().alias("enemies_exposed"),
+        pl.col("displaced").sum().alias("enemies_displaced"),
+        pl.col("displacement").mean().alias("mean_displacement")
+    )
+
+    return fires.select(fire_key + ["end_tick"]).join(fire_damage, on=fire_key, how="left").join(
+        exposure_totals, on=fire_key, how="left"
+    ).with_columns(
+        pl.col("utility_damage").fill_null(0).cast(pl.Int64),
+        pl.col("enemies_exposed").fill_null(0).cast(pl.Int64),
+        pl.col("enemies_displaced").fill_null(0).cast(pl.Int64)
+    )
+
+
+def utility_damage_breakdown(effects: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Averages the enemy fire damage per molotov.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the thrower), value and weight (fires).
+    """
+    return effects.group_by(GAME_ROUND_PLAYER).agg(
+        pl.col("utility_damage").mean().alias("value"),
+        pl.len().alias("weight")
+    )
+
+
+def position_denial_breakdown(effects: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Calculates the share of enemies caught in a fire that it moved out.
+
+    Returns:
+        LazyFrame with columns game_id, round_num, player_steamid (the thrower), value and
+        weight (exposed enemies).
+    """
+    return effects.group_by(GAME_ROUND_PLAYER).agg(
+        (pl.col("enemies_displaced").sum() / pl.col("enemies_exposed").sum()).alias("value"),
+        pl.col("enemies_exposed").sum().alias("weight")
+    )
+
+
+def calculate_fire_effects(demo, fire_duration: float = DEFAULT_FIRE_DURATION,
+                           displacement_window: float = DEFAULT_DISPLACEMENT_WINDOW) -> pl.DataFrame:
+    """Computes the per-fire utility damage and position denial of a demo, sorted by start tick."""
+    effects = fire_effects(MatchFrames.from_demo(demo), fire_duration, displacement_window)
+    return effects.collect().drop("game_id").sort("start_tick")
+
+
+def calculate_molotov_utility_damage(demo) -> float:
+    """Calculates the average enemy fire damage per molotov."""
+    if demo is None:
+        return 0.0
+
+    return _scalar(summarize(utility_damage_breakdown(fire_effects(MatchFrames.from_demo(demo)))))
+
+
+def calculate_position_denial(demo, displacement_window: float = DEFAULT_DISPLACEMENT_WINDOW) -> float:
+    """Calculates the share of enemies caught in a molotov that were out of it displacement_window seconds later."""
+    if demo is None:
+        return 0.0
+
+    effects = fire_effects(MatchFrames.from_demo(demo), displacement_window=displacement_window)
+    return _scalar(summarize(position_denial_breakdown(effects)))
@@ -0,0 +1,247 @@
+"""
+Per-map callout zone index.
+
+A ZoneIndex rasterizes a map's callout zones onto a uniform X/Y grid with Z bands,
+so labelling positions is a single array gather: cell and band indices are computed
+for every row at once and looked up in a dense (bands, columns, rows) table of zone
+codes. Resolution is the cell size (32 units, about one player width, by default).
+
+Zones come from either hand-annotated polygons (Zone, e.g. loaded from JSON) or from
+the place names the game itself records on every tick (awpy's place column), by
+majority vote per cell. Indexes are cached per map by zone_index().
+"""
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import polars as pl
+
+from .geometry import in_polygon
+
+DEFAULT_CELL_SIZE = 32.0
+DEFAULT_BAND_HEIGHT = 128.0
+DEFAULT_ZONE_DIR = "data/zones"
+NO_ZONE = -1
+
+
+@dataclass(frozen=True)
+class Zone:
+    """A named callout area: an X/Y polygon between two heights."""
+    name: str
+    polygon: Tuple[Tuple[float, float], ...]
+    z_min: float = -np.inf
+    z_max: float = np.inf
+
+
+class ZoneIndex:
+    """Uniform-grid lookup from positions to callout zones."""
+
+    def __init__(self, names: Sequence[str], labels: np.ndarray, origin: Tuple[float, float],
+                 cell_size: float, z_edges: np.ndarray):
+        """
+        Args:
+            names: Zone names; a zone's code is its position in this list
+            labels: (bands, columns, rows) zone codes, NO_ZONE for cells outside every zone
+            origin: X/Y of the grid's lower-left corner
+            cell_size: Cell width and height in map units
+            z_edges: Sorted heights between Z bands (len(z_edges) + 1 bands)
+        """
+        self.names = list(names)
+        self.labels = np.asarray(labels, dtype=np.int16)
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.cell_size = float(cell_size)
+        self.z_edges = np.asarray(z_edges, dtype=np.float64)
+        self.dtype = pl.Enum(self.names)
+
+    @classmethod
+    def from_zones(cls, zones: Sequence[Zone], cell_size: float = DEFAULT_CELL_SIZE) -> "ZoneIndex":
+        """
+        Rasterize zone polygons; a cell belongs to a zone when its center is inside it.
+
+        Z bands are split at every finite zone height bound. Where zones overlap, the
+        first one listed wins.
+        """
+        vertices = np.concatenate([np.asarray(zone.polygon, dtype=np.float64) for zone in zones])
+        origin = vertices.min(axis=0)
+        columns, rows = np.maximum(np.ceil((vertices.max(axis=0) - origin) / cell_size).astype(int), 1)
+
+        bounds = [bound for zone in zones for bound in (zone.z_min, zone.z_max) if np.isfinite(bound)]
+        z_edges = np.unique(bounds)
+        band_low = np.concatenate(([-np.inf], z_edges))
+        band_high = np.concatenate((z_edges, [np.inf]))
+
+        cx, cy = np.meshgrid(origin[0] + (np.arange(columns) + 0.5) * cell_size,
+                             origin[1] + (np.arange(rows) + 0.5) * cell_size, indexing="ij")
+        centers = np.column_stack((cx.ravel(), cy.ravel()))
+
+        labels = np.full((len(band_low), columns * rows), NO_ZONE, dtype=np.int16)
+        for code, zone in enumerate(zones):
+            inside = in_polygon(centers, zone.polygon)
+            bands = (band_low >= zone.z_min) & (band_high <= zone.z_max)
+            for band in np.flatnonzero(bands):
+                free = inside & (labels[band] == NO_ZONE)
+                labels[band, free] = code
+
+        return cls([zone.name for zone in zones], labels.reshape(len(band_low), columns, rows),
+                   tuple(origin), cell_size, z_edges)
+
+    @classmethod
+    def from_ticks(cls, ticks: pl.DataFrame, place_col: str = "place",
+                   cell_size: float = DEFAULT_CELL_SIZE, band_height: float = DEFAULT_BAND_HEIGHT) -> "ZoneIndex":
+        """
+        Build the index from tick rows labelled with the game's own place names.
+
+        Each cell and band takes the place most often recorded there. Without any
+        placed rows the index is empty and labels every position NO_ZONE.
+
+        Args:
+            ticks: Rows with X, Y, Z and place_col (e.g. awpy demo.ticks)
+            place_col: Column with the callout name of each row
+            cell_size: Cell width and height in map units
+            band_height: Height of each Z band in map units
+        """
+        placed = ticks.lazy().select(["X", "Y", "Z", place_col]).filter(
+            pl.col(place_col).is_not_null() & (pl.col(place_col) != "")
+        ).collect()
+        if placed.is_empty():
+            return cls([], np.full((1, 1, 1), NO_ZONE), (0.0, 0.0), cell_size, np.empty(0))
+
+        names = sorted(placed[place_col].unique().to_list())
+        x, y, z = (placed[col].to_numpy().astype(np.float64) for col in ("X", "Y", "Z"))
+
+        origin = (x.min(), y.min())
+        columns = int((x.max() - origin[0]) // cell_size) + 1
+        rows = int((y.max() - origin[1]) // cell_size) + 1
+        z_edges = np.arange(z.min() + band_height, z.max() + band_height, band_height)
+
+        votes = pl.DataFrame({
+            "band": np.searchsorted(z_edges, z, side="right"),
+            "column": ((x - origin[0]) // cell_size).astype(np.int64),
+            "row": ((y - origin[1]) // cell_size).astype(np.int64),
+            "code": placed[place_col].cast(pl.Enum(names)).to_physical(),
+        }).group_by(["band", "column", "row", "code"]).len().sort(
+            ["len", "code"], descending=[True, False]
+        ).unique(["band", "column", "row"], keep="first")
+
+        labels = np.full((len(z_edges) + 1, columns, rows), NO_ZONE, dtype=np.int16)
+        labels[votes["band"].to_numpy(), votes["column"].to_numpy(), votes["row"].to_numpy()] = votes["code"].to_numpy()
+        return cls(names, labels, origin, cell_size, z_edges)
+
+    @classmethod
+    def from_json(cls, path, cell_size: float = DEFAULT_CELL_SIZE) -> "ZoneIndex":
+        """
+        Load zone polygons from JSON.
+
+        Format: {"zones": [{"name": "Long A", "polygon": [[x, y], ...], "z_min": ..., "z_max": ...}]}
+        with z_min and z_max optional.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        zones = [
+            Zone(
+                name=zone["name"],
+                polygon=tuple(tuple(vertex) for vertex in zone["polygon"]),
+                z_min=zone.get("z_min", -np.inf),
+                z_max=zone.get("z_max", np.inf)
+            )
+            for zone in data["zones"]
+        ]
+        return cls.from_zones(zones, cell_size=data.get("cell_size", cell_size))
+
+    def save(self, path) -> None:
+        """Save the index as a compressed .npz file."""
+        np.savez_compressed(
+            path, names=np.array(self.names), labels=self.labels, origin=np.array(self.origin),
+            cell_size=self.cell_size, z_edges=self.z_edges
+        )
+
+    @classmethod
+    def load(cls, path) -> "ZoneIndex":
+        """Load an index saved with save()."""
+        with np.load(path) as data:
+            return cls(data["names"].tolist(), data["labels"], tuple(data["origin"]),
+                       float(data["cell_size"]), data["z_edges"])
+
+    def lookup(self, x, y, z) -> np.ndarray:
+        """
+        Zone code of every position.
+
+        Args:
+            x, y, z: Equal-length coordinate arrays
+
+        Returns:
+            int16 array of codes into names, NO_ZONE outside every zone or the grid
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        _, columns, rows = self.labels.shape
+
+        column = np.floor((x - self.origin[0]) / self.cell_size)
+        row = np.floor((y - self.origin[1]) / self.cell_size)
+        on_grid = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+        band = np.searchsorted(self.z_edges, np.asarray(z, dtype=np.float64), side="right")
+
+        codes = self.labels[band, np.where(on_grid, column, 0).astype(np.intp), np.where(on_grid, row, 0).astype(np.intp)]
+        return np.where(on_grid, codes, NO_ZONE).astype(np.int16)
+
+    def label(self, x, y, z) -> pl.Series:
+        """Zone name of every position as an Enum series, null outside every zone."""
+        codes = pl.Series(self.lookup(x, y, z), dtype=pl.Int64)
+        indices = pl.select(pl.when(codes >= 0).then(codes)).to_series()
+        return pl.Series("zone", self.names, dtype=self.dtype).gather(indices)
+
+    def expr(self, x: str = "X", y: str = "Y", z: str = "Z") -> pl.Expr:
+        """Polars expression labelling each row's zone, usable in lazy plans."""
+        def label_batch(positions: pl.Series) -> pl.Series:
+            return self.label(*(positions.struct.field(col).to_numpy() for col in (x, y, z)))
+
+        return pl.struct([x, y, z]).map_batches(label_batch, return_dtype=self.dtype).alias("zone")
+
+
+@lru_cache(maxsize=None)
+def zone_index(map_name: str, zone_dir: str = DEFAULT_ZONE_DIR) -> Optional[ZoneIndex]:
+    """
+    The cached zone index of a map.
+
+    Looks for <zone_dir>/<map_name>.npz (a saved index) and then <map_name>.json
+    (zone polygons).
+
+    Returns:
+        The index, or None when the map has no zone data
+    """
+    base = Path(zone_dir) / map_name
+    if base.with_suffix(".npz").exists():
+        return ZoneIndex.load(base.with_suffix(".npz"))
+    if base.with_suffix(".json").exists():
+        return ZoneIndex.from_json(base.with_suffix(".json"))
+    return None
+
+
+def label_zones(ticks: pl.LazyFrame, games: pl.LazyFrame, zone_dir: str = DEFAULT_ZONE_DIR) -> pl.LazyFrame:
+    """
+    Add a zone column (callout name as a string) to tick rows of any number of maps.
+
+    Each map's rows are labelled by its cached index; maps without zone data get nulls.
+
+    Args:
+        ticks: Rows with game_id, X, Y and Z
+        games: Rows with game_id and map_name
+        zone_dir: Directory with per-map zone files
+    """
+    map_names: List[str] = games.select("map_name").unique().collect()["map_name"].drop_nulls().to_list()
+    with_map = ticks.join(games.select(["game_id", "map_name"]), on="game_id", how="left")
+
+    labelled = []
+    for map_name in sorted(map_names):
+        index = zone_index(map_name, zone_dir)
+        rows = with_map.filter(pl.col("map_name") == map_name)
+        zone = index.expr().cast(pl.String) if index is not None else pl.lit(None, dtype=pl.String).alias("zone")
+        labelled.append(rows.with_columns(zone))
+    unknown = with_map.filter(~pl.col("map_name").is_in(map_names) | pl.col("map_name").is_null())
+    labelled.append(unknown.with_columns(pl.lit(None, dtype=pl.String).alias("zone")))
+
+    return pl.concat(labelled).drop("map_name")
@@ -19,9 +19,11 @@ class Round:
     winner: str
     events: List[Dict]
     positions: List[Dict] = None
+    freeze_end: int = None
 
 @dataclass
 class Game:
     map_name: str
     teams: List[Team]
     rounds: List[Round]
+    tickrate: int = 64
@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import Iterable
+
+import polars as pl
+
+from ..application.heatmaps import GRID_SCHEMA, HeatmapSpec
+from ..application.interfaces import HeatmapStore
+
+
+class ParquetHeatmapStore(HeatmapStore):
+    """
+    Per-game sparse heatmap grids stored next to the game tables.
+
+    One row per game and heatmap spec holds the game's non-empty cells and their
+    counts as list columns, so reading N games' grids is a filtered scan.
+    """
+
+    TABLE_NAME = "heatmaps"
+    SPEC_COLUMNS = ["side", "window_seconds", "bins", "version"]
+
+    def __init__(self, base_path: str = "data/processed"):
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.table_path = self.base_path / f"{self.TABLE_NAME}.parquet"
+
+    def get(self, spec: HeatmapSpec, game_ids: Iterable[str]) -> pl.DataFrame:
+        """
+        Read the stored grids of some games.
+
+        Returns:
+            DataFrame with columns game_id, map_name, cells and counts for the games that have a grid
+        """
+        if not self.table_path.exists():
+            return pl.DataFrame(schema=GRID_SCHEMA)
+
+        return pl.scan_parquet(self.table_path).filter(
+            self._spec_filter(spec) & pl.col("game_id").is_in(list(game_ids))
+        ).select(list(GRID_SCHEMA)).collect()
+
+    def put(self, spec: HeatmapSpec, grids: pl.DataFrame) -> None:
+        """Store grids, replacing earlier grids of the same games and spec."""
+        if grids.is_empty():
+            return
+
+        rows = grids.select(list(GRID_SCHEMA)).cast(GRID_SCHEMA).with_columns(
+            pl.lit(spec.side).alias("side"),
+            pl.lit(spec.window_seconds, dtype=pl.Int64).alias("window_seconds"),
+            pl.lit(spec.bins, dtype=pl.Int64).alias("bins"),
+            pl.lit(spec.version, dtype=pl.Int64).alias("version")
+        )
+
+        if self.table_path.exists():
+            replaced = self._spec_filter(spec) & pl.col("game_id").is_in(rows["game_id"].to_list())
+            kept = pl.read_parquet(self.table_path).filter(~replaced)
+            rows = pl.concat([kept, rows.select(kept.columns)])
+
+        rows.sort(["game_id"] + self.SPEC_COLUMNS).write_parquet(self.table_path)
+
+    def _spec_filter(self, spec: HeatmapSpec) -> pl.Expr:
+        return (
+            (pl.col("side") == spec.side) & (pl.col("window_seconds") == spec.window_seconds) &
+            (pl.col("bins") == spec.bins) & (pl.col("version") == spec.version)
+        )
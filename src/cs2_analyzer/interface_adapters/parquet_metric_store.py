@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+import json
+import os
+import time
+import pandas as pd
+
+from ..application.interfaces import MetricResultStore
+from ..application.metric_cache import MetricKey
+
+
+class ParquetMetricStore(MetricResultStore):
+    """
+    Persistent metric result cache stored as a single Parquet table.
+
+    Results are stored as JSON so floats, dicts and lists round-trip. Entries are
+    evicted least recently used first once the store holds more than max_entries
+    results or more than max_bytes of encoded values.
+
+    Lookups only update access times in memory; they are written with the next
+    put_many() or on close(). The table is written to a temporary file and moved into
+    place, so a crash mid-write leaves the previous table intact.
+    """
+
+    TABLE_NAME = "metric_results"
+
+    def __init__(self, base_path: str = "data/cache", max_entries: int = 10000,
+                 max_bytes: Optional[int] = 64 * 1024 * 1024):
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[MetricKey, Tuple[str, float]]" = self._load()
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "ParquetMetricStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_many(self, keys: Iterable[MetricKey]) -> Dict[MetricKey, Any]:
+        """
+        Look up cached results.
+
+        Hits are marked as recently used so they survive eviction longer. The new access
+        times are kept in memory until the next write.
+
+        Returns:
+            Dict with the decoded result of every key that is cached
+        """
+        now = time.time()
+        hits = {}
+        for key in keys:
+            if key not in self._entries:
+                continue
+            encoded, _ = self._entries.pop(key)
+            self._entries[key] = (encoded, now)
+            hits[key] = json.loads(encoded)
+
+        if hits:
+            self._dirty = True
+        return hits
+
+    def put_many(self, values: Dict[MetricKey, Any]) -> None:
+        """Store results, evicting the least recently used entries beyond the size limits."""
+        if not values:
+            return
+
+        now = time.time()
+        for key, value in values.items():
+            self._entries.pop(key, None)
+            self._entries[key] = (json.dumps(value, default=float), now)
+
+        self._evict()
+        self._flush()
+
+    def close(self) -> None:
+        """Write access times updated by lookups since the last write."""
+        if self._dirty:
+            self._flush()
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        self._entries.clear()
+        self._flush()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the store fits its limits."""
+        total_bytes = sum(len(encoded) for encoded, _ in self._entries.values())
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and total_bytes > self.max_bytes)
+        ):
+            _, (encoded, _) = self._entries.popitem(last=False)
+            total_bytes -= len(encoded)
+
+    def _load(self) -> "OrderedDict[MetricKey, Tuple[str, float]]":
+        """Load the stored entries, least recently used first."""
+        table_path = self.base_path / f"{self.TABLE_NAME}.parquet"
+        entries: "OrderedDict[MetricKey, Tuple[str, float]]" = OrderedDict()
+
+        if not table_path.exists():
+            return entries
+
+        df = pd.read_parquet(table_path).sort_values('last_used', kind='stable')
+        for row in df.itertuples(index=False):
+            key = MetricKey(game_hash=row.game_hash, metric=row.metric, version=int(row.version), params=row.params)
+            entries[key] = (row.value, float(row.last_used))
+
+        return entries
+
+    def _flush(self) -> None:
+        """Write all entries back to the Parquet table, replacing it atomically."""
+        table_path = self.base_path / f"{self.TABLE_NAME}.parquet"
+
+        df = pd.DataFrame(
+            [
+                {
+                    'game_hash': key.game_hash,
+                    'metric': key.metric,
+                    'version': key.version,
+                    'params': key.params,
+                    'value': encoded,
+                    'last_used': last_used
+                }
+                for key, (encoded, last_used) in self._entries.items()
+            ],
+            columns=['game_hash', 'metric', 'version', 'params', 'value', 'last_used']
+        )
+        temp_path = table_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            df.to_parquet(temp_path, engine='pyarrow', index=False)
+            os.replace(temp_path, table_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        self._dirty = False
@@ -1,19 +1,28 @@
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional
 import pandas as pd
+import polars as pl
 import pyarrow as pa
 import pyarrow.parquet as pq
 import uuid
 from datetime import datetime
 
 from ..application.interfaces import GameRepository
+from ..application.frames import (
+    MatchFrames, GAME_SCHEMA, ROUND_SCHEMA, TICK_SCHEMA, EVENT_SCHEMA, PLAYER_SCHEMA, ROUND_PLAYER_SCHEMA,
+    build_round_players, conform, empty_frame, estimate_spawns
+)
+from ..application.metrics import build_bombsite_centroids
 from ..domain.entities import Game, Team, Player, Round
 
 
 class ParquetGameRepository(GameRepository):
     """
     Repository implementation using Apache Parquet for storage.
-    Implements a normalized schema with 6 tables for OLAP optimization.
+    Implements a normalized schema with 7 tables for OLAP optimization.
+
+    Every table is written with one row group per game and a page index, so lazy
+    scans filtered on game_id only read the row groups of the selected games.
     """
 
     def __init__(self, base_path: str = "data/processed"):
@@ -31,6 +40,7 @@ class ParquetGameRepository(GameRepository):
         - rounds.parquet: Round metadata
         - events.parquet: All game events
         - positions.parquet: Player position data
+        - round_players.parquet: Players of every round
         """
         # Generate unique game_id
         game_id = str(uuid.uuid4())
@@ -54,6 +64,9 @@ class ParquetGameRepository(GameRepository):
         # 6. Save positions
         self._save_positions(game_id, game.rounds)
 
+        # 7. Save round players
+        self._save_round_players(game_id, game.rounds)
+
         print(f"Saved game {game_id} ({game.map_name}) to Parquet storage")
 
     def get(self, game_id: str) -> Game:
@@ -69,6 +82,7 @@ class ParquetGameRepository(GameRepository):
 
         game_row = games_df[games_df['game_id'] == game_id].iloc[0]
         map_name = game_row['map_name']
+        tickrate = int(game_row['tickrate']) if pd.notna(game_row.get('tickrate')) else 64
 
         # 2. Load teams
         teams = self._load_teams(game_id)
@@ -76,13 +90,139 @@ class ParquetGameRepository(GameRepository):
         # 3. Load rounds
         rounds = self._load_rounds(game_id)
 
-        return Game(map_name=map_name, teams=teams, rounds=rounds)
+        return Game(map_name=map_name, teams=teams, rounds=rounds, tickrate=tickrate)
+
+    def scan_frames(self, game_ids: Optional[Iterable[str]] = None) -> MatchFrames:
+        """
+        Lazily scan the stored tables as MatchFrames for the metric plans.
+
+        Nothing is read until a plan is collected. Filters on game_id, round and side,
+        and the columns a plan selects, are pushed down into the Parquet reader.
+
+        Args:
+            game_ids: Restrict the scan to these games (default: all stored games)
+
+        Returns:
+            MatchFrames over the stored games. Bombsites are estimated from the stored
+            bomb plants and spawns from the first positions after freeze end.
+        """
+        games = self._scan_table('games')
+        if games is None:
+            return MatchFrames(
+                games=empty_frame(GAME_SCHEMA), rounds=empty_frame(ROUND_SCHEMA), ticks=empty_frame(TICK_SCHEMA)
+            )
+        games = conform(games.with_columns(pl.col('timestamp').str.to_datetime(strict=False)), GAME_SCHEMA)
+        games = games.with_columns(pl.col('tickrate').fill_null(64)).select(list(GAME_SCHEMA))
+
+        round_ids = None
+        rounds = self._scan_table('rounds')
+        has_freeze_end = rounds is not None and 'freeze_end' in rounds.collect_schema()
+        if rounds is None:
+            rounds = empty_frame(ROUND_SCHEMA)
+        else:
+            round_ids = rounds.select(['round_id', pl.col('round_number').alias('round_num')])
+            rounds = conform(rounds.rename({'round_number': 'round_num', 'winner': 'winner_side'}), ROUND_SCHEMA)
+
+        ticks = self._scan_table('positions')
+        ticks = empty_frame(TICK_SCHEMA) if ticks is None else self._with_round_num(ticks, round_ids, TICK_SCHEMA)
+
+        # Tables written before freeze_end was stored fall back to each round's first position.
+        if round_ids is not None and not has_freeze_end:
+            first_positions = ticks.group_by(['game_id', 'round_num']).agg(pl.col('tick').min().alias('first_tick'))
+            rounds = rounds.join(first_positions, on=['game_id', 'round_num'], how='left').with_columns(
+                pl.coalesce('freeze_end', 'first_tick').alias('freeze_end')
+            ).drop('first_tick')
+        rounds = rounds.select(list(ROUND_SCHEMA))
+
+        events = {}
+        event_table = self._scan_events(round_ids)
+        if event_table is not None:
+            event_types = event_table.select(pl.col('event_type').unique()).collect()['event_type']
+            for event_type in event_types.drop_nulls():
+                events[event_type] = event_table.filter(pl.col('event_type') == event_type)
+
+        players = self._scan_players()
+
+        # Tables written before round players were stored fall back to the players in the positions.
+        round_players = self._scan_table('round_players')
+        if round_players is None:
+            round_players = build_round_players(ticks)
+        else:
+            round_players = self._with_round_num(round_players, round_ids, ROUND_PLAYER_SCHEMA)
+        round_players = round_players.select(list(ROUND_PLAYER_SCHEMA))
+
+        frames = MatchFrames(games=games, rounds=rounds, ticks=ticks, events=events, players=players,
+                             round_players=round_players)
+        frames = frames.where(game_ids=game_ids) if game_ids is not None else frames
+
+        sites = build_bombsite_centroids(frames)
+        spawns = estimate_spawns(frames.ticks, frames.rounds)
+        return MatchFrames(games=frames.games, rounds=frames.rounds, ticks=frames.ticks,
+                           events=frames.events, sites=sites, spawns=spawns, players=frames.players,
+                           round_players=frames.round_players)
+
+    def scan_events(self, game_ids: Optional[Iterable[str]] = None) -> pl.LazyFrame:
+        """
+        Lazily scan the stored events table with every event type in one frame.
+
+        Args:
+            game_ids: Restrict the scan to these games (default: all stored games)
+
+        Returns:
+            LazyFrame with game_id, round_num, tick, event_type and the stored event fields
+        """
+        rounds = self._scan_table('rounds')
+        round_ids = None if rounds is None else rounds.select(['round_id', pl.col('round_number').alias('round_num')])
+        events = self._scan_events(round_ids)
+        if events is None:
+            return empty_frame({**EVENT_SCHEMA, 'event_type': pl.String})
+        return events.filter(pl.col('game_id').is_in(list(game_ids))) if game_ids is not None else events
+
+    def _scan_events(self, round_ids: Optional[pl.LazyFrame]) -> Optional[pl.LazyFrame]:
+        """Lazily scan the events table with round_num, or None if it has not been written yet."""
+        events = self._scan_table('events')
+        if events is None:
+            return None
+        return self._with_round_num(events, round_ids, EVENT_SCHEMA)
+
+    def _scan_players(self) -> pl.LazyFrame:
+        """Lazily scan the player roster with each player's team name."""
+        players = self._scan_table('players')
+        if players is None:
+            return empty_frame(PLAYER_SCHEMA)
+
+        teams = self._scan_table('teams')
+        if teams is not None:
+            players = players.drop('team').join(
+                teams.select(['team_id', pl.col('name').alias('team')]), on='team_id', how='left'
+            )
+
+        return conform(players.rename({'steam_id': 'player_steamid'}), PLAYER_SCHEMA).select(list(PLAYER_SCHEMA))
+
+    def _scan_table(self, table_name: str) -> Optional[pl.LazyFrame]:
+        """Lazily scan a Parquet table, or None if it has not been written yet."""
+        table_path = self.base_path / f"{table_name}.parquet"
+
+        if not table_path.exists():
+            return None
+
+        return pl.scan_parquet(table_path)
+
+    def _with_round_num(self, table: pl.LazyFrame, round_ids: Optional[pl.LazyFrame], schema) -> pl.LazyFrame:
+        """Expose a table's round number as round_num and conform it to a schema."""
+        if 'round_number' in table.collect_schema():
+            table = table.drop('round_num', strict=False).rename({'round_number': 'round_num'})
+        elif round_ids is not None:
+            # Tables written before round_number was stored resolve it through round_id.
+            table = table.drop('round_num', strict=False).join(round_ids, on='round_id', how='left')
+        return conform(table, schema)
 
     def _save_game_metadata(self, game_id: str, game: Game, timestamp: str) -> None:
         """Save game metadata to games.parquet."""
         game_data = {
             'game_id': [game_id],
             'map_name': [game.map_name],
+            'tickrate': [game.tickrate],
             'timestamp': [timestamp],
             'num_teams': [len(game.teams)],
             'num_rounds': [len(game.rounds)]
@@ -141,6 +281,7 @@ class ParquetGameRepository(GameRepository):
                 'game_id': game_id,
                 'round_number': round_obj.round_number,
                 'winner': round_obj.winner,
+                'freeze_end': round_obj.freeze_end,
                 'num_events': len(round_obj.events) if round_obj.events else 0,
                 'num_positions': len(round_obj.positions) if round_obj.positions else 0
             })
@@ -164,12 +305,13 @@ class ParquetGameRepository(GameRepository):
                     'event_id': f"{round_id}_event_{event_idx}",
                     'round_id': round_id,
                     'game_id': game_id,
+                    'round_number': round_obj.round_number,
                     'tick': event.get('tick'),
                     'event_type': event.get('event_type'),
                 }
                 # Store additional event data as JSON-serializable fields
                 for key, value in event.items():
-                    if key not in ['tick', 'event_type']:
+                    if key not in ['tick', 'event_type', 'round_number']:
                         # Convert to string if not a primitive type
                         if isinstance(value, (int, float, str, bool, type(None))):
                             event_entry[key] = value
@@ -198,6 +340,7 @@ class ParquetGameRepository(GameRepository):
                     'position_id': f"{round_id}_pos_{pos_idx}",
                     'round_id': round_id,
                     'game_id': game_id,
+                    'round_number': round_obj.round_number,
                     'tick': position.get('tick'),
                     'player_steamid': position.get('player_steamid'),
                     'side': position.get('side'),
@@ -205,13 +348,39 @@ class ParquetGameRepository(GameRepository):
                     'Y': position.get('Y'),
                     'Z': position.get('Z'),
                     'yaw': position.get('yaw'),
-                    'pitch': position.get('pitch')
+                    'pitch': position.get('pitch'),
+                    'place': position.get('place')
                 })
 
         if position_data:
             df = pd.DataFrame(position_data)
             self._append_to_table('positions', df)
 
+    def _save_round_players(self, game_id: str, rounds: List[Round]) -> None:
+        """Save the players seen in each round's positions to round_players.parquet."""
+        if not rounds:
+            return
+
+        player_data = []
+        for round_obj in rounds:
+            sides = {}
+            for position in round_obj.positions or []:
+                if position.get('player_steamid') is not None:
+                    sides.setdefault(position.get('player_steamid'), position.get('side'))
+
+            for player_steamid, side in sides.items():
+                player_data.append({
+                    'round_id': f"{game_id}_round_{round_obj.round_number}",
+                    'game_id': game_id,
+                    'round_number': round_obj.round_number,
+                    'player_steamid': player_steamid,
+                    'side': side
+                })
+
+        if player_data:
+            df = pd.DataFrame(player_data)
+            self._append_to_table('round_players', df)
+
     def _append_to_table(self, table_name: str, df: pd.DataFrame) -> None:
         """Append DataFrame to a Parquet table file."""
         table_path = self.base_path / f"{table_name}.parquet"
@@ -220,10 +389,25 @@ class ParquetGameRepository(GameRepository):
             # Read existing table and append
             existing_df = pd.read_parquet(table_path)
             combined_df = pd.concat([existing_df, df], ignore_index=True)
-            combined_df.to_parquet(table_path, engine='pyarrow', index=False)
         else:
             # Create new table
-            df.to_parquet(table_path, engine='pyarrow', index=False)
+            combined_df = df
+
+        self._write_by_game(table_path, pa.Table.from_pandas(combined_df, preserve_index=False))
+
+    def _write_by_game(self, table_path: Path, table: pa.Table) -> None:
+        """
+        Write a table with one row group per contiguous run of game_id.
+
+        Row group statistics and the page index then let lazy scans skip
+        every game a query does not select.
+        """
+        game_ids = table.column('game_id').to_pylist()
+        boundaries = [0] + [i for i in range(1, len(game_ids)) if game_ids[i] != game_ids[i - 1]] + [len(game_ids)]
+
+        with pq.ParquetWriter(table_path, table.schema, write_page_index=True) as writer:
+            for start, end in zip(boundaries, boundaries[1:]):
+                writer.write_table(table.slice(start, end - start), row_group_size=end - start)
 
     def _load_table(self, table_name: str) -> pd.DataFrame:
         """Load a Parquet table."""
@@ -288,11 +472,13 @@ class ParquetGameRepository(GameRepository):
             round_positions_df = positions_df[positions_df['round_id'] == round_id] if not positions_df.empty else pd.DataFrame()
             positions = round_positions_df.to_dict('records') if not round_positions_df.empty else []
 
+            freeze_end = round_row.get('freeze_end')
             round_obj = Round(
                 round_number=int(round_row['round_number']),
                 winner=round_row['winner'],
                 events=events,
-                positions=positions
+                positions=positions,
+                freeze_end=int(freeze_end) if pd.notna(freeze_end) else None
             )
             rounds.append(round_obj)
 
@@ -1,33 +1,70 @@
 import argparse
+import polars as pl
 from .application.services import GameService
 from .application.ingestion import AwpyDemoParser
 from .interface_adapters.parquet_repository import ParquetGameRepository
+from .interface_adapters.parquet_metric_store import ParquetMetricStore
 
-from .application.metrics import calculate_t_side_avg_dist_to_bombsite
+from .application.metric_registry import BatchMetricEvaluator
+from .application.metric_cache import content_hash
 
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze CS2 demo files.")
     parser.add_argument("file_path", type=str, help="Path to the demo file.")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every metric instead of using cached results.")
+    parser.add_argument("--breakdown", choices=["round", "player"],
+                        help="Also print every metric per round, or per round and player.")
     args = parser.parse_args()
 
     print(f"\n=== CS2 Demo Analyzer ===")
     print(f"Processing: {args.file_path}\n")
 
-    # Initialize components
-    demo_parser = AwpyDemoParser()
-    game_repository = ParquetGameRepository()
-    game_service = GameService(game_repository, demo_parser)
+    cache = None if args.no_cache else ParquetMetricStore()
+    evaluator = BatchMetricEvaluator(cache=cache)
+    game_hash = content_hash(args.file_path)
+    by = None
+    if args.breakdown:
+        by = ["round_num"] if args.breakdown == "round" else ["round_num", "player_steamid"]
 
-    # Process the demo file (parses, transforms to Game entity, saves to Parquet)
-    print("Parsing demo file...")
-    demo = game_service.process_game(args.file_path)
-    print("[OK] Demo parsed and saved to Parquet storage\n")
+    metric_count = len(evaluator.registry.names())
+    all_cached = len(evaluator.cached_values(game_hash)) == metric_count and (
+        by is None or len(evaluator.cached_breakdowns(game_hash, by)) == metric_count
+    )
+    if all_cached:
+        # Every metric of this exact demo is cached, so it was already parsed and stored
+        print("[CACHE HIT] All metrics cached for this demo, skipping parsing\n")
+        demo = None
+    else:
+        # Initialize components
+        demo_parser = AwpyDemoParser()
+        game_repository = ParquetGameRepository()
+        game_service = GameService(game_repository, demo_parser)
+
+        # Process the demo file (parses, transforms to Game entity, saves to Parquet)
+        print("Parsing demo file...")
+        demo = game_service.process_game(args.file_path)
+        print("[OK] Demo parsed and saved to Parquet storage\n")
 
     # Calculate and display metrics
     print("=== Metrics ===")
-    avg_dist = calculate_t_side_avg_dist_to_bombsite(demo)
-    print(f"T-Side Average Distance to Bombsite: {avg_dist:.2f}")
+    if by is None:
+        results = evaluator.evaluate(demo, game_hash=game_hash)
+    else:
+        # Scalars and breakdowns come out of the same pass
+        results, breakdown = evaluator.evaluate_with_breakdown(demo, game_hash=game_hash, by=by)
+    for row in results.iter_rows(named=True):
+        description = evaluator.registry.get(row["metric"]).description
+        print(f"{description}: {row['value']:.2f}")
+
+    if by is not None:
+        print(f"\n=== Metrics by {args.breakdown} ===")
+        with pl.Config(tbl_rows=-1, tbl_cols=-1):
+            print(breakdown.pivot(on="metric", index=by, values="value").sort(by))
+
+    if cache is not None:
+        # Persist the access times of the cache hits
+        cache.close()
 
     print("\n[OK] Analysis complete!")
 
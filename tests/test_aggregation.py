@@ -0,0 +1,72 @@
+import tempfile
+import shutil
+from datetime import datetime
+import pytest
+from src.cs2_analyzer.application.aggregation import CrossGameAggregator
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+from src.cs2_analyzer.domain.entities import Game, Team, Player, Round
+
+
+def make_game(map_name: str, team_name: str, roster: list, victim: int, traded: bool) -> Game:
+    events = [
+        {"tick": 100, "event_type": "player_death", "user_steamid": victim, "attacker_steamid": 9,
+         "user_side": "t", "attacker_side": "ct"},
+    ]
+    if traded:
+        events.append({"tick": 120, "event_type": "player_death", "user_steamid": 9, "attacker_steamid": roster[0],
+                       "user_side": "ct", "attacker_side": "t"})
+
+    teams = [Team(name=team_name, players=[Player(steam_id=steamid, name=f"P{steamid}", team="T") for steamid in roster])]
+    rounds = [Round(round_number=1, winner="t", events=events, positions=[], freeze_end=90)]
+    return Game(map_name=map_name, teams=teams, rounds=rounds, tickrate=10)
+
+
+@pytest.fixture
+def frames():
+    temp_dir = tempfile.mkdtemp()
+    repo = ParquetGameRepository(base_path=temp_dir)
+    # Alpha's player 1 is traded on de_dust2, player 2 is not. Charlie's player 3 is traded on de_inferno.
+    repo.save(make_game("de_dust2", "Alpha", [1, 2], victim=1, traded=True))
+    repo.save(make_game("de_dust2", "Alpha", [1, 2], victim=2, traded=False))
+    repo.save(make_game("de_inferno", "Charlie", [3], victim=3, traded=True))
+
+    yield repo.scan_frames()
+
+    shutil.rmtree(temp_dir)
+
+
+def test_aggregate_by_map(frames):
+    results = CrossGameAggregator().aggregate(frames, by="map", metric_names=["trade_efficiency"])
+
+    assert results.rows() == [
+        ("de_dust2", "trade_efficiency", 0.5, 2, 2),
+        ("de_inferno", "trade_efficiency", 1.0, 1, 1),
+    ]
+
+
+def test_aggregate_by_team_and_player(frames):
+    aggregator = CrossGameAggregator()
+
+    by_team = aggregator.aggregate(frames, by="team", metric_names=["trade_efficiency"])
+    by_player = aggregator.aggregate(frames, by="player", metric_names=["trade_efficiency"])
+
+    assert by_team.select(["team", "value", "games"]).rows() == [("Alpha", 0.5, 2), ("Charlie", 1.0, 1)]
+    assert by_player.select(["player_steamid", "value"]).rows() == [(1, 1.0), (2, 0.0), (3, 1.0)]
+
+
+def test_aggregate_filters_games(frames):
+    aggregator = CrossGameAggregator()
+
+    scouted = aggregator.aggregate(frames, by="map", metric_names=["trade_efficiency"], players=[3])
+    future = aggregator.aggregate(frames, by="date", metric_names=["trade_efficiency"], start=datetime(2100, 1, 1))
+    by_date = aggregator.aggregate(frames, by="date", metric_names=["trade_efficiency"], period="1d")
+
+    assert scouted["map_name"].to_list() == ["de_inferno"]
+    assert future.is_empty()
+    # All games were stored today, so they share a single daily period.
+    assert by_date.select(["value", "games"]).rows() == [(2 / 3, 3)]
+
+
+def test_aggregate_rejects_unknown_grouping(frames):
+    with pytest.raises(ValueError):
+        CrossGameAggregator().aggregate(frames, by="weapon")
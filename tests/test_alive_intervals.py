@@ -0,0 +1,56 @@
+import pytest
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.metrics import (
+    build_alive_intervals, build_round_ticks, calculate_player_spacing
+)
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_demo() -> MockDemo:
+    # Three Ts: player 3 dies at tick 120 in round 1 and keeps a tick row where they fell
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 1, 1, 2, 2],
+        "tick": [100, 100, 100, 130, 130, 130, 300, 300],
+        "player_steamid": [1, 2, 3, 1, 2, 3, 1, 3],
+        "side": ["t"] * 8,
+        "X": [0.0, 100.0, 1000.0, 0.0, 100.0, 1000.0, 0.0, 300.0],
+        "Y": [0.0] * 8,
+        "Z": [0.0] * 8,
+    })
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2], "freeze_end": [90, 290]}),
+        events={"player_death": pl.DataFrame({"tick": [120, 125], "user_steamid": [3, 3]})},
+        tickrate=10
+    )
+
+def test_build_alive_intervals():
+    intervals = build_alive_intervals(MatchFrames.from_demo(make_demo())).collect().drop("game_id").sort(
+        ["round_num", "player_steamid"]
+    )
+
+    # Only player 3's first death in round 1 ends an interval
+    assert intervals.rows() == [
+        (1, 1, 100, None),
+        (1, 2, 100, None),
+        (1, 3, 100, 120),
+        (2, 1, 300, None),
+        (2, 3, 300, None),
+    ]
+
+def test_round_ticks_mask_dead_players():
+    round_ticks = build_round_ticks(MatchFrames.from_demo(make_demo())).collect().sort(["tick", "player_steamid"])
+
+    assert round_ticks.filter(~pl.col("is_alive")).select(["tick", "player_steamid"]).rows() == [(130, 3)]
+
+def test_spacing_counts_living_teammates():
+    # Tick 100: pairs 100, 1000 and 900 apart. Tick 130: player 3 is dead, 100 apart.
+    # Round 2: 300 apart.
+    assert calculate_player_spacing(make_demo(), "t") == pytest.approx((2000 / 3 + 100 + 300) / 3)
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+
+import polars as pl
+from src.cs2_analyzer.application.clutches import (
+    build_clutches, calculate_clutches, clutch_stats, player_clutch_stats
+)
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_deaths(deaths) -> pl.DataFrame:
+    sides = {player: side for player, side in ((6, "ct"), (7, "ct"), (8, "ct"), (1, "t"), (2, "t"), (3, "t"))}
+    return pl.DataFrame({
+        "tick": [tick for tick, _, _ in deaths],
+        "user_steamid": [victim for _, victim, _ in deaths],
+        "attacker_steamid": [attacker for _, _, attacker in deaths],
+        "user_side": [sides[victim] for _, victim, _ in deaths],
+        "attacker_side": [sides[attacker] for _, _, attacker in deaths],
+    })
+
+def make_demo() -> MockDemo:
+    sides = {6: "ct", 7: "ct", 8: "ct", 1: "t", 2: "t", 3: "t"}
+    ticks = pl.DataFrame([
+        {"round_num": round_num, "tick": freeze_end, "player_steamid": player, "side": side}
+        for round_num, freeze_end in ((1, 0), (2, 1000), (3, 2000)) for player, side in sides.items()
+    ])
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2, 3], "freeze_end": [0, 1000, 2000],
+                             "winner_side": ["CT", "ct", "t"]}),
+        events={"player_death": make_deaths([
+            # Round 1: CT 8 is left alone against three Ts and kills all of them; T 3 being
+            # the last T in the final 1v1 is no second clutch
+            (10, 6, 1), (20, 7, 2), (30, 1, 8), (40, 2, 8), (50, 3, 8),
+            # Round 2: T 3 is left alone against three CTs, kills CT 6 and dies to CT 7
+            (1010, 1, 6), (1020, 2, 8), (1030, 6, 3), (1040, 3, 7),
+            # Round 3: no side is ever down to one player
+            (2010, 6, 1),
+        ])},
+        tickrate=10
+    )
+
+def test_calculate_clutches():
+    clutches = calculate_clutches(make_demo())
+
+    assert clutches.select(["round_num", "player_steamid", "side", "start_tick", "opponents", "kills", "won"]).rows() == [
+        (1, 8, "ct", 20, 3, 3, True),
+        (2, 3, "t", 1020, 3, 1, False),
+    ]
+
+def test_player_clutch_stats():
+    frames = MatchFrames.from_demo(make_demo())
+    stats = player_clutch_stats(frames, build_clutches(frames)).collect()
+
+    # Every player of the game gets a row, players without clutches zero counts
+    assert stats.height == 6
+    assert stats.filter(pl.col("player_steamid") == 8).select(
+        ["clutches", "clutches_won", "clutch_kills", "clutches_won_1v3", "clutch_win_rate"]
+    ).row(0) == (1, 1, 3, 1, 1.0)
+    assert stats.filter(pl.col("player_steamid") == 1).select(["clutches", "clutch_win_rate"]).row(0) == (0, None)
+
+def test_clutch_stats_across_games():
+    frames = MatchFrames.from_demo(make_demo())
+    clutches = pl.concat([
+        build_clutches(frames),
+        build_clutches(frames).with_columns(pl.lit("other").alias("game_id")),
+    ])
+
+    totals = clutch_stats(clutches, by=["player_steamid"]).sort("player_steamid").collect()
+    assert totals.select(["player_steamid", "clutches", "clutches_won"]).rows() == [(3, 2, 0), (8, 2, 2)]
+
+def test_clutch_win_rate_metric():
+    values = BatchMetricEvaluator().evaluate(make_demo(), ["clutch_win_rate"])
+
+    # One of the two clutches is converted
+    assert values["value"].to_list() == [0.5]
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.crossfire import crossfire_by_tick, crossfire_by_round, calculate_crossfire_by_round
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+CHOKEPOINTS = pl.LazyFrame({"game_id": ["g"], "chokepoint": ["A"], "x": [1000.0], "y": [0.0], "z": [0.0]})
+
+def test_crossfire_graph_of_one_tick():
+    # Player 1 looks along +X at the chokepoint, player 2 looks up +Y at it from the side,
+    # player 3 stands next to player 1 looking the same way, player 4 is past it looking away.
+    ticks = pl.LazyFrame({
+        "game_id": ["g"] * 4,
+        "round_num": [1] * 4,
+        "tick": [100] * 4,
+        "player_steamid": [1, 2, 3, 4],
+        "X": [0.0, 1000.0, 0.0, 2000.0],
+        "Y": [0.0, -1000.0, 10.0, 0.0],
+        "Z": [0.0, 0.0, 0.0, 0.0],
+        "yaw": [0.0, 90.0, 0.0, 0.0],
+        "pitch": [0.0, 0.0, 0.0, 0.0],
+    })
+
+    graph = crossfire_by_tick(ticks, CHOKEPOINTS).collect()
+
+    # Players 1, 2 and 3 cover the chokepoint. 1 and 3 see it along the same line, so the
+    # crossfire edges are 1-2 and 3-2: two of the six possible pairs.
+    assert graph.select(["players", "covering", "edges"]).rows() == [(4, 3, 2)]
+    assert graph["density"][0] == 2 / 6
+
+def test_crossfire_by_round_from_demo():
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 1, 1],
+        "tick": [100, 100, 110, 110, 900, 900],
+        "side": ["ct"] * 6,
+        "player_steamid": [1, 2, 1, 2, 1, 2],
+        "X": [0.0, 1000.0, 0.0, 1000.0, 0.0, 1000.0],
+        "Y": [0.0, -1000.0, 0.0, -1000.0, 0.0, -1000.0],
+        "Z": [0.0] * 6,
+        # Crossfire on tick 100 only; tick 900 is after the 60 second window
+        "yaw": [0.0, 90.0, 0.0, 180.0, 0.0, 90.0],
+        "pitch": [0.0] * 6,
+    })
+    rounds = pl.DataFrame({"round_num": [1], "freeze_end": [90]})
+    plants = pl.DataFrame({"tick": [950], "site": [394], "user_steamid": [5],
+                           "user_X": [1000.0], "user_Y": [0.0], "user_Z": [0.0]})
+    demo = MockDemo(ticks=ticks, rounds=rounds, events={"bomb_planted": plants}, tickrate=10)
+
+    by_round = calculate_crossfire_by_round(demo)
+
+    assert by_round.select(["round_num", "chokepoint", "ticks", "crossfire_ticks", "max_covering"]).rows() == [
+        (1, "A", 2, 1, 2)
+    ]
+    assert BatchMetricEvaluator().evaluate(demo, ["crossfire_density"]).rows() == [("crossfire_density", 0.5)]
+
+def test_full_match_runs_in_seconds():
+    # 24 rounds of 60 seconds at 64 tick with 5 CTs and two chokepoints
+    rng = np.random.default_rng(0)
+    ticks_per_round = 60 * 64
+    rows = 24 * ticks_per_round * 5
+    ticks = pl.LazyFrame({
+        "game_id": ["g"] * rows,
+        "round_num": np.repeat(np.arange(24), ticks_per_round * 5),
+        "tick": np.repeat(np.arange(24 * ticks_per_round), 5),
+        "player_steamid": np.tile(np.arange(5), 24 * ticks_per_round),
+        "X": rng.uniform(-2000, 2000, rows),
+        "Y": rng.uniform(-2000, 2000, rows),
+        "Z": rng.uniform(-50, 50, rows),
+        "yaw": rng.uniform(-180, 180, rows),
+        "pitch": rng.uniform(-30, 30, rows),
+    })
+    chokepoints = pl.LazyFrame({"game_id": ["g", "g"], "chokepoint": ["A", "B"],
+                                "x": [500.0, -500.0], "y": [0.0, 0.0], "z": [0.0, 0.0]})
+
+    start = time.perf_counter()
+    by_round = crossfire_by_round(crossfire_by_tick(ticks, chokepoints)).collect()
+
+    assert by_round.height == 48
+    assert time.perf_counter() - start < 10
@@ -1,4 +1,4 @@
-from src.cs2_analyzer.application.metrics import calculate_ct_side_forward_presence_count, euclidean_distance
+from src.cs2_analyzer.application.metrics import calculate_ct_side_forward_presence_count, calculate_ct_side_forward_presence_by_round
 import polars as pl
 from dataclasses import dataclass
 
@@ -45,4 +45,38 @@ def test_calculate_ct_side_forward_presence_count():
     # Average forward count is 1.0
     expected = 1.0
 
-    assert calculate_ct_side_forward_presence_count(demo) == expected
\ No newline at end of file
+    assert calculate_ct_side_forward_presence_count(demo) == expected
+
+def test_calculate_ct_side_forward_presence_by_round():
+    # Mock data
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 2, 2, 2],
+        "tick": [100, 100, 110, 110, 500, 500, 9000],
+        "side": ["ct", "ct", "ct", "ct", "ct", "ct", "ct"],
+        "X": [600, 400, 600, 700, 900, 800, 900],
+        "Y": [1000, 1000, 1000, 1000, 1000, 1000, 1000],
+        "Z": [50, 50, 50, 50, 50, 50, 50]
+    })
+
+    rounds = pl.DataFrame({
+        "round_num": [1, 2],
+        "freeze_end": [90, 490]
+    })
+
+    demo = MockDemo(
+        ticks=ticks,
+        rounds=rounds,
+        tickrate=64,
+        t_spawn={"x": 1000, "y": 1000, "z": 50},
+        ct_spawn={"x": 0, "y": 1000, "z": 50}
+    )
+
+    by_round = calculate_ct_side_forward_presence_by_round(demo)
+
+    # Round 1: tick 100 has 1 forward player, tick 110 has 2. Average = 1.5
+    # Round 2: tick 500 has 2 forward players, tick 9000 is outside the 30s window. Average = 2.0
+    assert by_round["round_num"].to_list() == [1, 2]
+    assert by_round["forward_presence"].to_list() == [1.5, 2.0]
+
+    # The scalar is the average over rounds: (1.5 + 2.0) / 2 = 1.75
+    assert calculate_ct_side_forward_presence_count(demo) == 1.75
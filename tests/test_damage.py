@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+import polars as pl
+from src.cs2_analyzer.application.damage import (
+    calculate_damage_matrix, calculate_damage_stats, capped_damage, damage_by_weapon, damage_stats
+)
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+SIDES = {1: "t", 2: "t", 6: "ct", 7: "ct"}
+
+def make_demo() -> MockDemo:
+    hits = [
+        # Round 1: T 1 hits CT 6 for 60, then an AWP shot for 140 takes the remaining 40,
+        # and a hit on the dead player takes nothing; T 2's HE takes 30 from CT 7
+        (1, 10, 1, 6, "ak47", 60), (1, 20, 1, 6, "awp", 140), (1, 25, 2, 6, "ak47", 20),
+        (1, 30, 2, 7, "hegrenade", 30),
+        # Round 2: CT 6 burns T 1 for 25, T 2 damages their teammate T 1 and themselves
+        (2, 110, 6, 1, "inferno", 25), (2, 120, 2, 1, "ak47", 10), (2, 130, 2, 2, "hegrenade", 15),
+    ]
+    ticks = pl.DataFrame([
+        {"round_num": round_num, "tick": tick, "player_steamid": player, "side": side}
+        for round_num, tick in ((1, 0), (2, 100)) for player, side in SIDES.items()
+    ])
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2], "freeze_end": [0, 100]}),
+        events={"player_hurt": pl.DataFrame({
+            "round_num": [hit[0] for hit in hits],
+            "tick": [hit[1] for hit in hits],
+            "attacker_steamid": [hit[2] for hit in hits],
+            "user_steamid": [hit[3] for hit in hits],
+            "attacker_side": [SIDES[hit[2]] for hit in hits],
+            "user_side": [SIDES[hit[3]] for hit in hits],
+            "weapon": [hit[4] for hit in hits],
+            "dmg_health": [hit[5] for hit in hits],
+        })},
+        tickrate=10
+    )
+
+def test_capped_damage():
+    frames = MatchFrames.from_demo(make_demo())
+    damage = capped_damage(frames.event("player_hurt")).collect().sort("tick")
+
+    assert damage["damage"].to_list() == [60, 40, 0, 30, 25, 10, 15]
+
+def test_damage_stats():
+    stats = calculate_damage_stats(make_demo())
+
+    # Every player played both rounds; team and self damage are not in ADR
+    assert stats.select(["player_steamid", "rounds", "damage", "utility_damage", "team_damage", "adr"]).rows() == [
+        (1, 2, 100, 0, 0, 50.0),
+        (2, 2, 30, 30, 10, 15.0),
+        (6, 2, 25, 25, 0, 12.5),
+        (7, 2, 0, 0, 0, 0.0),
+    ]
+
+def test_damage_matrix_and_weapons():
+    assert calculate_damage_matrix(make_demo()).rows() == [
+        (1, 6, 100, 2),
+        (2, 6, 0, 1),
+        (2, 7, 30, 1),
+        (6, 1, 25, 1),
+    ]
+
+    frames = MatchFrames.from_demo(make_demo())
+    weapons = damage_by_weapon(capped_damage(frames.event("player_hurt")), by=()).collect()
+    assert weapons.filter(pl.col("player_steamid") == 1).select(["weapon", "damage"]).rows() == [
+        ("ak47", 60), ("awp", 40)
+    ]
+
+def test_damage_stats_across_games():
+    frames = MatchFrames.from_demo(make_demo())
+    damage = capped_damage(pl.concat([
+        frames.event("player_hurt"),
+        frames.event("player_hurt").with_columns(pl.lit("other").alias("game_id")),
+    ]))
+    round_players = pl.concat([
+        frames.round_players, frames.round_players.with_columns(pl.lit("other").alias("game_id"))
+    ])
+
+    totals = damage_stats(damage, round_players, by=()).collect()
+    assert totals.filter(pl.col("player_steamid") == 1).select(["rounds", "damage", "adr"]).row(0) == (4, 200, 50.0)
+
+def test_adr_metrics():
+    values = BatchMetricEvaluator().evaluate(make_demo(), ["adr", "utility_adr"])
+
+    # 155 enemy damage over 8 player rounds, 55 of it from utility
+    assert values["value"].to_list() == [155 / 8, 55 / 8]
+
+def test_damage_stats_match_adr_metric():
+    demo = make_demo()
+    # T 2 sits out round 2, so their 30 damage is over one round
+    demo.ticks = demo.ticks.filter((pl.col("round_num") == 1) | (pl.col("player_steamid") != 2))
+
+    stats = calculate_damage_stats(demo)
+    per_player = BatchMetricEvaluator().breakdown(demo, ["adr"], by=["player_steamid"])
+
+    assert stats.filter(pl.col("player_steamid") == 2).select(["rounds", "adr"]).row(0) == (1, 30.0)
+    assert per_player.select(["player_steamid", "value"]).rows() == stats.select(["player_steamid", "adr"]).rows()
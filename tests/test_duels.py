@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+import polars as pl
+from src.cs2_analyzer.application.duels import (
+    calculate_duel_stats, calculate_kill_matrix, duel_stats, opening_duels
+)
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+
+@dataclass
+class MockDemo:
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+SIDES = {1: "t", 2: "t", 6: "ct", 7: "ct"}
+
+def make_demo() -> MockDemo:
+    deaths = [
+        # Round 1: T 1 opens on CT 6 with a headshot, then kills CT 7
+        (1, 10, 1, 6, True), (1, 20, 1, 7, False),
+        # Round 2: CT 6 opens on T 1 with a headshot, CT 7 team kills CT 6 and headshots T 2
+        (2, 110, 6, 1, True), (2, 120, 7, 6, False), (2, 130, 7, 2, True),
+        # Round 3: the round opens with a suicide, which is not a duel
+        (3, 210, 7, 7, False), (3, 220, 6, 1, False),
+    ]
+    return MockDemo(
+        rounds=pl.DataFrame({"round_num": [1, 2, 3], "freeze_end": [0, 100, 200]}),
+        events={"player_death": pl.DataFrame({
+            "round_num": [death[0] for death in deaths],
+            "tick": [death[1] for death in deaths],
+            "attacker_steamid": [death[2] for death in deaths],
+            "user_steamid": [death[3] for death in deaths],
+            "attacker_side": [SIDES[death[2]] for death in deaths],
+            "user_side": [SIDES[death[3]] for death in deaths],
+            "headshot": [death[4] for death in deaths],
+        })},
+        tickrate=10
+    )
+
+def test_kill_matrix():
+    # Suicides and team kills are not kills
+    assert calculate_kill_matrix(make_demo()).rows() == [
+        (1, 6, 1, 1),
+        (1, 7, 1, 0),
+        (6, 1, 2, 1),
+        (7, 2, 1, 1),
+    ]
+
+def test_opening_duels():
+    frames = MatchFrames.from_demo(make_demo())
+    openings = opening_duels(frames.event("player_death")).collect().sort("round_num")
+
+    assert openings.select(["round_num", "winner_steamid", "loser_steamid"]).rows() == [
+        (1, 1, 6),
+        (2, 6, 1),
+        (3, None, 7),
+    ]
+
+def test_duel_stats():
+    stats = calculate_duel_stats(make_demo())
+
+    assert stats.select(
+        ["player_steamid", "kills", "deaths", "headshot_kills", "opening_wins", "opening_losses", "rounds_2k"]
+    ).rows() == [
+        (1, 2, 2, 1, 1, 1, 1),
+        (2, 0, 1, 0, 0, 0, 0),
+        (6, 2, 2, 1, 1, 1, 0),
+        (7, 1, 2, 1, 0, 0, 0),
+    ]
+    assert stats.filter(pl.col("player_steamid") == 2)["headshot_rate"].to_list() == [None]
+
+def test_duel_stats_across_games():
+    frames = MatchFrames.from_demo(make_demo())
+    deaths = pl.concat([
+        frames.event("player_death"),
+        frames.event("player_death").with_columns(pl.lit("other").alias("game_id")),
+    ])
+
+    per_game = duel_stats(deaths).collect()
+    totals = duel_stats(deaths, by=()).collect()
+
+    assert per_game.height == 8
+    assert totals.filter(pl.col("player_steamid") == 1).select(["kills", "opening_wins"]).row(0) == (4, 2)
+
+def test_duel_metrics():
+    demo = make_demo()
+    values = BatchMetricEvaluator().evaluate(demo, ["t_opening_duel_win_rate", "headshot_rate"])
+
+    # The T side wins the opening duel of round 1 and loses that of round 2; 3 of 5 kills are headshots
+    assert values["value"].to_list() == [0.5, 0.6]
+
+    # Each opening duel is credited to its T player
+    openings = BatchMetricEvaluator().breakdown(demo, ["t_opening_duel_win_rate"], by=["round_num", "player_steamid"])
+    assert openings.select(["round_num", "player_steamid", "value"]).rows() == [(1, 1, 1.0), (2, 1, 0.0)]
+
+    demo.events["player_death"] = demo.events["player_death"].filter(pl.col("round_num") != 2)
+    assert BatchMetricEvaluator().evaluate(demo, ["t_opening_duel_win_rate"])["value"].to_list() == [1.0]
@@ -0,0 +1,141 @@
+from src.cs2_analyzer.application.metrics import calculate_entry_success_rate, calculate_entry_by_round, build_death_index, calculate_trade_efficiency, calculate_executes, calculate_round_win_percentage
+import polars as pl
+from dataclasses import dataclass
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    tickrate: int
+    bombsite_locations: dict
+    events: dict
+
+def make_smokes(ticks, sides=None, x=0.0) -> pl.DataFrame:
+    return pl.DataFrame({
+        "tick": ticks,
+        "user_steamid": [1] * len(ticks),
+        "user_side": sides or ["t"] * len(ticks),
+        "x": [x] * len(ticks),
+        "y": [0.0] * len(ticks),
+        "z": [0.0] * len(ticks),
+    })
+
+def make_demo(player_death_events: pl.DataFrame, grenade_events: dict = None) -> MockDemo:
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 2, 2, 3],
+        "tick": [100, 105, 110, 300, 310, 500],
+        "side": ["t", "t", "t", "t", "t", "t"],
+        "X": [500, 0, 5, 0, 3, 500],
+        "Y": [0, 0, 0, 0, 0, 0],
+        "Z": [0, 0, 0, 0, 0, 0],
+        "player_steamid": [1, 1, 2, 3, 4, 5]
+    })
+
+    rounds = pl.DataFrame({
+        "round_num": [1, 2, 3],
+        "freeze_end": [90, 290, 490],
+        "winner_side": ["t", "ct", "t"]
+    })
+
+    # By default every round opens with a three-smoke execute onto A
+    if grenade_events is None:
+        grenade_events = {"smokegrenade_detonate": make_smokes([90, 95, 100, 290, 295, 300, 490, 495, 500])}
+
+    bombsite_locations = {
+        "A": {"x": 0, "y": 0, "z": 0, "radius": 10}
+    }
+
+    return MockDemo(
+        ticks=ticks,
+        rounds=rounds,
+        tickrate=10,
+        bombsite_locations=bombsite_locations,
+        events={"player_death": player_death_events, **grenade_events}
+    )
+
+def test_calculate_entry_success_rate_no_data():
+    assert calculate_entry_success_rate(None) == 0.0
+
+def test_build_death_index():
+    player_death_events = pl.DataFrame({
+        "user_steamid": [1, 1, 3],
+        "tick": [150, 160, 305]
+    })
+    demo = make_demo(player_death_events)
+
+    death_index = build_death_index(demo).sort("round_num")
+
+    # Player 1 dies twice in round 1, only the first death counts.
+    # Player 3 dies in round 2 (tick 305 is after round 2's freeze end at 290).
+    assert death_index.rows() == [(1, 1, 150), (2, 3, 305)]
+
+def test_calculate_entry_by_round():
+    player_death_events = pl.DataFrame({
+        "user_steamid": [1, 3],
+        "tick": [120, 305]
+    })
+    demo = make_demo(player_death_events)
+
+    by_round = calculate_entry_by_round(demo, entry_time_window=15)
+
+    # Round 1: Player 1 reaches A at tick 105 but dies at tick 120, inside the window (execute
+    #          at tick 90, ends at 240).
+    #          Player 2 reaches A at tick 110 and survives. Entry by player 2 at tick 110.
+    # Round 2: Player 3 reaches A at tick 300 but dies at tick 305. Player 4 reaches A at 310. Entry.
+    # Round 3: Player 5 never reaches a site. No entry.
+    assert by_round.rows() == [
+        (1, True, 2, 110),
+        (2, True, 4, 310),
+        (3, False, None, None)
+    ]
+
+    # 2 successful entries out of 3 executes
+    assert calculate_entry_success_rate(demo, entry_time_window=15) == 2 / 3
+
+def test_calculate_trade_efficiency_no_data():
+    assert calculate_trade_efficiency(None) == 0.0
+
+def test_calculate_trade_efficiency():
+    player_death_events = pl.DataFrame({
+        "tick": [100, 130, 200, 400, 460],
+        "user_side": ["t", "ct", "t", "t", "ct"],
+        "attacker_side": ["ct", "t", "ct", "ct", "t"]
+    })
+    demo = make_demo(player_death_events)
+
+    # With a 5s window at 10 ticks per second, a trade must happen within 50 ticks.
+    # T death at 100 is traded by the CT death at 130.
+    # T death at 200 is not traded (next CT death at 460).
+    # T death at 400 is not traded (CT death at 460 is 60 ticks later).
+    # Trade efficiency = 1 / 3
+    assert calculate_trade_efficiency(demo, trade_time_window=5) == 1 / 3
+
+def test_calculate_executes():
+    player_death_events = pl.DataFrame({"user_steamid": [1], "tick": [150]})
+    demo = make_demo(player_death_events, {
+        "smokegrenade_detonate": make_smokes(
+            # Round 1: three smokes within 5 s, then a fourth; round 2: the smoke at 290 is more
+            # than 6 s before the other two; round 3: one of the three smokes is a CT's
+            [100, 130, 150, 155, 290, 345, 370, 490, 495, 500],
+            sides=["t"] * 9 + ["ct"]
+        ),
+        "hegrenade_detonate": make_smokes([355]),
+        # Lands 2000 units from the only site
+        "flashbang_detonate": make_smokes([497], x=2000.0),
+    })
+
+    # Round 2's smokes at 345 and 370 and the HE at 355 form a burst starting at 345
+    assert calculate_executes(demo).rows() == [
+        (1, "A", 100, 3),
+        (2, "A", 345, 3),
+    ]
+
+    # No three grenades land within 2 seconds of each other
+    assert calculate_executes(demo, execute_window=2).is_empty()
+
+def test_round_win_percentage_counts_executed_rounds():
+    player_death_events = pl.DataFrame({"user_steamid": [1], "tick": [150]})
+    demo = make_demo(player_death_events, {"smokegrenade_detonate": make_smokes([290, 295, 300, 490, 495, 500])})
+
+    # Round 1 has no execute; the T side wins one of the two executed rounds
+    assert calculate_round_win_percentage(demo) == 0.5
@@ -0,0 +1,165 @@
+import tempfile
+import shutil
+from pathlib import Path
+import polars as pl
+import pyarrow.parquet as pq
+from dataclasses import dataclass
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.metrics import pacing_by_round
+from src.cs2_analyzer.interface_adapters.parquet_repository import ParquetGameRepository
+from src.cs2_analyzer.domain.entities import Game, Round
+
+METRICS = ["ct_side_forward_presence_count", "trade_efficiency"]
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+    t_spawn: dict
+    ct_spawn: dict
+
+def make_game(map_name: str, ct_x: int, traded: bool) -> Game:
+    positions = [
+        {"tick": 90, "player_steamid": 1, "side": "t", "X": 0.0, "Y": 0.0, "Z": 0.0},
+        {"tick": 90, "player_steamid": 6, "side": "ct", "X": 1000.0, "Y": 0.0, "Z": 0.0},
+        {"tick": 100, "player_steamid": 1, "side": "t", "X": 50.0, "Y": 0.0, "Z": 0.0},
+        {"tick": 100, "player_steamid": 6, "side": "ct", "X": float(ct_x), "Y": 0.0, "Z": 0.0},
+    ]
+    events = [
+        {"tick": 100, "event_type": "player_death", "user_steamid": 2, "attacker_steamid": 7,
+         "user_side": "t", "attacker_side": "ct"},
+    ]
+    if traded:
+        events.append({"tick": 120, "event_type": "player_death", "user_steamid": 7, "attacker_steamid": 3,
+                       "user_side": "ct", "attacker_side": "t"})
+
+    rounds = [Round(round_number=1, winner="t", events=events, positions=positions, freeze_end=90)]
+    return Game(map_name=map_name, teams=[], rounds=rounds, tickrate=10)
+
+def save_games(temp_dir: str) -> dict:
+    repo = ParquetGameRepository(base_path=temp_dir)
+    # The CT on de_dust2 pushes to X=300, closer to the T spawn (X=0) than to the CT spawn (X=1000).
+    repo.save(make_game("de_dust2", ct_x=300, traded=True))
+    repo.save(make_game("de_inferno", ct_x=1000, traded=False))
+
+    games = pl.read_parquet(Path(temp_dir) / "games.parquet")
+    return dict(zip(games["map_name"], games["game_id"]))
+
+def test_evaluate_frames_matches_evaluate():
+    demo = MockDemo(
+        ticks=pl.DataFrame({
+            "round_num": [1, 1, 1, 1],
+            "tick": [100, 100, 110, 110],
+            "side": ["t", "ct", "t", "ct"],
+            "X": [0, 900, 50, 300],
+            "Y": [0, 0, 0, 0],
+            "Z": [0, 0, 0, 0],
+            "player_steamid": [1, 6, 1, 6]
+        }),
+        rounds=pl.DataFrame({"round_num": [1], "freeze_end": [90], "winner_side": ["t"]}),
+        events={"player_death": pl.DataFrame({
+            "tick": [100, 120],
+            "user_steamid": [2, 7],
+            "attacker_steamid": [7, 3],
+            "user_side": ["t", "ct"],
+            "attacker_side": ["ct", "t"]
+        })},
+        tickrate=10,
+        t_spawn={"x": 0, "y": 0, "z": 0},
+        ct_spawn={"x": 1000, "y": 0, "z": 0}
+    )
+    evaluator = BatchMetricEvaluator()
+
+    per_game = evaluator.evaluate_frames(MatchFrames.from_demo(demo, game_id="g1"), metric_names=METRICS)
+
+    assert per_game["game_id"].to_list() == ["g1", "g1"]
+    assert per_game.select(["metric", "value"]).rows() == evaluator.evaluate(demo, metric_names=METRICS).rows()
+
+def test_scan_frames_evaluates_every_stored_game():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        game_ids = save_games(temp_dir)
+        frames = ParquetGameRepository(base_path=temp_dir).scan_frames()
+
+        results = BatchMetricEvaluator().evaluate_frames(frames, metric_names=METRICS)
+        values = {(row["game_id"], row["metric"]): row["value"] for row in results.iter_rows(named=True)}
+
+        # Spawns are estimated from the positions at freeze end: T at X=0, CT at X=1000.
+        # de_dust2: the CT is forward on 1 of 2 ticks, and the T death at tick 100 is traded at tick 120.
+        assert values[(game_ids["de_dust2"], "ct_side_forward_presence_count")] == 0.5
+        assert values[(game_ids["de_dust2"], "trade_efficiency")] == 1.0
+        # de_inferno: the CT never leaves spawn and the T death is not traded.
+        assert values[(game_ids["de_inferno"], "ct_side_forward_presence_count")] == 0.0
+        assert values[(game_ids["de_inferno"], "trade_efficiency")] == 0.0
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_scan_frames_restricts_to_selected_games():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        game_ids = save_games(temp_dir)
+        frames = ParquetGameRepository(base_path=temp_dir).scan_frames(game_ids=[game_ids["de_inferno"]])
+
+        results = BatchMetricEvaluator().evaluate_frames(frames, metric_names=METRICS)
+
+        assert set(results["game_id"]) == {game_ids["de_inferno"]}
+        assert frames.ticks.collect()["game_id"].unique().to_list() == [game_ids["de_inferno"]]
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_scan_frames_reads_stored_round_players():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        game_ids = save_games(temp_dir)
+        stored = ParquetGameRepository(base_path=temp_dir).scan_frames().round_players.collect()
+
+        assert stored.filter(pl.col("game_id") == game_ids["de_dust2"]).sort("player_steamid").select(
+            ["round_num", "player_steamid", "side"]
+        ).rows() == [(1, 1, "t"), (1, 6, "ct")]
+
+        # Stores written before the table existed list the players of the positions instead
+        (Path(temp_dir) / "round_players.parquet").unlink()
+        rebuilt = ParquetGameRepository(base_path=temp_dir).scan_frames().round_players.collect()
+        assert rebuilt.sort(["game_id", "player_steamid"]).rows() == stored.sort(["game_id", "player_steamid"]).rows()
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_pacing_over_stored_events_table():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        game_ids = save_games(temp_dir)
+        repo = ParquetGameRepository(base_path=temp_dir)
+        frames = repo.scan_frames()
+
+        by_round = pacing_by_round(repo.scan_events(), frames.rounds, frames.games).collect()
+        pacing = {row["game_id"]: row for row in by_round.iter_rows(named=True)}
+
+        # Freeze ends at tick 90 at 10 ticks per second: the first death is 1 s in, the trade 3 s in
+        assert (pacing[game_ids["de_dust2"]]["ttfk"], pacing[game_ids["de_dust2"]]["avg_death_time"]) == (1.0, 2.0)
+        assert (pacing[game_ids["de_inferno"]]["ttfk"], pacing[game_ids["de_inferno"]]["avg_death_time"]) == (1.0, 1.0)
+        assert by_round["time_to_plant"].is_null().all()
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_tables_have_one_row_group_per_game():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        save_games(temp_dir)
+
+        for table in ["games", "rounds", "events", "positions"]:
+            assert pq.ParquetFile(Path(temp_dir) / f"{table}.parquet").num_row_groups == 2
+
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+
+import polars as pl
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.game_state import (
+    GameStateIndex, build_game_state, calculate_game_state, post_plant_win_breakdown, state_at
+)
+from src.cs2_analyzer.application.metrics import _scalar, summarize
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_demo() -> MockDemo:
+    sides = {6: "ct", 7: "ct", 1: "t", 2: "t", 3: "t"}
+    ticks = pl.DataFrame([
+        {"round_num": round_num, "tick": tick, "player_steamid": player, "side": side}
+        for round_num, tick in ((1, 0), (2, 1000)) for player, side in sides.items()
+    ])
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2], "freeze_end": [0, 1000], "winner_side": ["ct", "t"]}),
+        events={
+            "player_death": pl.DataFrame({
+                "tick": [50, 150, 150, 160, 1100],
+                "user_steamid": [1, 6, 2, 6, 7],
+            }),
+            "bomb_planted": pl.DataFrame({"tick": [100, 1200], "user_steamid": [3, 1], "site": ["A", "B"]}),
+            "bomb_defused": pl.DataFrame({"tick": [300]}),
+            "bomb_exploded": pl.DataFrame({"tick": [1600]}),
+        },
+        tickrate=10
+    )
+
+def test_build_game_state():
+    timeline = calculate_game_state(make_demo())
+
+    # Round 1: T 1 dies at 50, the bomb is planted at 100, CT 6 and T 2 trade at 150
+    # (CT 6's second death at 160 is ignored) and the bomb is defused at 300.
+    # Round 2: CT 7 dies at 1100, the bomb is planted at 1200 and explodes at 1600.
+    assert timeline.select(
+        ["round_num", "tick", "ct_alive", "t_alive", "man_advantage", "bomb_planted", "bomb_defused",
+         "bomb_exploded", "clock_tick", "clock_seconds"]
+    ).rows() == [
+        (1, 0, 2, 3, -1, False, False, False, 0, 115.0),
+        (1, 50, 2, 2, 0, False, False, False, 0, 115.0),
+        (1, 100, 2, 2, 0, True, False, False, 100, 40.0),
+        (1, 150, 1, 1, 0, True, False, False, 100, 40.0),
+        (1, 300, 1, 1, 0, True, True, False, 100, 40.0),
+        (2, 1000, 2, 3, -1, False, False, False, 1000, 115.0),
+        (2, 1100, 1, 3, -2, False, False, False, 1000, 115.0),
+        (2, 1200, 1, 3, -2, True, False, False, 1200, 40.0),
+        (2, 1600, 1, 3, -2, True, False, True, 1200, 40.0),
+    ]
+
+def test_state_at_and_index_agree():
+    frames = MatchFrames.from_demo(make_demo())
+    timeline = build_game_state(frames).collect()
+    queries = pl.DataFrame({
+        "game_id": ["demo"] * 5,
+        "round_num": [1, 1, 2, 2, 3],
+        # Before the first death, mid post-plant, the freeze end of round 2, after the
+        # explosion, and a round without a timeline
+        "tick": [20, 200, 1000, 1700, 2000],
+    })
+
+    expected = [
+        (1, 20, 2, 3, False, 113.0),
+        (1, 200, 1, 1, True, 30.0),
+        (2, 1000, 2, 3, False, 115.0),
+        (2, 1700, 1, 3, True, 0.0),
+        (3, 2000, None, None, None, None),
+    ]
+    columns = ["round_num", "tick", "ct_alive", "t_alive", "bomb_planted", "time_left"]
+
+    joined = state_at(timeline.lazy(), queries.lazy()).collect().sort(["round_num", "tick"])
+    assert joined.select(columns).rows() == expected
+
+    index = GameStateIndex.from_timeline(timeline)
+    assert index.lookup(queries).select(columns).rows() == expected
+
+    assert index.at("demo", 1, 150)["man_advantage"] == 0
+    assert index.at("demo", 1, 150)["time_left"] == 35.0
+    # Ticks before freeze end have no state
+    assert index.at("demo", 2, 999) is None
+    assert index.at("other", 1, 100) is None
+
+def test_post_plant_win_percentage():
+    frames = MatchFrames.from_demo(make_demo())
+
+    # Both rounds have a plant; the T side wins round 2
+    assert _scalar(summarize(post_plant_win_breakdown(frames, build_game_state(frames)))) == 0.5
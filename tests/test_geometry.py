@@ -0,0 +1,60 @@
+import numpy as np
+import polars as pl
+from src.cs2_analyzer.application.geometry import (
+    distances_to_point, pairwise_distances, mean_pairwise_distance, in_sphere, in_polygon,
+    path_length, velocity, view_vectors, angle_to_targets, distance_expr, view_vector_exprs
+)
+
+
+def test_distances():
+    points = np.array([[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [0.0, 0.0, 2.0]])
+
+    assert np.allclose(distances_to_point(points, [0.0, 0.0, 0.0]), [0.0, 5.0, 2.0])
+    matrix = pairwise_distances(points)
+    assert np.allclose(matrix, matrix.T)
+    assert np.allclose(np.diag(matrix), 0.0)
+    assert np.isclose(matrix[1, 2], np.sqrt(29.0))
+    # Pairs: 5, 2 and sqrt(29)
+    assert np.isclose(mean_pairwise_distance(points), (5.0 + 2.0 + np.sqrt(29.0)) / 3)
+    assert mean_pairwise_distance(points[:1]) == 0.0
+
+
+def test_polars_distance_matches_numpy():
+    points = np.random.default_rng(0).normal(size=(50, 3)) * 100
+    frame = pl.DataFrame({"X": points[:, 0], "Y": points[:, 1], "Z": points[:, 2]})
+
+    assert np.allclose(
+        frame.select(distance_expr(10.0, -5.0, 3.0))["X"].to_numpy(),
+        distances_to_point(points, [10.0, -5.0, 3.0])
+    )
+
+
+def test_in_sphere_and_polygon():
+    points = np.array([[1.0, 1.0, 0.0], [3.0, 1.0, 0.0], [2.0, 2.0, 5.0], [-1.0, 0.5, 0.0]])
+    # L-shaped polygon: the square 0..2 x 0..2 plus 2..4 x 0..1
+    polygon = [(0, 0), (4, 0), (4, 1), (2, 1), (2, 2), (0, 2)]
+
+    assert in_sphere(points, [0.0, 0.0, 0.0], 2.0).tolist() == [True, False, False, True]
+    assert in_polygon(points, polygon).tolist() == [True, False, False, False]
+    assert in_polygon([[3.0, 0.5]], polygon).tolist() == [True]
+
+
+def test_path_length_and_velocity():
+    points = [[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [3.0, 4.0, 0.0], [3.0, 4.0, 10.0]]
+
+    assert path_length(points) == 15.0
+    assert path_length(points[:1]) == 0.0
+    # 64 ticks between the first two samples is one second at 64 tick
+    assert np.allclose(velocity(points, [0, 64, 64, 96]), [[3.0, 4.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 20.0]])
+
+
+def test_view_vectors():
+    vectors = view_vectors([0.0, 90.0, 0.0], [0.0, 0.0, 90.0])
+
+    # Yaw 0 looks along +X, yaw 90 along +Y, pitch 90 straight down
+    assert np.allclose(vectors, [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, -1.0]])
+    frame = pl.DataFrame({"yaw": [0.0, 90.0, 0.0], "pitch": [0.0, 0.0, 90.0]}).select(view_vector_exprs())
+    assert np.allclose(frame.to_numpy(), vectors)
+
+    angles = angle_to_targets(np.zeros((2, 3)), vectors[:2], [[10.0, 10.0, 0.0], [0.0, 5.0, 0.0]])
+    assert np.allclose(angles, [45.0, 0.0])
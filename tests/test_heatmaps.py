@@ -0,0 +1,74 @@
+import tempfile
+import shutil
+from pathlib import Path
+import numpy as np
+import polars as pl
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.heatmaps import HeatmapService, HeatmapSpec, map_grid, render_heatmap
+from src.cs2_analyzer.interface_adapters.parquet_heatmap_store import ParquetHeatmapStore
+
+SPEC = HeatmapSpec(side="ct", window_seconds=10, bins=8)
+
+def make_frames(game_ids=("g1", "g2", "g3")) -> MatchFrames:
+    games = pl.LazyFrame({
+        "game_id": ["g1", "g2", "g3"],
+        "map_name": ["de_test", "de_test", "de_other"],
+        "tickrate": [10, 10, 10],
+    })
+    rounds = pl.LazyFrame({"game_id": ["g1", "g2", "g3"], "round_num": [1, 1, 1], "freeze_end": [0, 0, 0]})
+    ticks = pl.LazyFrame({
+        "game_id": ["g1", "g1", "g1", "g1", "g2", "g3"],
+        "round_num": [1, 1, 1, 1, 1, 1],
+        "tick": [10, 20, 20, 500, 10, 10],
+        "player_steamid": [6, 6, 1, 6, 6, 6],
+        "side": ["ct", "ct", "t", "ct", "ct", "ct"],
+        "X": [-4000.0, -4000.0, -4000.0, -4000.0, 4000.0, 0.0],
+        "Y": [-4000.0, -4000.0, -4000.0, -4000.0, 4000.0, 0.0],
+    })
+    return MatchFrames(games=games, rounds=rounds, ticks=ticks).where(game_ids=game_ids)
+
+def test_heatmap_sums_games_on_a_map():
+    counts = HeatmapService().heatmap(make_frames(), "de_test", SPEC)
+
+    # g1 has two CT samples in the window in the lower-left cell (the T sample and the
+    # tick 500 sample are excluded), g2 one in the upper-right cell; g3 is on another map.
+    expected = np.zeros((8, 8), dtype=np.int64)
+    expected[0, 0] = 2
+    expected[7, 7] = 1
+    assert np.array_equal(counts, expected)
+    assert map_grid("de_test", 8).cells([-4000.0, 4000.0], [-4000.0, 4000.0]).tolist() == [0, 63]
+
+def test_cached_grids_are_summed_without_rescanning():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        store = ParquetHeatmapStore(base_path=temp_dir)
+        first = HeatmapService(store).heatmap(make_frames(), "de_test", SPEC)
+
+        # The stored grids answer even when the tick data is gone
+        frames = make_frames()
+        empty = MatchFrames(games=frames.games, rounds=frames.rounds, ticks=frames.ticks.clear())
+        assert np.array_equal(HeatmapService(ParquetHeatmapStore(base_path=temp_dir)).heatmap(empty, "de_test", SPEC), first)
+        assert store.get(SPEC, ["g1", "g2", "g3"])["game_id"].sort().to_list() == ["g1", "g2"]
+
+        # A different spec is a different grid
+        assert HeatmapService(store).heatmap(empty, "de_test", HeatmapSpec(side="t", window_seconds=10, bins=8)).sum() == 0
+
+        # A game not binned yet is added to the store
+        assert HeatmapService(store).heatmap(make_frames(), "de_other", SPEC).sum() == 1
+        assert store.get(SPEC, ["g1", "g2", "g3"]).height == 3
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+def test_render_heatmap_writes_image():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        output = Path(temp_dir) / "heatmap.png"
+        render_heatmap(HeatmapService().heatmap(make_frames(), "de_test", SPEC), "de_test", str(output))
+
+        assert output.stat().st_size > 0
+
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,99 @@
+import pytest
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.live_metrics import LiveMetrics, replay_in_chunks
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.metrics import (
+    calculate_player_spacing,
+    calculate_ct_side_forward_presence_count,
+    calculate_trade_efficiency,
+)
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+    t_spawn: dict
+    ct_spawn: dict
+
+def make_demo() -> MockDemo:
+    # T 1 dies at tick 120 and CT 7 at tick 345; their rows at and after those ticks are dead rows
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2],
+        "tick": [80, 80, 100, 100, 130, 130, 130, 130, 300, 300, 320, 320, 345, 345],
+        "side": ["t", "ct", "t", "t", "ct", "ct", "t", "t", "t", "t", "ct", "ct", "ct", "ct"],
+        "X": [0, 900, 0, 4, 100, 900, 500, 7, 0, 10, 200, 300, 220, 900],
+        "Y": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        "Z": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        "player_steamid": [1, 6, 1, 2, 6, 7, 1, 2, 1, 2, 6, 7, 6, 7]
+    })
+
+    rounds = pl.DataFrame({
+        "round_num": [1, 2],
+        "freeze_end": [90, 290]
+    })
+
+    events = {
+        "player_death": pl.DataFrame({
+            "tick": [120, 140, 200, 320, 345],
+            "user_steamid": [1, 6, 2, 1, 7],
+            "attacker_steamid": [6, 2, 7, 7, 2],
+            "user_side": ["t", "ct", "t", "t", "ct"],
+            "attacker_side": ["ct", "t", "ct", "ct", "t"]
+        }),
+        "bomb_planted": pl.DataFrame({
+            "tick": [250],
+            "user_steamid": [2],
+            "site": [394]
+        })
+    }
+
+    return MockDemo(ticks=ticks, rounds=rounds, events=events, tickrate=10,
+                    t_spawn={"x": 0, "y": 0, "z": 0}, ct_spawn={"x": 1000, "y": 0, "z": 0})
+
+def run_live(demo, chunk_seconds):
+    live = LiveMetrics(tickrate=demo.tickrate, t_spawn=demo.t_spawn, ct_spawn=demo.ct_spawn)
+    for chunk in replay_in_chunks(demo, chunk_seconds=chunk_seconds):
+        live.update(chunk)
+    return live
+
+@pytest.mark.parametrize("chunk_seconds", [0.5, 2, 100])
+def test_live_metrics_match_batch_after_full_replay(chunk_seconds):
+    demo = make_demo()
+
+    values = run_live(demo, chunk_seconds).snapshot()
+
+    assert values["t_side_player_spacing"] == pytest.approx(calculate_player_spacing(demo, "t"))
+    assert values["ct_side_player_spacing"] == pytest.approx(calculate_player_spacing(demo, "ct"))
+    assert values["ct_side_forward_presence_count"] == pytest.approx(calculate_ct_side_forward_presence_count(demo))
+    assert values["trade_efficiency"] == pytest.approx(calculate_trade_efficiency(demo))
+
+def test_live_pacing():
+    values = run_live(make_demo(), chunk_seconds=1).snapshot()
+
+    # Round 1: deaths at 3s, 5s and 11s after freeze end (tick 90), plant at 16s.
+    # Round 2: deaths at 3s and 5.5s after freeze end (tick 290), no plant.
+    assert values["ttfk"] == pytest.approx(3.0)
+    assert values["time_to_plant"] == pytest.approx(16.0)
+    # Death times are averaged over all deaths, as in the batch metric
+    assert values["average_death_timestamp"] == pytest.approx((3 + 5 + 11 + 3 + 5.5) / 5)
+    batch = BatchMetricEvaluator().evaluate(make_demo(), ["average_death_time"])
+    assert values["average_death_timestamp"] == pytest.approx(batch["value"][0])
+
+def test_trade_window_stays_open_across_chunks():
+    demo = make_demo()
+    live = LiveMetrics(tickrate=demo.tickrate, t_spawn=demo.t_spawn, ct_spawn=demo.ct_spawn)
+    chunks = iter(replay_in_chunks(demo, chunk_seconds=3))
+
+    # The first chunks end right after the T death at tick 120; its trade at tick 140 is still to come.
+    while live.last_tick is None or live.last_tick < 120:
+        live.update(next(chunks))
+    assert live.snapshot()["trade_efficiency"] == 0.0
+
+    for chunk in chunks:
+        live.update(chunk)
+
+    # Deaths at 120 and 320 are traded at 140 and 345, the death at 200 is not.
+    assert live.snapshot()["trade_efficiency"] == pytest.approx(2 / 3)
@@ -0,0 +1,106 @@
+import pytest
+import shutil
+import tempfile
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.metrics import calculate_player_spacing, calculate_trade_efficiency
+from src.cs2_analyzer.interface_adapters.parquet_metric_store import ParquetMetricStore
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_demo() -> MockDemo:
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 2, 2],
+        "tick": [100, 100, 110, 110, 300, 300],
+        "side": ["t", "t", "t", "t", "t", "t"],
+        "X": [0, 4, 0, 6, 0, 10],
+        "Y": [0, 0, 0, 0, 0, 0],
+        "Z": [0, 0, 0, 0, 0, 0],
+        "player_steamid": [1, 2, 1, 2, 1, 2]
+    })
+
+    rounds = pl.DataFrame({
+        "round_num": [1, 2],
+        "freeze_end": [90, 290]
+    })
+
+    player_death = pl.DataFrame({
+        "tick": [120, 130, 200, 320, 340],
+        "user_steamid": [1, 6, 2, 1, 7],
+        "attacker_steamid": [6, 2, 7, 7, 2],
+        "user_side": ["t", "ct", "t", "t", "ct"],
+        "attacker_side": ["ct", "t", "ct", "ct", "t"]
+    })
+
+    return MockDemo(ticks=ticks, rounds=rounds, events={"player_death": player_death}, tickrate=10)
+
+def test_breakdown_by_round():
+    demo = make_demo()
+
+    breakdown = BatchMetricEvaluator().breakdown(demo, metric_names=["t_side_player_spacing", "trade_efficiency"])
+
+    # Spacing: round 1 averages its two ticks (4 and 6), round 2 has one tick (10).
+    # Trades: in round 1 player 1's death is traded at tick 130, player 2's is not.
+    #         In round 2 player 1's death is traded at tick 340.
+    assert breakdown.rows() == [
+        ("t_side_player_spacing", 1, 5.0, 2),
+        ("t_side_player_spacing", 2, 10.0, 1),
+        ("trade_efficiency", 1, 0.5, 2),
+        ("trade_efficiency", 2, 1.0, 1),
+    ]
+
+def test_breakdown_by_player():
+    demo = make_demo()
+
+    breakdown = BatchMetricEvaluator().breakdown(demo, metric_names=["t_side_player_spacing", "trade_efficiency"],
+                                                 by=["round_num", "player_steamid"])
+
+    # Spacing is a per-tick team metric, so it has no player breakdown.
+    assert breakdown.filter(pl.col("metric") == "trade_efficiency").select(
+        ["round_num", "player_steamid", "value"]
+    ).rows() == [(1, 1, 1.0), (1, 2, 0.0), (2, 1, 1.0)]
+    assert breakdown.filter(pl.col("metric") == "t_side_player_spacing")["player_steamid"].null_count() == 2
+
+def test_scalar_is_weighted_mean_of_breakdown():
+    demo = make_demo()
+    evaluator = BatchMetricEvaluator()
+    names = ["t_side_player_spacing", "trade_efficiency"]
+
+    breakdown = evaluator.breakdown(demo, metric_names=names)
+    derived = breakdown.group_by("metric").agg(
+        ((pl.col("value") * pl.col("weight")).sum() / pl.col("weight").sum()).alias("value")
+    )
+    values = dict(derived.iter_rows())
+
+    assert values["t_side_player_spacing"] == pytest.approx(calculate_player_spacing(demo, "t"))
+    assert values["trade_efficiency"] == pytest.approx(calculate_trade_efficiency(demo))
+    assert dict(evaluator.evaluate(demo, metric_names=names).iter_rows()) == pytest.approx(values)
+
+def test_evaluate_with_breakdown_is_one_cached_pass():
+    demo = make_demo()
+    names = ["t_side_player_spacing", "trade_efficiency"]
+    by = ["round_num", "player_steamid"]
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        evaluator = BatchMetricEvaluator(cache=ParquetMetricStore(base_path=temp_dir))
+        values, breakdown = evaluator.evaluate_with_breakdown(demo, names, game_hash="abc", by=by)
+
+        assert values.equals(BatchMetricEvaluator().evaluate(demo, names))
+        assert breakdown.equals(BatchMetricEvaluator().breakdown(demo, names, by=by))
+
+        # Both come back from the cache without the demo
+        reopened = BatchMetricEvaluator(cache=ParquetMetricStore(base_path=temp_dir))
+        assert set(reopened.cached_breakdowns("abc", by, names)) == set(names)
+        cached_values, cached_breakdown = reopened.evaluate_with_breakdown(None, names, game_hash="abc", by=by)
+        assert cached_values.equals(values)
+        assert cached_breakdown.equals(breakdown)
+
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,157 @@
+import tempfile
+import shutil
+from pathlib import Path
+from src.cs2_analyzer.application.metric_cache import metric_key, content_hash, cached
+from src.cs2_analyzer.application.metric_registry import MetricRegistry, BatchMetricEvaluator
+from src.cs2_analyzer.interface_adapters.parquet_metric_store import ParquetMetricStore
+
+
+def make_registry(calls: list, version: int = 1) -> MetricRegistry:
+    registry = MetricRegistry()
+
+    @registry.metric("scaled", inputs=["demo"], version=version, factor=2)
+    def scaled(inputs, factor):
+        calls.append(factor)
+        return inputs["demo"] * factor
+
+    return registry
+
+
+def test_metric_key_ignores_param_order():
+    assert metric_key("abc", "m", 1, {"a": 1, "b": 2}) == metric_key("abc", "m", 1, {"b": 2, "a": 1})
+    assert metric_key("abc", "m", 1, {"a": 1}) != metric_key("abc", "m", 2, {"a": 1})
+
+
+def test_content_hash_depends_on_content_only():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        first, second, third = (Path(temp_dir) / name for name in ("a.dem", "b.dem", "c.dem"))
+        first.write_bytes(b"demo bytes")
+        second.write_bytes(b"demo bytes")
+        third.write_bytes(b"other bytes")
+
+        assert content_hash(str(first)) == content_hash(str(second))
+        assert content_hash(str(first)) != content_hash(str(third))
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_store_persists_results():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        key = metric_key("abc", "win_rates")
+        ParquetMetricStore(base_path=temp_dir).put_many({key: {"t_rounds": 9, "t_win_rate": 0.6}})
+
+        reopened = ParquetMetricStore(base_path=temp_dir)
+
+        assert reopened.get_many([key, metric_key("abc", "missing")]) == {key: {"t_rounds": 9, "t_win_rate": 0.6}}
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_store_evicts_least_recently_used():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        store = ParquetMetricStore(base_path=temp_dir, max_entries=2)
+        first, second, third = (metric_key("abc", name) for name in ("first", "second", "third"))
+
+        store.put_many({first: 1.0})
+        store.put_many({second: 2.0})
+        # Reading the first result makes the second one the least recently used.
+        store.get_many([first])
+        store.put_many({third: 3.0})
+
+        assert len(store) == 2
+        assert ParquetMetricStore(base_path=temp_dir).get_many([first, second, third]) == {first: 1.0, third: 3.0}
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_store_lookups_do_not_rewrite_the_table():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        store = ParquetMetricStore(base_path=temp_dir, max_entries=2)
+        first, second, third = (metric_key("abc", name) for name in ("first", "second", "third"))
+        store.put_many({first: 1.0})
+        store.put_many({second: 2.0})
+        table_path = Path(temp_dir) / f"{ParquetMetricStore.TABLE_NAME}.parquet"
+        written = table_path.stat().st_mtime_ns
+
+        store.get_many([first])
+        assert table_path.stat().st_mtime_ns == written
+
+        # Closing persists the access time, so the first result outlives the second
+        store.close()
+        reopened = ParquetMetricStore(base_path=temp_dir, max_entries=2)
+        reopened.put_many({third: 3.0})
+        assert reopened.get_many([first, second, third]) == {first: 1.0, third: 3.0}
+        assert [path.name for path in Path(temp_dir).iterdir()] == [table_path.name]
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_cached_computes_only_on_miss():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        store = ParquetMetricStore(base_path=temp_dir)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 4.5
+
+        key = metric_key("abc", "report.ttfk")
+
+        assert cached(store, key, compute) == 4.5
+        assert cached(store, key, compute) == 4.5
+        assert len(calls) == 1
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_evaluator_reuses_cached_results():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        calls = []
+        evaluator = BatchMetricEvaluator(registry=make_registry(calls), cache=ParquetMetricStore(base_path=temp_dir))
+
+        assert evaluator.evaluate(3, game_hash="abc").rows() == [("scaled", 6.0)]
+        # Cache hit: the value comes back without a demo and without computing.
+        assert evaluator.evaluate(None, game_hash="abc").rows() == [("scaled", 6.0)]
+        assert calls == [2]
+
+        # Different parameters are a different result.
+        assert evaluator.evaluate(3, params={"scaled": {"factor": 3}}, game_hash="abc").rows() == [("scaled", 9.0)]
+        assert calls == [2, 3]
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_evaluator_recomputes_after_version_bump():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        calls = []
+        store = ParquetMetricStore(base_path=temp_dir)
+        BatchMetricEvaluator(registry=make_registry(calls, version=1), cache=store).evaluate(3, game_hash="abc")
+
+        evaluator = BatchMetricEvaluator(registry=make_registry(calls, version=2), cache=store)
+
+        assert evaluator.cached_values("abc") == {}
+        assert evaluator.evaluate(3, game_hash="abc").rows() == [("scaled", 6.0)]
+        assert calls == [2, 2]
+
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,162 @@
+import pytest
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.metric_registry import MetricRegistry, BatchMetricEvaluator, default_registry
+from src.cs2_analyzer.application.metrics import (
+    calculate_t_side_avg_dist_to_bombsite,
+    calculate_ct_side_forward_presence_count,
+    calculate_player_spacing,
+    calculate_rotation_timing,
+    calculate_entry_success_rate,
+    calculate_trade_efficiency,
+)
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+    t_spawn: dict
+    ct_spawn: dict
+    bombsite_locations: dict
+
+def make_demo() -> MockDemo:
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 1, 1, 1, 1],
+        "tick": [100, 100, 110, 110, 120, 120, 130, 130],
+        "side": ["t", "ct", "t", "ct", "t", "ct", "t", "ct"],
+        "X": [0, 900, 50, 800, 100, 300, 150, 100],
+        "Y": [0, 0, 0, 0, 0, 0, 0, 0],
+        "Z": [0, 0, 0, 0, 0, 0, 0, 0],
+        "player_steamid": [1, 6, 1, 6, 1, 6, 1, 6]
+    })
+
+    rounds = pl.DataFrame({
+        "round_num": [1],
+        "freeze_end": [90],
+        "winner_side": ["t"]
+    })
+
+    events = {
+        "player_death": pl.DataFrame({
+            "tick": [125, 128],
+            "user_steamid": [7, 8],
+            "attacker_steamid": [6, 1],
+            "user_side": ["t", "ct"],
+            "attacker_side": ["ct", "t"]
+        }),
+        "smokegrenade_detonate": pl.DataFrame({
+            "tick": [90, 92, 95],
+            "user_steamid": [1, 1, 1],
+            "user_side": ["t", "t", "t"],
+            "x": [100, 100, 100],
+            "y": [0, 0, 0],
+            "z": [0, 0, 0]
+        }),
+        "bomb_planted": pl.DataFrame({
+            "round_num": [1],
+            "site": [394],
+            "user_X": [100],
+            "user_Y": [0],
+            "user_Z": [0]
+        })
+    }
+
+    return MockDemo(
+        ticks=ticks,
+        rounds=rounds,
+        events=events,
+        tickrate=10,
+        t_spawn={"x": 1000, "y": 0, "z": 0},
+        ct_spawn={"x": 0, "y": 0, "z": 0},
+        bombsite_locations={"A": {"x": 100, "y": 0, "z": 0, "radius": 10}}
+    )
+
+def test_evaluate_matches_individual_metrics():
+    demo = make_demo()
+
+    results = BatchMetricEvaluator(max_workers=4).evaluate(demo)
+    values = dict(results.iter_rows())
+
+    assert results.columns == ["metric", "value"]
+    assert set(values) == set(default_registry().names())
+    assert values["t_side_avg_dist_to_bombsite"] == calculate_t_side_avg_dist_to_bombsite(demo)
+    assert values["ct_side_forward_presence_count"] == calculate_ct_side_forward_presence_count(demo)
+    assert values["t_side_player_spacing"] == calculate_player_spacing(demo, "t")
+    assert values["rotation_timing"] == calculate_rotation_timing(demo)
+    assert values["entry_success_rate"] == calculate_entry_success_rate(demo)
+    assert values["trade_efficiency"] == calculate_trade_efficiency(demo)
+    assert values["round_win_percentage"] == 1.0
+
+def test_evaluate_with_params():
+    demo = make_demo()
+    evaluator = BatchMetricEvaluator()
+
+    # The T player reaches site A at tick 120, 3 seconds after the execute starts.
+    results = evaluator.evaluate(
+        demo,
+        metric_names=["entry_success_rate"],
+        params={"entry_success_rate": {"entry_time_window": 2}}
+    )
+    assert results["value"].to_list() == [0.0]
+    assert evaluator.evaluate(demo, metric_names=["entry_success_rate"])["value"].to_list() == [1.0]
+
+def test_evaluate_no_data():
+    results = BatchMetricEvaluator().evaluate(None, metric_names=["rotation_timing"])
+    assert results.rows() == [("rotation_timing", 0.0)]
+
+def test_shared_inputs_are_built_once():
+    builds = []
+    registry = MetricRegistry()
+    registry.add_input("base", lambda demo, inputs: builds.append("base") or demo * 2)
+    registry.add_input("derived", lambda demo, inputs: builds.append("derived") or inputs["base"] + 1,
+                       requires=["base"])
+
+    @registry.metric("first", inputs=["base", "derived"])
+    def first(inputs):
+        return inputs["derived"]
+
+    @registry.metric("second", inputs=["derived"], offset=10)
+    def second(inputs, offset):
+        return inputs["derived"] + offset
+
+    results = BatchMetricEvaluator(registry).evaluate(3)
+
+    assert builds == ["base", "derived"]
+    assert results.rows() == [("first", 7.0), ("second", 17.0)]
+
+def test_parametrized_inputs_are_built_once_per_value():
+    builds = []
+    registry = MetricRegistry()
+    registry.add_input("scaled", lambda demo, inputs, factor: builds.append(factor) or demo * factor, factor=2)
+    registry.add_input("shifted", lambda demo, inputs: inputs["scaled"] + 1, requires=["scaled"])
+
+    @registry.metric("plain", inputs=["scaled"])
+    def plain(inputs):
+        return inputs["scaled"]
+
+    @registry.metric("default", inputs=["shifted"], factor=2)
+    def default(inputs, factor):
+        return inputs["shifted"]
+
+    @registry.metric("tuned", inputs=["shifted"], factor=3)
+    def tuned(inputs, factor):
+        return inputs["shifted"]
+
+    # plain and default share the input built with the default factor
+    results = BatchMetricEvaluator(registry).evaluate(3)
+    assert builds == [2, 3]
+    assert results.rows() == [("plain", 6.0), ("default", 7.0), ("tuned", 10.0)]
+
+    builds.clear()
+    results = BatchMetricEvaluator(registry).evaluate(3, params={"default": {"factor": 3}})
+    assert builds == [2, 3]
+    assert results.rows() == [("plain", 6.0), ("default", 10.0), ("tuned", 10.0)]
+
+def test_unknown_metric_and_input():
+    registry = MetricRegistry()
+    with pytest.raises(ValueError):
+        registry.metric("broken", inputs=["missing"])(lambda inputs: 0.0)
+    with pytest.raises(KeyError):
+        registry.get("missing")
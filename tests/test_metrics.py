@@ -1,4 +1,9 @@
-from src.cs2_analyzer.application.metrics import calculate_ttfk, calculate_time_to_bomb_plant, calculate_average_death_timestamp
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.metrics import (
+    calculate_ttfk, calculate_time_to_bomb_plant, calculate_average_death_timestamp, calculate_pacing_by_round
+)
 
 def test_calculate_ttfk():
     events = [
@@ -23,3 +28,35 @@ def test_calculate_average_death_timestamp():
         {"event_name": "player_death", "timestamp": 20.0},
     ]
     assert calculate_average_death_timestamp(events) == (10.5 + 15.2 + 20.0) / 3
+
+@dataclass
+class MockDemo:
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def test_pacing_by_round():
+    demo = MockDemo(
+        rounds=pl.DataFrame({"round_num": [1, 2, 3], "freeze_end": [100, 1000, 2000]}),
+        events={
+            "player_death": pl.DataFrame({"tick": [150, 130, 1300, 1100]}),
+            "bomb_planted": pl.DataFrame({"tick": [1200]}),
+        },
+        tickrate=10
+    )
+
+    # Round 1: kills 3 and 5 s after freeze end, no plant. Round 2: kills at 10 and 30 s,
+    # plant at 20 s. Round 3: nothing happens.
+    assert calculate_pacing_by_round(demo).rows() == [
+        (1, 2, 3.0, None, 4.0),
+        (2, 2, 10.0, 20.0, 20.0),
+        (3, 0, None, None, None),
+    ]
+
+    values = dict(BatchMetricEvaluator().evaluate(
+        demo, ["time_to_first_kill", "time_to_bomb_plant", "average_death_time"]
+    ).rows())
+    # Rounds without a kill or plant are left out; the average death time weighs every death
+    assert values["time_to_first_kill"] == 6.5
+    assert values["time_to_bomb_plant"] == 20.0
+    assert values["average_death_time"] == 12.0
@@ -0,0 +1,65 @@
+import tempfile
+import shutil
+from pathlib import Path
+import numpy as np
+import polars as pl
+from awpy.nav import Nav, NavArea
+from awpy.vector import Vector3
+from src.cs2_analyzer.application.navigation import build_nav_distances, nav_distances
+
+
+def square(area_id: int, x: float, y: float, connections: list, z: float = 0.0) -> NavArea:
+    corners = [Vector3(x, y, z), Vector3(x + 100, y, z), Vector3(x + 100, y + 100, z), Vector3(x, y + 100, z)]
+    return NavArea(area_id=area_id, corners=corners, connections=connections)
+
+
+def make_nav() -> Nav:
+    # A U-shaped corridor: 1 -> 2 -> 3 -> 4 -> 5 around a wall between areas 1 and 5.
+    # Area 6 can be dropped into from 5 but not climbed out of.
+    return Nav(areas={
+        1: square(1, 0, 0, [2]),
+        2: square(2, 0, 100, [1, 3]),
+        3: square(3, 100, 100, [2, 4]),
+        4: square(4, 200, 100, [3, 5]),
+        5: square(5, 200, 0, [4, 6]),
+        6: square(6, 300, 0, [], z=-200),
+    })
+
+
+def test_path_distance_goes_around_walls():
+    tables = build_nav_distances(make_nav())
+
+    # Centroids (50, 50) and (250, 50): 200 apart, but the path runs through 2, 3 and 4
+    assert np.isclose(tables.path_distance([[50.0, 50.0, 0.0]], [250.0, 50.0, 0.0])[0], 400.0)
+    # Same area: straight line
+    assert np.isclose(tables.path_distance([[10.0, 10.0, 0.0]], [[40.0, 50.0, 0.0]])[0], 50.0)
+    # One-way drop
+    assert np.isfinite(tables.path_distance([[250.0, 50.0, 0.0]], [350.0, 50.0, -200.0])[0])
+    assert np.isinf(tables.path_distance([[350.0, 50.0, -200.0]], [250.0, 50.0, 0.0])[0])
+
+
+def test_area_lookup_respects_height():
+    tables = build_nav_distances(make_nav())
+
+    areas = tables.area_of([[50.0, 50.0, 0.0], [150.0, 150.0, 40.0], [350.0, 50.0, -190.0]])
+
+    assert tables.area_ids[areas].tolist() == [1, 3, 6]
+
+
+def test_tables_are_saved_and_cached_per_map():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        build_nav_distances(make_nav()).save(Path(temp_dir) / "de_test.npz")
+
+        tables = nav_distances("de_test", temp_dir)
+        assert tables is nav_distances("de_test", temp_dir)
+        assert nav_distances("de_missing", temp_dir) is None
+
+        ticks = pl.LazyFrame({"X": [50.0, 250.0], "Y": [50.0, 50.0], "Z": [0.0, 0.0]})
+        distances = ticks.select(tables.distance_expr(250.0, 50.0, 0.0).alias("distance")).collect()
+        assert distances["distance"].to_list() == [400.0, 0.0]
+
+    finally:
+        nav_distances.cache_clear()
+        shutil.rmtree(temp_dir)
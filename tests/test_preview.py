@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.preview import PreviewEvaluator, SAMPLEABLE_METRICS, preview_metrics, sample_ticks
+
+METRICS = ["t_side_player_spacing", "ct_side_forward_presence_count"]
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+    t_spawn: dict
+    ct_spawn: dict
+
+def make_demo() -> MockDemo:
+    # Four rounds of 20 ticks with two Ts and one CT; the Ts drift apart and the CT
+    # pushes further forward every round
+    rows = []
+    for round_num in range(1, 5):
+        for step in range(20):
+            tick = round_num * 1000 + step * 10
+            rows.append({"round_num": round_num, "tick": tick, "player_steamid": 1, "side": "t",
+                         "X": 0.0, "Y": 0.0, "Z": 0.0})
+            rows.append({"round_num": round_num, "tick": tick, "player_steamid": 2, "side": "t",
+                         "X": float(step * round_num), "Y": 0.0, "Z": 0.0})
+            rows.append({"round_num": round_num, "tick": tick, "player_steamid": 6, "side": "ct",
+                         "X": 1000.0 - step * 40 * round_num / 4, "Y": 0.0, "Z": 0.0})
+    return MockDemo(
+        ticks=pl.DataFrame(rows),
+        rounds=pl.DataFrame({"round_num": [1, 2, 3, 4], "freeze_end": [1000, 2000, 3000, 4000]}),
+        events={},
+        tickrate=10,
+        t_spawn={"x": 0, "y": 0, "z": 0},
+        ct_spawn={"x": 1000, "y": 0, "z": 0}
+    )
+
+def test_sample_ticks_is_stratified_by_round():
+    ticks = make_demo().ticks.lazy().with_columns(pl.lit("g1").alias("game_id"))
+
+    sampled = sample_ticks(ticks, fraction=0.25, seed=1).collect()
+
+    # 5 of each round's 20 ticks, with all three players at every drawn tick
+    assert sampled.group_by("round_num").agg(pl.col("tick").n_unique())["tick"].to_list() == [5] * 4
+    assert sampled.group_by("tick").len()["len"].unique().to_list() == [3]
+
+def test_full_sample_matches_exact_values():
+    demo = make_demo()
+
+    exact = dict(BatchMetricEvaluator().evaluate(demo, METRICS).rows())
+    preview = PreviewEvaluator(fraction=1.0).evaluate(demo, METRICS)
+
+    for row in preview.iter_rows(named=True):
+        assert row["value"] == pytest.approx(exact[row["metric"]])
+        assert row["ci_low"] <= row["value"] <= row["ci_high"]
+        assert row["rounds"] == 4
+
+def test_preview_interval_covers_exact_value():
+    demo = make_demo()
+
+    exact = dict(BatchMetricEvaluator().evaluate(demo, ["t_side_player_spacing"]).rows())
+    preview = PreviewEvaluator(fraction=0.3, confidence=0.99).evaluate(demo, ["t_side_player_spacing"])
+
+    # Spacing differs between rounds far more than within one, so the interval over rounds is wide
+    assert preview["ci_low"][0] < preview["ci_high"][0]
+    assert preview["ci_low"][0] <= exact["t_side_player_spacing"] <= preview["ci_high"][0]
+
+def make_match(rounds: int = 8, ticks_per_round: int = 300, seed: int = 0) -> MockDemo:
+    # Two Ts and two CTs random-walk through each round's 30 second window, the CTs
+    # looking roughly at bombsite A at (1000, 0, 0)
+    rng = np.random.default_rng(seed)
+    players = {1: ("t", 0.0), 2: ("t", 100.0), 6: ("ct", 500.0), 7: ("ct", 1100.0)}
+    columns = {name: [] for name in ("round_num", "tick", "player_steamid", "side", "X", "Y", "Z", "yaw", "pitch")}
+    for round_num in range(1, rounds + 1):
+        for player, (side, start) in players.items():
+            steps = rng.normal(0.0, 15.0, size=(ticks_per_round, 2)).cumsum(axis=0)
+            x = start + steps[:, 0]
+            y = (-600.0 if player == 7 else 0.0) + steps[:, 1]
+            columns["round_num"] += [round_num] * ticks_per_round
+            columns["tick"] += list(round_num * 1000 + np.arange(ticks_per_round))
+            columns["player_steamid"] += [player] * ticks_per_round
+            columns["side"] += [side] * ticks_per_round
+            columns["X"] += list(x)
+            columns["Y"] += list(y)
+            columns["Z"] += [0.0] * ticks_per_round
+            columns["yaw"] += list(np.degrees(np.arctan2(-y, 1000.0 - x)) + rng.normal(0.0, 10.0, ticks_per_round))
+            columns["pitch"] += [0.0] * ticks_per_round
+    plants = pl.DataFrame({"tick": [1500], "site": [394], "user_steamid": [1],
+                           "user_X": [1000.0], "user_Y": [0.0], "user_Z": [0.0]})
+    return MockDemo(
+        ticks=pl.DataFrame(columns),
+        rounds=pl.DataFrame({"round_num": list(range(1, rounds + 1)),
+                             "freeze_end": [round_num * 1000 for round_num in range(1, rounds + 1)]}),
+        events={"bomb_planted": plants},
+        tickrate=10,
+        t_spawn={"x": 0, "y": 0, "z": 0},
+        ct_spawn={"x": 1000, "y": 0, "z": 0}
+    )
+
+def test_preview_estimates_every_sampleable_metric():
+    demo = make_match()
+    names = preview_metrics(BatchMetricEvaluator().registry)
+
+    exact = dict(BatchMetricEvaluator().evaluate(demo, names).rows())
+    preview = PreviewEvaluator(fraction=0.2).evaluate(demo)
+
+    assert sorted(names) == sorted(SAMPLEABLE_METRICS)
+    assert sorted(preview["metric"].to_list()) == sorted(names)
+    for row in preview.iter_rows(named=True):
+        assert exact[row["metric"]] != 0.0
+        assert row["value"] == pytest.approx(exact[row["metric"]], rel=0.05), row["metric"]
+
+def test_exact_only_metrics_are_not_previewed():
+    names = preview_metrics(BatchMetricEvaluator().registry)
+    assert "rotation_timing" not in names
+    assert "entry_success_rate" not in names
+
+    with pytest.raises(ValueError):
+        PreviewEvaluator(fraction=0.2).evaluate(make_demo(), ["rotation_timing"])
+
+def test_invalid_fraction():
+    with pytest.raises(ValueError):
+        PreviewEvaluator(fraction=0)
@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import polars as pl
+from src.cs2_analyzer.application.frames import MatchFrames
+from src.cs2_analyzer.application.retakes import (
+    FEATURE_SCHEMA, calculate_retake_features, write_retake_features
+)
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_retake_demo() -> MockDemo:
+    sides = {6: "ct", 7: "ct", 1: "t", 2: "t"}
+    ticks = pl.DataFrame([
+        {"round_num": round_num, "tick": tick, "player_steamid": player, "side": side, "X": 0.0, "Y": 0.0, "Z": 0.0}
+        for round_num, ticks in ((1, range(0, 450, 50)), (2, range(1000, 1450, 50)))
+        for tick in ticks for player, side in sides.items()
+    ])
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2], "freeze_end": [0, 1000], "winner_side": ["ct", "t"]}),
+        events={
+            "bomb_planted": pl.DataFrame({"tick": [100], "user_steamid": [1], "site": ["A"]}),
+            "bomb_defused": pl.DataFrame({"tick": [300]}),
+            "player_death": pl.DataFrame({
+                "tick": [150, 200],
+                "user_steamid": [6, 1],
+                "attacker_steamid": [1, 7],
+                "user_side": ["ct", "t"],
+                "attacker_side": ["t", "ct"],
+            }),
+            "item_pickup": pl.DataFrame({
+                "tick": [10, 10, 10, 10],
+                "user_steamid": [7, 7, 6, 1],
+                "item": ["smokegrenade", "flashbang", "hegrenade", "molotov"],
+            }),
+            "weapon_fire": pl.DataFrame({
+                "tick": [120, 250],
+                "user_steamid": [7, 7],
+                "weapon": ["weapon_m4a1", "weapon_smokegrenade"],
+            }),
+        },
+        tickrate=10
+    )
+
+def test_retake_features():
+    features = calculate_retake_features(make_retake_demo())
+
+    # Snapshots run from the plant (tick 100) to the defuse (tick 300); round 2 has no
+    # plant. CT 6 dies at 150 and takes the HE with them, T 1 dies at 200, and CT 7
+    # throws the smoke at 250, leaving the flashbang.
+    assert features.select(
+        ["tick", "ct_alive", "t_alive", "player_advantage", "time_remaining", "total_ct_utility_value", "ct_win"]
+    ).rows() == [
+        (100, 2, 2, 0, 40.0, 800, True),
+        (150, 1, 2, -1, 35.0, 500, True),
+        (200, 1, 1, 0, 30.0, 500, True),
+        (250, 1, 1, 0, 25.0, 200, True),
+        (300, 1, 1, 0, 20.0, 200, True),
+    ]
+
+def test_write_retake_features():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = Path(temp_dir) / "retakes.parquet"
+        frames = MatchFrames.from_demo(make_retake_demo())
+
+        rows = write_retake_features(frames, path, batch_size=1)
+
+        written = pl.read_parquet(path)
+        assert rows == 5
+        assert written.schema == pl.Schema(FEATURE_SCHEMA)
+        assert written["total_ct_utility_value"].to_list() == [800, 500, 500, 200, 200]
+    finally:
+        shutil.rmtree(temp_dir)
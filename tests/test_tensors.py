@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+import numpy as np
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.tensors import (
+    NO_PLAYER, RoundTensor, calculate_round_tensor, centroids, distances_to, spacing
+)
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_demo() -> MockDemo:
+    # Round 1: T 1 walks from X=0 to X=100 in the first 2 s; T 2 holds (0, 300) and dies
+    # at tick 130; CT 6 holds X=1000. Round 2 only has T 1, for one second.
+    ticks = pl.DataFrame({
+        "round_num": [1, 1, 1, 1, 1, 1, 1, 2, 2],
+        "tick": [100, 120, 140, 100, 140, 100, 140, 1000, 1010],
+        "player_steamid": [1, 1, 1, 2, 2, 6, 6, 1, 1],
+        "side": ["t", "t", "t", "t", "t", "ct", "ct", "t", "t"],
+        "X": [0.0, 100.0, 100.0, 0.0, 0.0, 1000.0, 1000.0, 0.0, 0.0],
+        "Y": [0.0, 0.0, 0.0, 300.0, 300.0, 0.0, 0.0, 0.0, 0.0],
+        "Z": [0.0] * 9,
+    })
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1, 2], "freeze_end": [100, 1000]}),
+        events={"player_death": pl.DataFrame({"tick": [130], "user_steamid": [2]})},
+        tickrate=10
+    )
+
+def test_build_round_tensor():
+    tensor = calculate_round_tensor(make_demo(), time_step=1.0, duration=4.0)
+
+    assert tensor.positions.shape == (2, 5, 10, 3)
+    assert tensor.times.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert tensor.round_nums.tolist() == [1, 2]
+    # Ts take the first slots, then CTs
+    assert tensor.player_ids[0, :4].tolist() == [1, 2, 6, NO_PLAYER]
+    assert tensor.player_ids[1, :2].tolist() == [1, NO_PLAYER]
+
+    # Linear interpolation between samples, held after the last one is reached
+    assert tensor.positions[0, :, 0, 0].tolist() == [0.0, 50.0, 100.0, 100.0, 100.0]
+    # T 2 is alive until their death tick, round 2 has no samples after 1 s
+    assert tensor.alive[0, :, 1].tolist() == [True, True, True, True, False]
+    assert tensor.alive[1, :, 0].tolist() == [True, True, False, False, False]
+    assert np.isnan(tensor.positions[1, 2:, 0]).all()
+
+def test_vectorized_metrics():
+    tensor = calculate_round_tensor(make_demo(), time_step=1.0, duration=4.0)
+
+    t_spacing = spacing(tensor, "t")
+    assert np.allclose(t_spacing[0, :4], [300.0, np.hypot(50, 300), np.hypot(100, 300), np.hypot(100, 300)])
+    # One living T in the last grid point of round 1 and in round 2
+    assert np.isnan(t_spacing[0, 4]) and np.isnan(t_spacing[1]).all()
+
+    assert np.allclose(centroids(tensor, "t")[0, 0], [0.0, 150.0, 0.0])
+    assert np.allclose(distances_to(tensor, (1000.0, 0.0, 0.0))[0, :, 2], 0.0)
+
+def test_save_and_load_memory_mapped():
+    tensor = calculate_round_tensor(make_demo(), time_step=1.0, duration=4.0)
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        tensor.save(temp_dir)
+        loaded = RoundTensor.load(temp_dir)
+
+        assert isinstance(loaded.positions, np.memmap)
+        assert np.array_equal(loaded.positions, tensor.positions, equal_nan=True)
+        assert np.array_equal(loaded.alive, tensor.alive)
+        assert loaded.game_ids.tolist() == tensor.game_ids.tolist()
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,188 @@
+import pytest
+import polars as pl
+from dataclasses import dataclass
+from src.cs2_analyzer.application.metric_registry import BatchMetricEvaluator
+from src.cs2_analyzer.application.utility import calculate_fire_effects, calculate_flash_effects
+
+@dataclass
+class MockDemo:
+    ticks: pl.DataFrame
+    rounds: pl.DataFrame
+    events: dict
+    tickrate: int
+
+def make_flash_demo() -> MockDemo:
+    flashes = pl.DataFrame({
+        "tick": [100, 200, 300],
+        "user_steamid": [1, 2, 6],
+        "user_side": ["t", "t", "ct"],
+    })
+    blinds = pl.DataFrame({
+        "tick": [100, 100, 100, 300],
+        "attacker_steamid": [1, 1, 1, 6],
+        "attacker_side": ["t", "t", "t", "ct"],
+        "user_steamid": [6, 7, 2, 1],
+        "user_side": ["ct", "ct", "t", "t"],
+        "blind_duration": [2.0, 1.5, 3.0, 1.0],
+    })
+    deaths = pl.DataFrame({
+        "tick": [120, 140, 305, 500],
+        "attacker_steamid": [3, 1, 8, 9],
+        "attacker_side": ["t", "t", "ct", "ct"],
+        "user_steamid": [6, 7, 1, 2],
+        "user_side": ["ct", "ct", "t", "t"],
+    })
+    return MockDemo(
+        ticks=pl.DataFrame(schema={"round_num": pl.Int64, "tick": pl.Int64}),
+        rounds=pl.DataFrame({"round_num": [1], "freeze_end": [0]}),
+        events={"flashbang_detonate": flashes, "player_blind": blinds, "player_death": deaths},
+        tickrate=10
+    )
+
+def test_flash_effects():
+    effects = calculate_flash_effects(make_flash_demo())
+
+    # Flash 1 blinds two enemies (the teammate blind does not count) and player 3 kills
+    # player 6 two seconds later; player 1's own kill on 7 is no assist. Flash 2 blinds
+    # nobody. Flash 3 blinds player 1, whom player 8 kills 0.5 s later. Player 2's death
+    # is no assist: only a teammate flashed them.
+    assert effects.select(
+        ["player_steamid", "tick", "enemies_blinded", "enemy_blind_time", "flash_assists"]
+    ).rows() == [
+        (1, 100, 2, 3.5, 1),
+        (2, 200, 0, 0.0, 0),
+        (6, 300, 1, 1.0, 1),
+    ]
+
+def test_flash_assist_window():
+    # With a 1 second window, the kill 2 seconds after flash 1 no longer counts
+    effects = calculate_flash_effects(make_flash_demo(), flash_assist_window=1)
+
+    assert effects["flash_assists"].to_list() == [0, 0, 1]
+
+def test_flash_metrics_in_registry():
+    values = dict(BatchMetricEvaluator().evaluate(
+        make_flash_demo(), ["enemy_blind_time_per_flash", "flash_assists_per_flash"]
+    ).rows())
+
+    assert values["enemy_blind_time_per_flash"] == pytest.approx(1.5)
+    assert values["flash_assists_per_flash"] == pytest.approx(2 / 3)
+
+
+def make_molotov_demo() -> MockDemo:
+    steps = list(range(100, 410, 10))
+    # Player 6 steps out of fire 1 after 2 ticks; player 7 stands in fire 1 and later in fire 2;
+    # the thrower stands in its own fire and does not count
+    positions = {
+        6: [(50.0, 0.0) if tick < 120 else (400.0, 0.0) for tick in steps],
+        7: [(100.0, 0.0) if tick <= 250 else (1000.0, 50.0) for tick in steps],
+        1: [(0.0, 0.0) for _ in steps],
+    }
+    sides = {6: "ct", 7: "ct", 1: "t"}
+    ticks = pl.DataFrame([
+        {"round_num": 1, "tick": tick, "player_steamid": player, "side": sides[player],
+         "X": x, "Y": y, "Z": 0.0}
+        for player, path in positions.items() for tick, (x, y) in zip(steps, path)
+    ])
+    startburns = pl.DataFrame({
+        "tick": [100, 300],
+        "entityid": [50, 51],
+        "user_steamid": [1, 2],
+        "user_side": ["t", "t"],
+        "x": [0.0, 1000.0],
+        "y": [0.0, 0.0],
+        "z": [0.0, 0.0],
+    })
+    # Fire 2 has no expire event and burns for the default duration
+    expires = pl.DataFrame({"tick": [170], "entityid": [50]})
+    hurts = pl.DataFrame({
+        "tick": [105, 110, 112, 115, 250, 310],
+        "attacker_steamid": [1, 1, 1, 1, 1, 2],
+        "attacker_side": ["t"] * 6,
+        "user_steamid": [6, 7, 1, 6, 7, 7],
+        "user_side": ["ct", "ct", "t", "ct", "ct", "ct"],
+        "weapon": ["inferno", "inferno", "inferno", "ak47", "inferno", "inferno"],
+        "dmg_health": [8, 10, 5, 27, 20, 6],
+    })
+    return MockDemo(
+        ticks=ticks,
+        rounds=pl.DataFrame({"round_num": [1], "freeze_end": [0]}),
+        events={"inferno_startburn": startburns, "inferno_expire": expires, "player_hurt": hurts},
+        tickrate=10
+    )
+
+def test_fire_effects():
+    effects = calculate_fire_effects(make_molotov_demo())
+
+    # Fire 1 burns ticks 100-170: enemy fire damage is 8 + 10 (the self damage, the rifle
+    # hit and the burn after it expired do not count). Player 6 is 350 units away 2 s after
+    # entering it, player 7 has not moved. Fire 2 burns ticks 300-370 with player 7 inside.
+    assert effects.select(
+        ["player_steamid", "start_tick", "end_tick", "utility_damage",
+         "enemies_exposed", "enemies_displaced", "mean_displacement"]
+    ).rows() == [
+        (1, 100, 170, 18, 2, 1, 175.0),
+        (2, 300, 370, 6, 1, 0, 0.0),
+    ]
+
+def test_dead_enemies_in_fire_are_not_exposed():
+    demo = make_molotov_demo()
+    # CT 8 dies at tick 90 and their body lies inside fire 1 for the rest of the round
+    demo.ticks = pl.concat([demo.ticks, pl.DataFrame([
+        {"round_num": 1, "tick": tick, "player_steamid": 8, "side": "ct", "X": 20.0, "Y": 0.0, "Z": 0.0}
+        for tick in range(80, 410, 10)
+    ])])
+    demo.events["player_death"] = pl.DataFrame({
+        "tick": [90], "user_steamid": [8], "attacker_steamid": [1], "user_side": ["ct"], "attacker_side": ["t"]
+    })
+
+    effects = calculate_fire_effects(demo)
+    assert effects.select(["enemies_exposed", "enemies_displaced"]).rows() == [(2, 1), (1, 0)]
+
+    values = dict(BatchMetricEvaluator().evaluate(demo, ["position_denial_score"]).rows())
+    assert values["position_denial_score"] == pytest.approx(1 / 3)
+
+def test_overlapping_fires_count_each_hit_once():
+    demo = make_molotov_demo()
+    # Thrower 1 starts fire 3 at tick 120 while fire 1 still burns; it expires at 200
+    demo.events["inferno_startburn"] = pl.concat([demo.events["inferno_startburn"], pl.DataFrame({
+        "tick": [120], "entityid": [52], "user_steamid": [1], "user_side": ["t"],
+        "x": [2000.0], "y": [0.0], "z": [0.0],
+    })])
+    demo.events["inferno_expire"] = pl.DataFrame({"tick": [170, 200], "entityid": [50, 52]})
+    # Hits while both burn: 4 on CT 6, and 200 on CT 7, who has 90 health left
+    demo.events["player_hurt"] = pl.concat([demo.events["player_hurt"], pl.DataFrame({
+        "tick": [150, 160], "attacker_steamid": [1, 1], "attacker_side": ["t", "t"],
+        "user_steamid": [6, 7], "user_side": ["ct", "ct"], "weapon": ["inferno", "inferno"],
+        "dmg_health": [4, 200],
+    })])
+
+    effects = calculate_fire_effects(demo)
+
+    # Both hits go to fire 3, the latest started fire burning at their tick
+    assert effects.filter(pl.col("player_steamid") == 1).select(["start_tick", "utility_damage"]).rows() == [
+        (100, 18), (120, 94)
+    ]
+
+def test_molotov_metrics_in_registry():
+    values = dict(BatchMetricEvaluator().evaluate(
+        make_molotov_demo(), ["molotov_utility_damage", "position_denial_score"]
+    ).rows())
+
+    assert values["molotov_utility_damage"] == pytest.approx(12.0)
+    # One of three exposed enemies was displaced
+    assert values["position_denial_score"] == pytest.approx(1 / 3)
+
+def test_molotov_metrics_share_fire_inputs():
+    names = ["molotov_utility_damage", "position_denial_score"]
+
+    def fire_inputs(params=None):
+        inputs = BatchMetricEvaluator().build_inputs(make_molotov_demo(), names, params=params)
+        return sorted(key[0] for key in inputs if isinstance(key, tuple))
+
+    # The fires and the tick x fire join are built once for both metrics
+    assert fire_inputs() == ["fire_effects", "fire_exposures", "fire_intervals"]
+    # A different displacement window only rebuilds the exposures and the effects
+    assert fire_inputs({"position_denial_score": {"displacement_window": 1.0}}) == [
+        "fire_effects", "fire_effects", "fire_exposures", "fire_exposures", "fire_intervals"
+    ]
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import shutil
+from pathlib import Path
+import polars as pl
+from src.cs2_analyzer.application.zones import Zone, ZoneIndex, zone_index, label_zones, NO_ZONE
+
+# Two rooms side by side plus a tunnel under the right room
+ZONES = [
+    Zone("Left", ((0, 0), (100, 0), (100, 100), (0, 100))),
+    Zone("Tunnel", ((100, 0), (200, 0), (200, 100), (100, 100)), z_max=-50),
+    Zone("Right", ((100, 0), (200, 0), (200, 100), (100, 100)), z_min=-50),
+]
+
+
+def test_polygon_index_uses_z_bands():
+    index = ZoneIndex.from_zones(ZONES, cell_size=10)
+
+    codes = index.lookup([50, 150, 150, 500, -5], [50, 50, 50, 50, 50], [0, 0, -100, 0, 0])
+
+    assert [index.names[code] if code != NO_ZONE else None for code in codes] == ["Left", "Right", "Tunnel", None, None]
+    assert index.label([50, 500], [50, 50], [0, 0]).to_list() == ["Left", None]
+
+
+def test_index_from_ticks_takes_majority_place():
+    ticks = pl.DataFrame({
+        "X": [5.0, 6.0, 7.0, 45.0, 45.0],
+        "Y": [5.0, 5.0, 5.0, 5.0, 5.0],
+        "Z": [0.0, 0.0, 0.0, 0.0, 0.0],
+        "place": ["Mid", "Mid", "Catwalk", "Catwalk", ""],
+    })
+
+    index = ZoneIndex.from_ticks(ticks, cell_size=32)
+
+    assert index.label([10.0, 40.0], [10.0, 10.0], [0.0, 0.0]).to_list() == ["Mid", "Catwalk"]
+
+
+def test_index_from_ticks_without_places_is_empty():
+    ticks = pl.DataFrame({
+        "X": [5.0, 45.0],
+        "Y": [5.0, 5.0],
+        "Z": [0.0, 0.0],
+        "place": [None, ""],
+    }, schema_overrides={"place": pl.String})
+
+    index = ZoneIndex.from_ticks(ticks)
+
+    assert index.names == []
+    assert index.lookup([5.0, 1e6], [5.0, 0.0], [0.0, 0.0]).tolist() == [NO_ZONE, NO_ZONE]
+    assert index.label([5.0], [5.0], [0.0]).to_list() == [None]
+
+
+def test_zone_index_is_loaded_once_per_map_and_labels_lazily():
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        (Path(temp_dir) / "de_test.json").write_text(json.dumps({
+            "zones": [{"name": "Left", "polygon": [[0, 0], [100, 0], [100, 100], [0, 100]]}]
+        }))
+        ZoneIndex.from_zones(ZONES[2:], cell_size=10).save(Path(temp_dir) / "de_other.npz")
+
+        assert zone_index("de_test", temp_dir) is zone_index("de_test", temp_dir)
+        assert zone_index("de_missing", temp_dir) is None
+
+        games = pl.LazyFrame({"game_id": ["g1", "g2", "g3"], "map_name": ["de_test", "de_other", "de_missing"]})
+        ticks = pl.LazyFrame({
+            "game_id": ["g1", "g1", "g2", "g3"],
+            "X": [50.0, 150.0, 150.0, 50.0], "Y": [50.0, 50.0, 50.0, 50.0], "Z": [0.0, 0.0, 0.0, 0.0],
+        })
+
+        labelled = label_zones(ticks, games, temp_dir).sort(["game_id", "X"]).collect()
+
+        assert labelled["zone"].to_list() == ["Left", None, "Right", None]
+
+    finally:
+        zone_index.cache_clear()
+        shutil.rmtree(temp_dir)